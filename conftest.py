@@ -0,0 +1 @@
+# Lets pytest import the game package from the repository root
@@ -0,0 +1,51 @@
+import threading
+from collections import deque
+
+from game.persistence import write_save_file
+
+# --- Background Autosave ---
+# The main thread only takes a detached snapshot (GameState.get_save_snapshot); JSON encoding, compression
+# and disk I/O happen on one worker thread, so a frame never waits on them. Each autosave is a full atomic
+# snapshot (persistence.write_save_file).
+
+class AutosaveWorker:
+    """Writes save snapshots on a background thread; outcomes are collected on the main thread with poll().
+
+    A snapshot submitted while an earlier one is still waiting replaces it, so overlapping saves coalesce
+    into a single write of the newest state.
+    """
+    def __init__(self, write=None):
+        self._write = write or write_save_file
+        self._condition = threading.Condition()
+        self._pending = None
+        self._closing = False
+        self._results = deque()
+        self._thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self._thread.start()
+
+    def submit(self, snapshot, filename, compressed=True):
+        with self._condition:
+            self._pending = (snapshot, filename, compressed)
+            self._condition.notify()
+
+    def poll(self):
+        """(path, save_time, error) for every write finished since the last poll; error is None on success"""
+        finished = []
+        while self._results: finished.append(self._results.popleft())
+        return finished
+
+    def close(self, timeout=None):
+        """Finish the waiting snapshot, if any, then stop the worker"""
+        with self._condition:
+            self._closing = True
+            self._condition.notify()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closing: self._condition.wait()
+                if self._pending is None: return
+                (snapshot, filename, compressed), self._pending = self._pending, None
+            try: self._results.append((self._write(snapshot, filename, compressed), snapshot.get("save_time"), None))
+            except Exception as e: self._results.append((filename, snapshot.get("save_time"), e))
@@ -0,0 +1,141 @@
+"""Headless batch simulation of many realms for balance regression.
+
+Usage:
+    python -m game.batch_simulation saves/ --duration 86400 --out results.csv
+    python -m game.batch_simulation --generate 200 --duration 3600 --out results.jsonl
+    python -m game.batch_simulation saves/ --duration 86400 --seed 42         # reproducible rolls
+    python -m game.batch_simulation saves/ --duration 86400 --expected-value  # no sampling noise
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from game import bignum
+from game.clock import VirtualClock
+from game.constants import RESOURCE_TYPES, EARNINGS_PER_LEVEL
+from game.game_state import GameState
+from game.randomness import SampledRandomness, ExpectedValueRandomness
+
+SAVE_EXTENSIONS = (".zsave", ".json")
+RESULT_FIELDS = ["realm", "duration", "player_level", "prestige_count", "total_prestige_points", "total_earnings", "seconds", "error"] + RESOURCE_TYPES
+
+def find_saves(directory):
+    """List save files in a directory, sorted for stable output order"""
+    return sorted(os.path.join(directory, f) for f in os.listdir(directory) if f.endswith(SAVE_EXTENSIONS))
+
+# --- Generated Realms ---
+# A generated realm starts from a random point of the early game (earnings, and with them level and unlocks,
+# gold in hand and units of every unlocked race) and spends its resources with a simple purchase policy as it
+# runs, so a generated batch spreads out like played realms instead of idling as copies of one fresh realm.
+
+MAX_GENERATED_LEVEL = 30
+POLICY_INTERVAL = 10.0 # Virtual seconds between purchase rounds
+MAX_PURCHASES_PER_ROUND = 10
+
+def randomize_start(game_state, rng):
+    """Move a fresh realm to a random early-game starting point drawn from rng"""
+    game_state.total_earnings = float(rng.uniform(0.0, MAX_GENERATED_LEVEL * EARNINGS_PER_LEVEL))
+    game_state.check_unlocks()
+    game_state.resources["gold"] = float(rng.uniform(0.0, 0.5)) * game_state.total_earnings
+    for race in game_state.races.values():
+        if race["unlocked"]: race["count"] = int(rng.integers(0, 4 * game_state.player_level + 1))
+    game_state.invalidate_production_plan()
+
+def buy_cheapest(game_state, max_purchases=MAX_PURCHASES_PER_ROUND):
+    """Purchase policy: buy the cheapest affordable unlocked race or building, one at a time; returns the count bought"""
+    for bought in range(max_purchases):
+        offers = [(game_state.get_race_purchase_cost(race_id), game_state.add_race, race_id)
+                  for race_id, race in game_state.races.items() if race["unlocked"]]
+        offers += [(game_state.get_building_purchase_cost(building_id), game_state.add_building, building_id)
+                   for building_id, building in game_state.buildings.items() if building["unlocked"]]
+        affordable = [offer for offer in offers if offer[0] and game_state.can_afford(offer[0])]
+        if not affordable: return bought
+        cost, buy, item_id = min(affordable, key=lambda offer: sum(offer[0].values()))
+        game_state.spend_resources(cost)
+        buy(item_id)
+    return max_purchases
+
+def simulate_realm(source, duration, step=1.0, seed=None, expected_value=False):
+    """Advance one realm by duration virtual seconds; source is a save path or None for a generated realm.
+
+    seed selects the realm's random stream (e.g. (base_seed, realm_index)), which for a generated realm also
+    draws its starting point; expected_value replaces every roll by its expectation. Saves run untouched,
+    generated realms buy with buy_cheapest every POLICY_INTERVAL. Runs in a worker process, so it only
+    takes and returns plain data.
+    """
+    started = time.perf_counter()
+    row = {"realm": source or "generated", "duration": duration, "error": ""}
+    try:
+        # The virtual clock starts before any save stamp, so loading grants no offline progress
+        clock = VirtualClock(0.0)
+        randomness = ExpectedValueRandomness() if expected_value else SampledRandomness(seed)
+        game_state = GameState(clock=clock, randomness=randomness)
+        if source and not game_state.load_game(source, write_back=False):
+            raise ValueError(f"could not load {source}")
+        if not source: randomize_start(game_state, np.random.default_rng(None if seed is None else (*seed, 1)))
+        elapsed, next_purchase = 0.0, 0.0
+        while elapsed < duration:
+            dt = min(step, duration - elapsed)
+            clock.advance(dt)
+            game_state.update(dt)
+            game_state.fast_forward(step)
+            elapsed += dt
+            if not source and elapsed >= next_purchase:
+                buy_cheapest(game_state)
+                next_purchase = elapsed + POLICY_INTERVAL
+        row.update({resource: bignum.to_json(game_state.resources[resource]) for resource in RESOURCE_TYPES})
+        row.update({"player_level": game_state.player_level, "prestige_count": game_state.prestige_count,
+                    "total_prestige_points": game_state.total_prestige_points, "total_earnings": game_state.total_earnings})
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    row["seconds"] = time.perf_counter() - started
+    return row
+
+def run_batch(sources, duration, out_path, step=1.0, workers=None, seed=None, expected_value=False):
+    """Simulate every source in a process pool, streaming one result row per realm as workers finish"""
+    as_jsonl = out_path.endswith(".jsonl")
+    completed = 0
+    with open(out_path, "w", newline="") as out, ProcessPoolExecutor(max_workers=workers) as pool:
+        writer = None if as_jsonl else csv.DictWriter(out, fieldnames=RESULT_FIELDS)
+        if writer: writer.writeheader()
+        futures = {pool.submit(simulate_realm, source, duration, step, None if seed is None else (seed, i), expected_value): i
+                   for i, source in enumerate(sources)}
+        for future in as_completed(futures):
+            row = future.result()
+            if row["realm"] == "generated": row["realm"] = f"generated_{futures[future]:05d}"
+            if as_jsonl: out.write(json.dumps(row) + "\n")
+            else: writer.writerow(row)
+            out.flush()
+            completed += 1
+    return completed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Advance many saved or generated realms by a virtual duration.")
+    parser.add_argument("saves_dir", nargs="?", help="directory of .zsave/.json saves")
+    parser.add_argument("--generate", type=int, default=0, help="number of generated realms (random start, greedy purchases) to add")
+    parser.add_argument("--duration", type=float, required=True, help="virtual seconds to advance each realm")
+    parser.add_argument("--step", type=float, default=1.0, help="simulation step in virtual seconds")
+    parser.add_argument("--out", default="batch_results.csv", help="output file (.csv or .jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=None, help="base seed; each realm gets its own reproducible stream")
+    parser.add_argument("--expected-value", action="store_true", help="use expected values instead of random rolls")
+    args = parser.parse_args(argv)
+
+    sources = find_saves(args.saves_dir) if args.saves_dir else []
+    sources += [None] * args.generate
+    if not sources:
+        parser.error("nothing to simulate: pass a saves directory and/or --generate N")
+
+    started = time.perf_counter()
+    completed = run_batch(sources, args.duration, args.out, args.step, args.workers, args.seed, args.expected_value)
+    print(f"Simulated {completed} realms in {time.perf_counter() - started:.1f}s -> {args.out}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
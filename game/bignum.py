@@ -0,0 +1,157 @@
+import math
+
+# --- Arbitrary-Magnitude Numbers ---
+# Upgrade costs double per level without bound, so quantities can leave the float range. Values that fit
+# stay plain floats (the tick loop never sees anything else); past FLOAT_EXPONENT_LIMIT decades they are
+# carried as a BigNum, which mixes freely with floats and ints in arithmetic and comparisons.
+
+FLOAT_EXPONENT_LIMIT = 300 # Values at or past 1e300 are kept as BigNum rather than float
+
+class BigNum:
+    """mantissa * 10**exponent with 1 <= |mantissa| < 10 (mantissa 0.0 for zero)"""
+    __slots__ = ("mantissa", "exponent")
+
+    def __init__(self, mantissa=0.0, exponent=0):
+        mantissa, exponent = float(mantissa), int(exponent)
+        if mantissa == 0.0 or not math.isfinite(mantissa):
+            self.mantissa, self.exponent = mantissa, 0
+            return
+        shift = math.floor(math.log10(abs(mantissa)))
+        mantissa /= 10.0 ** shift
+        if abs(mantissa) >= 10.0: mantissa, shift = mantissa / 10.0, shift + 1 # log10 rounding at the boundary
+        self.mantissa, self.exponent = mantissa, exponent + shift
+
+    # Arithmetic
+    def __add__(self, other):
+        other = big(other)
+        if other.mantissa == 0.0: return self
+        if self.mantissa == 0.0: return other
+        gap = self.exponent - other.exponent
+        if gap > 17: return self
+        if gap < -17: return other
+        return BigNum(self.mantissa + other.mantissa * 10.0 ** -gap, self.exponent)
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        return self + -big(other)
+
+    def __rsub__(self, other):
+        return big(other) + -self
+
+    def __mul__(self, other):
+        other = big(other)
+        return BigNum(self.mantissa * other.mantissa, self.exponent + other.exponent)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = big(other)
+        if other.mantissa == 0.0: raise ZeroDivisionError("BigNum division by zero")
+        return BigNum(self.mantissa / other.mantissa, self.exponent - other.exponent)
+
+    def __rtruediv__(self, other):
+        return big(other) / self
+
+    def __pow__(self, power):
+        if self.mantissa == 0.0: return BigNum(0.0 if power > 0 else 1.0)
+        magnitude = from_log10((math.log10(abs(self.mantissa)) + self.exponent) * power)
+        return -magnitude if self.mantissa < 0 and power % 2 == 1 else magnitude
+
+    def __neg__(self):
+        result = BigNum.__new__(BigNum)
+        result.mantissa, result.exponent = -self.mantissa, self.exponent
+        return result
+
+    def __pos__(self):
+        return self
+
+    def __abs__(self):
+        return -self if self.mantissa < 0 else self
+
+    def log10(self):
+        return math.log10(self.mantissa) + self.exponent
+
+    # Comparison
+    def _compare(self, other):
+        if isinstance(other, float) and not math.isfinite(other):
+            a = float(self)
+            return (a > other) - (a < other)
+        other = big(other)
+        sign = (self.mantissa > 0) - (self.mantissa < 0)
+        other_sign = (other.mantissa > 0) - (other.mantissa < 0)
+        if sign != other_sign: return (sign > other_sign) - (sign < other_sign)
+        if self.exponent != other.exponent: return sign if self.exponent > other.exponent else -sign
+        return (self.mantissa > other.mantissa) - (self.mantissa < other.mantissa)
+
+    def __eq__(self, other):
+        try: return self._compare(other) == 0
+        except TypeError: return NotImplemented
+
+    def __lt__(self, other): return self._compare(other) < 0
+    def __le__(self, other): return self._compare(other) <= 0
+    def __gt__(self, other): return self._compare(other) > 0
+    def __ge__(self, other): return self._compare(other) >= 0
+
+    def __hash__(self):
+        return hash(float(self)) if self.exponent < FLOAT_EXPONENT_LIMIT else hash((self.mantissa, self.exponent))
+
+    def __bool__(self):
+        return self.mantissa != 0.0
+
+    # Conversion
+    def __float__(self):
+        try: return self.mantissa * 10.0 ** self.exponent
+        except OverflowError: return math.copysign(math.inf, self.mantissa)
+
+    def __int__(self):
+        if self.exponent < 16: return int(float(self))
+        return int(self.mantissa * 1e15) * 10 ** (self.exponent - 15)
+
+    def __format__(self, spec):
+        if self.exponent < FLOAT_EXPONENT_LIMIT: return format(float(self), spec)
+        return f"{self.mantissa:.2f}e{self.exponent}"
+
+    def __repr__(self):
+        return f"BigNum({self.mantissa!r}, {self.exponent})"
+
+    def __str__(self):
+        return f"{self.mantissa!r}e{self.exponent}"
+
+def big(value):
+    """BigNum for an int, float, BigNum or serialized string"""
+    if isinstance(value, BigNum): return value
+    if isinstance(value, str): return from_json(value)
+    if isinstance(value, int) and not -1e300 < value < 1e300: # Beyond float: take the digits directly
+        return from_log10(math.log10(abs(value))) * (1 if value > 0 else -1)
+    return BigNum(value)
+
+def from_log10(log_value):
+    """BigNum equal to 10 ** log_value"""
+    exponent = math.floor(log_value)
+    return BigNum(10.0 ** (log_value - exponent), exponent)
+
+def log10(value):
+    """Base-10 logarithm of a float, int or BigNum"""
+    return value.log10() if isinstance(value, BigNum) else math.log10(value)
+
+def compact(value):
+    """Plain float when the value fits, BigNum otherwise"""
+    if isinstance(value, BigNum): return float(value) if value.exponent < FLOAT_EXPONENT_LIMIT else value
+    if isinstance(value, int) and not -1e300 < value < 1e300: return big(value)
+    value = float(value)
+    return BigNum(value) if math.isfinite(value) and abs(value) >= 1e300 else value # inf and nan stay floats
+
+# --- JSON ---
+# Amounts that fit are written as plain numbers (older saves and tools read them unchanged);
+# larger ones as "<mantissa>e<exponent>" strings, which float() alone would turn into inf.
+
+def to_json(value):
+    if isinstance(value, BigNum): return float(value) if value.exponent < FLOAT_EXPONENT_LIMIT else str(value)
+    return value
+
+def from_json(value):
+    if isinstance(value, str):
+        mantissa, _, exponent = value.partition("e")
+        return compact(BigNum(float(mantissa), int(exponent or 0)))
+    return value
@@ -0,0 +1,41 @@
+import time
+
+# --- Clocks ---
+# GameState reads time only through one of these, so the simulation core never needs pygame/SDL.
+# time() returns seconds on the epoch scale (save stamps, alignment windows, time warp);
+# ticks() returns milliseconds for notification lifetimes.
+
+class WallClock:
+    """System wall-clock time; follows any adjustment of the system clock"""
+    def time(self):
+        return time.time()
+
+    def ticks(self):
+        return int(time.monotonic() * 1000)
+
+class MonotonicClock:
+    """Wall-clock time anchored once at creation, then advanced by the monotonic clock so it never jumps backwards"""
+    def __init__(self):
+        self._wall_origin = time.time()
+        self._monotonic_origin = time.monotonic()
+
+    def time(self):
+        return self._wall_origin + (time.monotonic() - self._monotonic_origin)
+
+    def ticks(self):
+        return int(time.monotonic() * 1000)
+
+class VirtualClock:
+    """Fully simulated time that only moves when advanced, for deterministic batch runs and fast-forwarding"""
+    def __init__(self, start_time=0.0):
+        self.now = start_time
+
+    def time(self):
+        return self.now
+
+    def ticks(self):
+        return int(self.now * 1000)
+
+    def advance(self, seconds):
+        self.now += seconds
+        return self.now
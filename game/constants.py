@@ -2,6 +2,9 @@
 SCREEN_WIDTH = 1920
 SCREEN_HEIGHT = 1080
 FPS = 60
+SIMULATION_RATE = 10  # Fixed simulation steps per second, independent of FPS
+MAX_SIMULATION_STEPS_PER_FRAME = 30  # Catch-up steps allowed in a single rendered frame
+MAX_SIMULATION_BACKLOG = 5.0  # Seconds of backlog kept for stepping; anything older is integrated like offline progress
 GAME_TITLE = "Eldrith Realms Idle"
 
 # Colors
@@ -49,6 +52,7 @@ COST_INCREASE_RATE = 1.2
 PRESTIGE_REQUIREMENT_BASE = 1000000
 PRESTIGE_SCALING = 5.0
 PRESTIGE_BONUS_BASE = 0.15
+EARNINGS_PER_LEVEL = 1000  # Lifetime gold per player level
 RESEARCH_POINT_BASE_COST = 5000
 RESEARCH_POINT_COST_SCALING = 1.5
 
@@ -56,6 +60,7 @@ RESEARCH_POINT_COST_SCALING = 1.5
 OFFLINE_PROGRESS_RATE = 0.5
 TIME_WARP_DURATION = 3600
 TIME_WARP_COOLDOWN = 86400
+TIME_WARP_FRAME_BUDGET = 0.004  # CPU seconds per rendered frame spent simulating owed warp time
 
 # Resource types
 RESOURCE_TYPES = ["gold", "wood", "stone", "food", "mana", "crystal", "ancient_knowledge", "prestige_points"]
@@ -1,20 +1,35 @@
-import time
-import json
-import os
-import zlib
 import base64
-import pygame 
 
 from game.constants import (RESOURCE_TYPES, RACES, BUILDINGS, RESEARCH, 
                            PRESTIGE_UPGRADES, ACHIEVEMENTS, BASE_INCOME_RATE, 
-                           PRESTIGE_REQUIREMENT_BASE, PRESTIGE_SCALING, PRESTIGE_BONUS_BASE,
-                           OFFLINE_PROGRESS_RATE, TIME_WARP_DURATION, TIME_WARP_COOLDOWN)
+                           PRESTIGE_BONUS_BASE, OFFLINE_PROGRESS_RATE, EARNINGS_PER_LEVEL)
 
+from game import bignum
+from game import migrations, persistence
+from game.clock import WallClock
+from game.randomness import SampledRandomness
 from game.logic import achievements as achievement_logic
 from game.logic import race_abilities as ability_logic
+from game.logic import production as production_logic
+from game.logic import offline_progress as offline_logic
+from game.logic import unlocks as unlock_logic
+from game.logic import costs as cost_logic
+from game.logic import time_warp as time_warp_logic
+
+SAVE_FIELDS = ["resources","races","buildings","research","prestige_upgrades","achievements","player_level","total_earnings","prestige_count","prestige_points","total_prestige_points","permanent_multipliers","total_play_time","time_warp_active","time_warp_end_time","time_warp_cooldown_end","time_warp_backlog"]
+
+def _detach(value):
+    if isinstance(value, dict): return {k:_detach(v) for k,v in value.items()}
+    if isinstance(value, list): return [_detach(v) for v in value]
+    return value
 
 class GameState:
-    def __init__(self):
+    def __init__(self, clock=None, randomness=None):
+        # Time source (wall, monotonic or virtual); keeps the simulation core free of pygame
+        self.clock = clock or WallClock()
+        # Randomness policy for chance-based abilities (sampled, seeded or expected-value)
+        self.randomness = randomness or SampledRandomness()
+        
         # Initialize resources
         self.resources = {resource: 0 for resource in RESOURCE_TYPES}
         self.resources["gold"] = 100  # Starting gold
@@ -70,6 +85,7 @@ class GameState:
         self.achievements = {}
         for category_key, achievement_list in ACHIEVEMENTS.items():
             self.achievements[category_key] = {milestone["id"]: False for milestone in achievement_list}
+        self.achievement_rewards = achievement_logic.AchievementRewards(self.achievements)
 
         # Game progression
         self.player_level = 1
@@ -80,50 +96,124 @@ class GameState:
         self.permanent_multipliers = {"all": 1.0}
         
         # Time tracking
-        self.last_save_time = time.time()
+        self.last_save_time = self.clock.time()
         self.total_play_time = 0
         self.time_warp_active = False
         self.time_warp_end_time = 0
         self.time_warp_cooldown_end = 0
+        self.time_warp_backlog = 0.0 # Warped seconds still to be simulated, see time_warp.fast_forward
         
         # Notifications
         self.notifications = []
+        
+        # Compiled production plan (rebuilt lazily after invalidate_production_plan)
+        self.state_version = 0
+        self._production_plan = None
+        self.active_effects = None # Active ability effects by kind, see race_abilities.get_active_effects
+        self._tick_rates = self._tick_race_shares = None # Tick snapshot shared by every hook within one tick
+        # Cursors into the unlock index, so per-frame unlock checks only look at the next thresholds
+        self._unlock_tracker = unlock_logic.UnlockTracker()
+        # Threshold queues over unearned milestones, built on the first check
+        self.achievement_engine = achievement_logic.AchievementEngine()
+        # Bulk quotes and Max counts shared by the UI panels, see costs.QuoteCache
+        self.quotes = cost_logic.QuoteCache(self)
+    
+    @property
+    def resources(self):
+        return self._resource_pool
+    
+    @resources.setter
+    def resources(self, amounts):
+        self._resource_pool = production_logic.ResourcePool(amounts)
     
     def update(self, elapsed_time):
-        if self.time_warp_active:
-            current_time = time.time()
-            if current_time >= self.time_warp_end_time:
-                self.time_warp_active = False
-                self.add_notification("Time Warp has ended!", notification_type="info")
-            else:
-                time_warp_multiplier = self.get_time_warp_multiplier()
-                elapsed_time *= time_warp_multiplier
-        
+        time_warp_logic.accrue_time_warp(self, elapsed_time) # Warp time is owed, then run in fixed steps by fast_forward
+        self.simulate(elapsed_time)
+    
+    def simulate(self, elapsed_time):
+        """Advance the realm by elapsed_time seconds of game time"""
         self.total_play_time += elapsed_time
         self.generate_resources(elapsed_time)
         self.check_unlocks()
         achievement_logic.check_achievements(self)
     
+    def catch_up(self, elapsed_time):
+        """Advance the realm over a long stall (window drag, system sleep) ending now, integrated like offline
+        progress at the full rate instead of as one oversized step"""
+        time_warp_logic.accrue_time_warp(self, elapsed_time)
+        self.total_play_time += elapsed_time
+        return offline_logic.integrate_offline_progress(self, elapsed_time, 1.0, self.clock.time() - elapsed_time)
+    
+    def get_time_warp_multiplier(self):
+        return time_warp_logic.get_time_warp_multiplier(self)
+    
+    def activate_time_warp(self):
+        return time_warp_logic.activate_time_warp(self)
+    
+    def fast_forward(self, step, budget=None):
+        """Simulate owed Time Warp seconds in steps of step, stopping after budget seconds of CPU (None: all)"""
+        return time_warp_logic.fast_forward(self, step, budget)
+    
+    def invalidate_production_plan(self):
+        """Mark the compiled production plan stale after a count, level, unlock, ability, achievement or prestige change"""
+        self._production_plan = None
+        self._tick_rates = None
+        self.state_version += 1
+    
+    def get_production_plan(self):
+        """Return the ProductionPlan (rate and multiplier vectors), compiling it only when invalidated"""
+        if self._production_plan is None:
+            self._production_plan = self._compile_production_plan()
+        return self._production_plan
+    
+    def _compile_production_plan(self):
+        return production_logic.compile_production_plan(self)
+    
+    def begin_tick(self):
+        """Start a tick: the base rate snapshot is taken on first use and shared by every hook until the next tick"""
+        self._tick_rates = None
+    
+    def get_tick_rates(self):
+        """Base generation rates (calculate_resource_generation_rate for every resource) for the current tick"""
+        if self._tick_rates is None: self._take_tick_snapshot()
+        return self._tick_rates
+    
+    def get_tick_race_shares(self):
+        """Each race's share of the race-driven base production per resource for the current tick"""
+        if self._tick_rates is None: self._take_tick_snapshot()
+        return self._tick_race_shares
+    
+    def _take_tick_snapshot(self):
+        plan = self.get_production_plan()
+        rates, shares = plan.rates, plan.race_shares
+        volatile = ability_logic.get_state_dependent_resources(self)
+        if volatile: # These depend on the live resource pool, so they can't be cached in the plan
+            rates, shares = rates.copy(), shares.copy()
+            live_shares = production_logic.contribution_shares(production_logic.compute_race_contributions(self))
+            for resource in volatile:
+                i = production_logic.RESOURCE_INDEX[resource]
+                rates[i], shares[:, i] = self.calculate_resource_generation_rate(resource), live_shares[:, i]
+        self._tick_rates, self._tick_race_shares = rates, shares
+    
+    def get_tick_rate(self, resource):
+        return float(self.get_tick_rates()[production_logic.RESOURCE_INDEX[resource]])
+    
     def generate_resources(self, elapsed_time):
+        self.begin_tick()
         ability_logic.apply_special_resource_generation(self, elapsed_time)
         
-        for resource in RESOURCE_TYPES:
-            if resource == "prestige_points": continue
-                
-            generation_rate = self.calculate_resource_generation_rate(resource)
-            amount_generated = generation_rate * elapsed_time
-            global_multiplier = self.calculate_global_multiplier(resource)
-            amount_generated *= global_multiplier
-            time_modifier = ability_logic.get_time_based_modifier(self, resource)
-            amount_generated *= time_modifier
-            
-            if ability_logic.check_production_doubling_chance(self):
-                amount_generated *= 2
-                
-            self.resources[resource] = self.resources.get(resource, 0) + amount_generated
-            
-            if resource == "gold": self.total_earnings += amount_generated
-            achievement_logic.track_race_resource_generation(self, resource, amount_generated)
+        plan = self.get_production_plan()
+        if ability_logic.get_state_dependent_resources(self): self.begin_tick() # Special generation may have moved the pool those rates read
+        rates = self.get_tick_rates()
+        
+        amounts = rates * plan.multipliers * (elapsed_time * ability_logic.get_time_based_modifier(self, None))
+        doubling_chance = ability_logic.get_production_doubling_chance(self)
+        if doubling_chance > 0:
+            amounts *= self.randomness.doubling_factors(doubling_chance, elapsed_time, len(amounts))
+        
+        self.resources.add(amounts)
+        self.total_earnings += float(amounts[production_logic.GOLD_INDEX])
+        achievement_logic.track_race_resource_generation(self, amounts, self.get_tick_race_shares())
                 
         ability_logic.generate_passive_prestige_points(self, elapsed_time)
     
@@ -190,7 +280,8 @@ class GameState:
     
     def add_race(self, race_id, count=1):
         if race_id in self.races and self.races[race_id]["unlocked"]:
-            self.races[race_id]["count"] += count; return True
+            self.races[race_id]["count"] += count
+            self.invalidate_production_plan(); return True
         return False
     
     def upgrade_race(self, race_id, count=1):
@@ -199,14 +290,16 @@ class GameState:
             max_lvl = info.get("max_level", float('inf'))
             upgrades = min(count, max_lvl - data["level"] if max_lvl != float('inf') else count)
             if upgrades <= 0: return False
-            data["level"] += upgrades; return True
+            data["level"] += upgrades
+            self.invalidate_production_plan(); return True
         return False
     
     def add_building(self, building_id, count=1):
         if building_id in self.buildings and self.buildings[building_id]["unlocked"]:
             self.buildings[building_id]["count"] += count
+            self.invalidate_production_plan()
             if count > 0 and self.buildings[building_id]["count"] == count: # Check for first build of this type
-                 achievement_logic.check_building_achievements(self) 
+                 achievement_logic.check_achievements(self) 
             return True
         return False
     
@@ -216,7 +309,8 @@ class GameState:
             upgrades = min(count, info["max_level"] - data["level"])
             if upgrades <= 0: return False
             data["level"] += upgrades
-            achievement_logic.check_building_achievements(self)
+            self.invalidate_production_plan()
+            achievement_logic.check_achievements(self)
             return True
         return False
     
@@ -224,7 +318,8 @@ class GameState:
         if research_id in self.research and self.research[research_id]["unlocked"]:
             info, data = RESEARCH[research_id], self.research[research_id]
             if data["level"] >= info["max_level"]: return False
-            data["level"] += 1; return True
+            data["level"] += 1
+            self.invalidate_production_plan(); return True
         return False
     
     def purchase_prestige_upgrade(self, upgrade_id):
@@ -233,115 +328,76 @@ class GameState:
             if data["level"] >= info["max_level"]: return False
             data["level"] += 1
             if upgrade_id=="cosmic_insight": self.permanent_multipliers["all"] *= info["effect"]["permanent_multiplier"]
+            self.invalidate_production_plan()
             return True
         return False
     
     def check_unlocks(self):
-        new_level = 1 + int(self.total_earnings / 1000)
+        new_level = 1 + int(self.total_earnings / EARNINGS_PER_LEVEL)
         if new_level > self.player_level:
             self.player_level = new_level
+            self.invalidate_production_plan()
             self.add_notification(f"Level up! You are now level {self.player_level}", notification_type="unlock")
-            for r_id, r_const in RACES.items():
-                if not self.races[r_id]["unlocked"] and r_const["unlock_level"]<=self.player_level and self.prestige_count>=r_const.get("requires_prestige",0):
-                    self.races[r_id]["unlocked"]=True; self.add_notification(f"New race unlocked: {r_const['name']}!",notification_type="unlock")
-        
-        ability_logic.check_race_ability_unlocks(self)
-        
-        for b_id, b_const in BUILDINGS.items():
-            if not self.buildings[b_id]["unlocked"] and b_const["unlock_level"]<=self.player_level and self.prestige_count>=b_const.get("requires_prestige",0):
-                self.buildings[b_id]["unlocked"]=True; self.add_notification(f"New building unlocked: {b_const['name']}!",notification_type="unlock")
-        for res_id, res_const in RESEARCH.items():
-            if not self.research[res_id]["unlocked"] and res_const["unlock_level"]<=self.player_level and self.prestige_count>=res_const.get("requires_prestige",0):
-                self.research[res_id]["unlocked"]=True; self.add_notification(f"New research unlocked: {res_const['name']}!",notification_type="unlock")
+        self._unlock_tracker.update(self)
 
     def get_race_purchase_cost(self, race_id, count=1):
         if race_id not in RACES: return {}
-        info, data = RACES[race_id], self.races[race_id]
-        cost, cur_c = info["base_cost"], data["count"]
-        if count==1: return {"gold":cost*(1.0+(0.15*cur_c))}
-        return {"gold":sum(cost*(1.0+(0.15*(cur_c+i))) for i in range(count))}
+        return {"gold":cost_logic.linear_total(RACES[race_id]["base_cost"],0.15,self.races[race_id]["count"],count)}
 
     def get_race_upgrade_cost(self, race_id, count=1):
         if race_id not in RACES: return {}
-        info, data = RACES[race_id], self.races[race_id]
-        cost, cur_l = info["base_cost"]*5, data["level"]
-        if count==1: return {"gold":cost*(2.0**(cur_l-1))}
-        return {"gold":sum(cost*(2.0**(cur_l+i-1)) for i in range(count))}
+        return {"gold":cost_logic.geometric_total(RACES[race_id]["base_cost"]*5,2.0,self.races[race_id]["level"]-1,count)}
 
     def get_building_purchase_cost(self, building_id, count=1):
         if building_id not in BUILDINGS: return {}
-        info, data = BUILDINGS[building_id], self.buildings[building_id]
-        b_costs, cur_c = info["base_cost"], data["count"]
-        costs={}
-        reduct=0.95 if achievement_logic.has_achievement(self,"first_building") else 1.0
-        if count==1:
-            for r,a in b_costs.items():costs[r]=a*(1.0+(0.2*cur_c))*reduct
-        else:
-            for r,b_a in b_costs.items():costs[r]=sum(b_a*(1.0+(0.2*(cur_c+i)))*reduct for i in range(count))
-        return costs
+        reduct, cur_c = self.achievement_rewards.building_cost_reduction, self.buildings[building_id]["count"]
+        return {r:cost_logic.linear_total(a*reduct,0.2,cur_c,count) for r,a in BUILDINGS[building_id]["base_cost"].items()}
 
     def get_building_upgrade_cost(self, building_id, count=1):
         if building_id not in BUILDINGS: return {}
-        info, data = BUILDINGS[building_id], self.buildings[building_id]
-        b_costs, cur_l = info["base_cost"], data["level"]
-        costs={}
-        reduct=0.95 if achievement_logic.has_achievement(self,"first_building") else 1.0
-        up_mult=2.0
-        if count==1:
-            for r,a in b_costs.items():costs[r]=a*(2.0**(cur_l-1))*reduct*up_mult
-        else:
-            for r,b_a in b_costs.items():costs[r]=sum(b_a*(2.0**(cur_l+i-1))*reduct*up_mult for i in range(count))
-        return costs
+        reduct, cur_l, up_mult = self.achievement_rewards.building_cost_reduction, self.buildings[building_id]["level"], 2.0
+        return {r:cost_logic.geometric_total(a*reduct*up_mult,2.0,cur_l-1,count) for r,a in BUILDINGS[building_id]["base_cost"].items()}
 
     def get_research_cost(self, research_id, count=1, current_level_override=None):
         if research_id not in RESEARCH: return {}
         info = RESEARCH[research_id]
         start_lvl = current_level_override if current_level_override is not None else self.research[research_id]["level"]
         actual_cnt = int(count) if count!=-1 else 1
-        costs,b_costs,scale={},info["cost"],info["cost_scaling"]
-        if actual_cnt==1:
-            for r,a in b_costs.items():costs[r]=a*(scale**start_lvl)
-        else:
-            for r,b_a in b_costs.items():costs[r]=sum(b_a*(scale**(start_lvl+i)) for i in range(actual_cnt))
-        return costs
+        return {r:cost_logic.geometric_total(a,info["cost_scaling"],start_lvl,actual_cnt) for r,a in info["cost"].items()}
 
     def get_prestige_upgrade_cost(self, upgrade_id, count=1, current_level_override=None):
         if upgrade_id not in PRESTIGE_UPGRADES: return {}
         info = PRESTIGE_UPGRADES[upgrade_id]
         start_lvl = current_level_override if current_level_override is not None else self.prestige_upgrades[upgrade_id]["level"]
         actual_cnt = int(count) if count!=-1 else 1
-        costs,b_costs,scale={},info["cost"],info.get("cost_scaling",1.0)
-        if actual_cnt==1:
-            mult = scale**start_lvl if start_lvl>0 and scale !=1.0 else 1.0 # Avoid 1.0 ** large_number if scale is 1
-            if start_lvl == 0 and info.get("cost_scaling") : cost_multiplier = 1.0 # First level generally doesn't apply scaling unless base cost is for level 0
-            else: cost_multiplier = scale ** start_lvl if scale != 1.0 else 1.0
-
-            for r,a in b_costs.items():costs[r]=a*cost_multiplier
-        else:
-            for r,b_a in b_costs.items():
-                total_c = 0
-                for i in range(actual_cnt):
-                    lvl_to_calc = start_lvl + i
-                    cost_multiplier_lvl = scale ** lvl_to_calc if lvl_to_calc > 0 and scale != 1.0 else 1.0
-                    if lvl_to_calc == 0 and info.get("cost_scaling"): cost_multiplier_lvl = 1.0
-                    total_c += b_a * cost_multiplier_lvl
-                costs[r] = total_c
-        return costs
+        # Level 0 costs the base price and level L costs base * scaling**L, i.e. a plain geometric series
+        return {r:cost_logic.geometric_total(a,info.get("cost_scaling",1.0),start_lvl,actual_cnt) for r,a in info["cost"].items()}
 
-    def calculate_max_affordable_levels(self, item_id, cost_func_name, current_lvl, max_cap):
-        cost_func = getattr(self, cost_func_name)
-        affordable_lvls = 0
-        sim_res = self.resources.copy()
-        if current_lvl >= max_cap: return 0
-        for i in range(max_cap - current_lvl):
-            cost = cost_func(item_id, 1, current_lvl + i)
-            if not cost or not self.can_afford_with_simulated(sim_res, cost): break
-            for r,a in cost.items(): sim_res[r] -= a
-            affordable_lvls += 1
-        return affordable_lvls
-    
-    def can_afford_with_simulated(self, sim_res, costs): # Helper for calculate_max_affordable_levels
-        return all(sim_res.get(r,0) >= a for r,a in costs.items())
+    def get_max_affordable(self, action, item_id):
+        """Largest count of an action ("race_purchase", "race_upgrade", "building_purchase", "building_upgrade",
+        "research" or "prestige_upgrade") the current resources pay for, including cost growth and level caps"""
+        linear, geometric = cost_logic.max_linear_count, cost_logic.max_geometric_count
+        if action=="race_purchase":
+            info,data=RACES[item_id],self.races[item_id]
+            curves=[("gold",linear,info["base_cost"],0.15,data["count"])]; cap=float('inf'); quote=lambda n:self.get_race_purchase_cost(item_id,n)
+        elif action=="race_upgrade":
+            info,data=RACES[item_id],self.races[item_id]
+            curves=[("gold",geometric,info["base_cost"]*5,2.0,data["level"]-1)]; cap=info.get("max_level",float('inf'))-data["level"]; quote=lambda n:self.get_race_upgrade_cost(item_id,n)
+        elif action=="building_purchase":
+            info,data,reduct=BUILDINGS[item_id],self.buildings[item_id],self.achievement_rewards.building_cost_reduction
+            curves=[(r,linear,a*reduct,0.2,data["count"]) for r,a in info["base_cost"].items()]; cap=float('inf'); quote=lambda n:self.get_building_purchase_cost(item_id,n)
+        elif action=="building_upgrade":
+            info,data,reduct=BUILDINGS[item_id],self.buildings[item_id],self.achievement_rewards.building_cost_reduction
+            curves=[(r,geometric,a*reduct*2.0,2.0,data["level"]-1) for r,a in info["base_cost"].items()]; cap=info["max_level"]-data["level"]; quote=lambda n:self.get_building_upgrade_cost(item_id,n)
+        elif action=="research":
+            info,lvl=RESEARCH[item_id],self.research[item_id]["level"]
+            curves=[(r,geometric,a,info["cost_scaling"],lvl) for r,a in info["cost"].items()]; cap=info["max_level"]-lvl; quote=lambda n:self.get_research_cost(item_id,n)
+        elif action=="prestige_upgrade":
+            info,lvl=PRESTIGE_UPGRADES[item_id],self.prestige_upgrades[item_id]["level"]
+            curves=[(r,geometric,a,info.get("cost_scaling",1.0),lvl) for r,a in info["cost"].items()]; cap=info.get("max_level",float('inf'))-lvl; quote=lambda n:self.get_prestige_upgrade_cost(item_id,n)
+        else: raise ValueError(f"Unknown purchase action: {action}")
+        if cap<=0: return 0
+        return cost_logic.max_affordable(curves,self.resources,quote,cap)
         
     def get_race_upgrade_benefits(self, race_id):
         if race_id not in self.races or not self.races[race_id]["unlocked"]: return None
@@ -406,23 +462,14 @@ class GameState:
         return self.calculate_global_multiplier(resource)
     
     def get_race_skill_multiplier(self, race_id, resource):
-        mult = 1.0
-        for m in ACHIEVEMENTS.get("race_skill_milestones",[]):
-            if self.achievements.get("race_skill_milestones",{}).get(m["id"]) and m["requirement"].get("race_skill")==race_id:
-                if f"{race_id}_{resource}_bonus" in m["reward"]: mult *= m["reward"][f"{race_id}_{resource}_bonus"]
-                if f"{race_id}_efficiency" in m["reward"]: mult *= m["reward"][f"{race_id}_efficiency"]
-        return mult
+        return self.achievement_rewards.race_skill_multiplier(race_id, resource)
 
     def get_race_bonus_multiplier(self):
         mult = 1.0
         if "racial_harmony" in self.research and self.research["racial_harmony"]["unlocked"] and self.research["racial_harmony"]["level"]>0:
             info=RESEARCH["racial_harmony"]
             mult *= (1.0+((info["effect"]["race_bonus_multiplier"]-1.0)*self.research["racial_harmony"]["level"]*info.get("effect_scaling",1.0)))
-        for cat_key in ["race_milestones","race_skill_milestones"]:
-            for m in ACHIEVEMENTS.get(cat_key,[]):
-                if self.achievements.get(cat_key,{}).get(m["id"]) and "all_race_efficiency" in m["reward"]:
-                    mult *= m["reward"]["all_race_efficiency"]
-        return mult
+        return mult*self.achievement_rewards.all_race_efficiency
 
     def get_research_multiplier(self, resource):
         mult = 1.0
@@ -445,7 +492,7 @@ class GameState:
         return bonus
 
     def add_notification(self, message, details=None, notification_type="info"):
-        self.notifications.append({"text":message,"message":message,"time":pygame.time.get_ticks(),"type":notification_type,"details":details or message,"id":len(self.notifications)+1})
+        self.notifications.append({"text":message,"message":message,"time":self.clock.ticks(),"type":notification_type,"details":details or message,"id":len(self.notifications)+1})
         if len(self.notifications)>20: self.notifications=self.notifications[-20:]
     
     def get_notifications(self, clear=False):
@@ -454,68 +501,55 @@ class GameState:
             self.notifications = []
         return n_copy  # type: ignore
     
+    def _get_save_data(self):
+        data = {k:getattr(self,k) for k in SAVE_FIELDS}
+        data["resources"] = {resource: bignum.to_json(amount) for resource, amount in self.resources.items()}
+        data.update({"save_time":self.clock.time(),"version":migrations.SAVE_VERSION})
+        return data
+    
+    def get_save_snapshot(self):
+        """Save data detached from the live state (nested containers copied), safe to serialize on another thread"""
+        return _detach(self._get_save_data())
+    
     def save_game(self, filename="save.json", compressed=True):
-        data = {k:getattr(self,k) for k in ["resources","races","buildings","research","prestige_upgrades","achievements","player_level","total_earnings","prestige_count","prestige_points","total_prestige_points","permanent_multipliers","total_play_time","time_warp_active","time_warp_end_time","time_warp_cooldown_end"]}
-        data.update({"save_time":time.time(),"version":"1.0.0"})
+        data = self._get_save_data()
         try:
-            d_name=os.path.dirname(filename); (os.makedirs(d_name) if d_name and not os.path.exists(d_name) else None)
-            comp=compressed or filename.endswith(".zsave")
-            if comp:
-                f_name=filename.replace(".json",".zsave") if not filename.endswith(".zsave") else filename
-                with open(f_name,'wb') as f: f.write(zlib.compress(json.dumps(data).encode('utf-8'),level=9))
-            else:
-                with open(filename,'w') as f: json.dump(data,f)
-            self.last_save_time = time.time(); return True
+            persistence.write_save_file(data, filename, compressed)
+            self.last_save_time = data["save_time"]; return True
         except Exception as e: print(f"Error saving game: {e}"); return False
     
     def export_save_string(self):
         try:
-            data = {k:getattr(self,k) for k in ["resources","races","buildings","research","prestige_upgrades","achievements","player_level","total_earnings","prestige_count","prestige_points","total_prestige_points","permanent_multipliers","total_play_time","time_warp_active","time_warp_end_time","time_warp_cooldown_end"]}
-            data.update({"save_time":time.time(),"version":"1.0.0"})
-            return base64.b64encode(zlib.compress(json.dumps(data).encode('utf-8'),level=9)).decode('utf-8')
+            data = self._get_save_data()
+            return base64.b64encode(persistence.encode_save(data)).decode('utf-8')
         except Exception as e: print(f"Error exporting save string: {e}"); return None
     
     def import_save_string(self, save_str):
         try:
-            self._apply_save_data(json.loads(zlib.decompress(base64.b64decode(save_str)).decode('utf-8')))
+            data = persistence.decode_save(base64.b64decode(save_str)); migrations.migrate(data)
+            self._apply_save_data(data)
             self.add_notification("Save imported successfully!",notification_type="save"); return True
         except Exception as e: print(f"Error importing save string: {e}"); self.add_notification("Failed to import save. Invalid save string.",notification_type="error"); return False
     
-    def load_game(self, filename="save.json"):
+    def load_game(self, filename="save.json", write_back=True):
+        """Load a save; write_back stores an outdated save upgraded in place (off for tools reading others' saves)"""
         try:
-            if not os.path.exists(filename): filename = filename.replace(".json",".zsave"); (False if not os.path.exists(filename) else None)
-            with open(filename,'rb' if filename.endswith(".zsave") else 'r') as f: data=json.loads(zlib.decompress(f.read()).decode('utf-8') if filename.endswith(".zsave") else json.load(f))
-            self._apply_save_data(data); return True
+            self._apply_save_data(persistence.read_save_file(filename, write_back)); return True
         except Exception as e: print(f"Error loading game: {e}"); return False
     
     def _apply_save_data(self, data):
-        for k in ["resources","races","buildings","research","prestige_upgrades","player_level","total_earnings","prestige_count","prestige_points","total_prestige_points","permanent_multipliers","total_play_time","time_warp_active","time_warp_end_time","time_warp_cooldown_end"]:
-            setattr(self,k,data.get(k,getattr(self,k)))
-        for r_id,r_data in self.races.items():
-            if "skills" not in r_data: r_data["skills"]={res_t:0 for res_t in RESOURCE_TYPES}
+        # data is at migrations.SAVE_VERSION: every content table is complete, so it's taken as is
+        for k in SAVE_FIELDS: setattr(self,k,data.get(k,getattr(self,k)))
+        self.invalidate_production_plan(); self._unlock_tracker=unlock_logic.UnlockTracker(); self.achievement_engine=achievement_logic.AchievementEngine()
+        self.achievement_rewards=achievement_logic.AchievementRewards(self.achievements)
         
-        def_ach_struct={c_k:{ach["id"]:False for ach in ach_l} for c_k,ach_l in ACHIEVEMENTS.items()}
-        loaded_ach=data.get("achievements",{}); self.achievements=def_ach_struct.copy()
-        for cat,mstones in loaded_ach.items():
-            if cat in self.achievements:
-                for m_id,m_stat in mstones.items():
-                    if m_id in self.achievements[cat]: self.achievements[cat][m_id]=m_stat
-        
-        off_time=time.time()-data.get("save_time",time.time())
+        off_time=self.clock.time()-data.get("save_time",self.clock.time())
         if off_time>0:
             off_rate=OFFLINE_PROGRESS_RATE
             if "automatic_production" in self.prestige_upgrades and self.prestige_upgrades["automatic_production"]["level"]>0:
                 lvl,info=self.prestige_upgrades["automatic_production"]["level"],PRESTIGE_UPGRADES["automatic_production"]
                 off_rate=info["effect"]["offline_progress"]*lvl
             if off_rate>0:
-                self.generate_resources(off_time*off_rate)
+                offline_logic.integrate_offline_progress(self, off_time, off_rate, data.get("save_time",self.clock.time()))
                 t_str=f"{int(off_time)}s"; (f"{int(off_time/3600)}h {int((off_time%3600)/60)}m" if off_time>=3600 else (f"{int(off_time/60)}m {int(off_time%60)}s" if off_time>=60 else t_str))
                 self.add_notification(f"Welcome back! Offline: {t_str} ({int(off_rate*100)}% rate).",notification_type="info")
-
-    def calculate_max_affordable(self, cost):
-        if not cost: return 0
-        max_c = float('inf')
-        for r,a in cost.items():
-            if a<=0: continue
-            max_c = min(max_c, self.resources.get(r,0)//a)
-        return int(max_c) if max_c!=float('inf') else 0
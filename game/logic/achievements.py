@@ -1,292 +1,271 @@
-from game.constants import ACHIEVEMENTS, RESOURCE_TYPES, RACES, BASE_INCOME_RATE
+from game.constants import ACHIEVEMENTS, RESOURCE_TYPES, RACES
 
 # --- Achievement Checking Logic ---
+def award_achievement(game_state, category_key, milestone):
+    """Mark a milestone as earned, notify the player and invalidate the production plan"""
+    game_state.achievements[category_key][milestone["id"]] = True
+    game_state.achievement_rewards.add(category_key, milestone)
+    game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
+    game_state.invalidate_production_plan()
+
 def check_achievements(game_state):
     """Check for achievement completion"""
-    check_resource_achievements(game_state)
-    check_race_achievements(game_state)
-    check_building_achievements(game_state)
-    check_prestige_achievements(game_state)
-    check_time_achievements(game_state)
-    check_race_skill_achievements(game_state)
-
-def check_resource_achievements(game_state):
-    """Check resource-based achievements"""
-    for milestone in ACHIEVEMENTS["resource_milestones"]:
-        milestone_id = milestone["id"]
-        
-        # Skip if already achieved
-        if game_state.achievements["resource_milestones"].get(milestone_id):
-            continue
-            
-        # Check requirement
-        requirement = milestone["requirement"]
-        met_all_reqs = True
-        for resource, amount in requirement.items():
-            if game_state.resources.get(resource, 0) < amount:
-                met_all_reqs = False
-                break
-        if met_all_reqs:
-            game_state.achievements["resource_milestones"][milestone_id] = True
-            game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-
-def check_race_achievements(game_state):
-    """Check race-based achievements"""
-    for milestone in ACHIEVEMENTS["race_milestones"]:
-        milestone_id = milestone["id"]
-        
-        # Skip if already achieved
-        if game_state.achievements["race_milestones"].get(milestone_id):
-            continue
-            
-        # Check requirement
-        requirement = milestone["requirement"]
-        
-        # Check for specific race count
-        if "race" in requirement and "count" in requirement:
-            race_id = requirement["race"]
-            count = requirement["count"]
-            
-            if race_id in game_state.races and game_state.races[race_id]["count"] >= count:
-                game_state.achievements["race_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-        
-        # Check for all races at a certain count
-        elif "all_races" in requirement:
-            min_count = requirement["all_races"]
-            all_races_meet_requirement = True
-            
-            for race_id, race_data in game_state.races.items():
-                if race_data["unlocked"] and race_data["count"] < min_count:
-                    all_races_meet_requirement = False
-                    break
-            
-            if all_races_meet_requirement:
-                game_state.achievements["race_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-
-def check_building_achievements(game_state):
-    """Check building-based achievements"""
-    for milestone in ACHIEVEMENTS["building_milestones"]:
-        milestone_id = milestone["id"]
-        
-        # Skip if already achieved
-        if game_state.achievements["building_milestones"].get(milestone_id):
-            continue
-            
-        # Check requirement
-        requirement = milestone["requirement"]
-        
-        # Check for any building
-        if "any_building" in requirement:
-            count = requirement["any_building"]
-            any_building_meets_requirement = False
-            
-            for building_id, building_data in game_state.buildings.items():
-                if building_data["count"] >= count:
-                    any_building_meets_requirement = True
-                    break
-            
-            if any_building_meets_requirement:
-                game_state.achievements["building_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-        
-        # Check for any building level
-        elif "any_building_level" in requirement:
-            level = requirement["any_building_level"]
-            any_building_meets_level = False
-            
-            for building_id, building_data in game_state.buildings.items():
-                if building_data["count"] > 0 and building_data["level"] >= level:
-                    any_building_meets_level = True
-                    break
-            
-            if any_building_meets_level:
-                game_state.achievements["building_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-        
-        # Check for all buildings at a certain level
-        elif "all_buildings" in requirement:
-            min_level = requirement["all_buildings"]
-            all_buildings_meet_requirement = True
-            any_buildings_exist = False
-            
-            for building_id, building_data in game_state.buildings.items():
-                # Only consider unlocked buildings with at least one built
-                if building_data["unlocked"] and building_data["count"] > 0:
-                    any_buildings_exist = True # Ensure there's at least one building to check
-                    if building_data["level"] < min_level:
-                        all_buildings_meet_requirement = False
-                        break
-            
-            if any_buildings_exist and all_buildings_meet_requirement: # Check if any buildings exist before granting
-                game_state.achievements["building_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-        
-        # Check for specific building
-        elif "building" in requirement and "count" in requirement:
-            building_id = requirement["building"]
-            count = requirement["count"]
-            
-            if building_id in game_state.buildings and game_state.buildings[building_id]["count"] >= count:
-                game_state.achievements["building_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-
-def check_prestige_achievements(game_state):
-    """Check prestige-based achievements"""
-    for milestone in ACHIEVEMENTS["prestige_milestones"]:
-        milestone_id = milestone["id"]
-        
-        # Skip if already achieved
-        if game_state.achievements["prestige_milestones"].get(milestone_id):
-            continue
-            
-        # Check requirement
-        requirement = milestone["requirement"]
-        
-        if "prestige_count" in requirement:
-            count = requirement["prestige_count"]
-            
-            if game_state.prestige_count >= count:
-                game_state.achievements["prestige_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-
-def check_time_achievements(game_state):
-    """Check time-based achievements"""
-    for milestone in ACHIEVEMENTS["time_milestones"]:
-        milestone_id = milestone["id"]
-        
-        # Skip if already achieved
-        if game_state.achievements["time_milestones"].get(milestone_id):
-            continue
-            
-        # Check requirement
-        requirement = milestone["requirement"]
-        
-        if "play_time" in requirement:
-            seconds = requirement["play_time"]
-            
-            if game_state.total_play_time >= seconds:
-                game_state.achievements["time_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-
-def track_race_resource_generation(game_state, resource, amount):
-    """Track resources generated by each race for skill achievements"""
-    race_contributions = {}
-    total_contribution = 0
-    
-    for race_id, race_data in game_state.races.items():
-        if race_data["unlocked"] and race_data["count"] > 0:
-            race_info = RACES[race_id]
-            race_contribution = BASE_INCOME_RATE * race_data["count"] * race_data["level"]
-            
-            if "resource_bonuses" in race_info and resource in race_info["resource_bonuses"]:
-                # Assuming get_race_bonus_multiplier is a method of game_state
-                bonus = race_info["resource_bonuses"][resource] * game_state.get_race_bonus_multiplier()
-                race_contribution *= bonus
-            
-            # Assuming get_race_specific_ability_bonus is a method of game_state
-            ability_bonus = game_state.get_race_specific_ability_bonus(race_id, resource)
-            race_contribution *= ability_bonus
-            
-            race_contributions[race_id] = race_contribution
-            total_contribution += race_contribution
-    
-    if total_contribution <= 0:
-        return
-    
-    for race_id, contribution in race_contributions.items():
-        proportion = contribution / total_contribution
-        race_amount = amount * proportion
-        if resource in game_state.races[race_id]["skills"]:
-            game_state.races[race_id]["skills"][resource] += race_amount
-        else: # Should not happen if initialized correctly
-            game_state.races[race_id]["skills"][resource] = race_amount
-
-
-def check_race_skill_achievements(game_state):
-    """Check race skill-based achievements"""
-    for milestone in ACHIEVEMENTS["race_skill_milestones"]:
-        milestone_id = milestone["id"]
-        
-        if game_state.achievements["race_skill_milestones"].get(milestone_id):
-            continue
-            
-        requirement = milestone["requirement"]
-        
+    game_state.achievement_engine.check(game_state)
+
+# --- Achievement Engine ---
+# Each unearned milestone is queued under the metric its requirement watches, sorted by threshold, so a
+# check reads one value per metric and only evaluates milestones whose next threshold was crossed.
+
+class AchievementEngine:
+    """Per-realm threshold queues over the unearned milestones.
+
+    Structural metrics (race counts, building levels, prestige, player level) only change through
+    mutators that bump state_version, so they are re-read only after a bump. Milestones whose metric
+    crossed but whose full requirement is not met yet (multi-resource, level/prestige gates, races not
+    unlocked) move to a small watch list that is re-evaluated every check until earned.
+    """
+    def __init__(self):
+        self.volatile = None
+        self.structural = None
+        self.watching = []
+        self.version = None
+
+    def _build(self, game_state):
+        queues = {}
+        for category_key, milestones in ACHIEVEMENTS.items():
+            for milestone in milestones:
+                if game_state.achievements.get(category_key, {}).get(milestone["id"]):
+                    continue
+                for metric, threshold in _milestone_metrics(category_key, milestone["requirement"]):
+                    queues.setdefault(metric, []).append((threshold, category_key, milestone))
+        self.volatile, self.structural = [], []
+        for metric, queue in queues.items():
+            queue.sort(key=lambda entry: entry[0], reverse=True) # Lowest threshold at the end, popped first
+            (self.volatile if metric[0] in VOLATILE_METRICS else self.structural).append((METRICS[metric[0]], metric[1:], queue))
+
+    def check(self, game_state):
+        if self.volatile is None:
+            self._build(game_state)
+        self._drain(game_state, self.volatile)
+        if self.version != game_state.state_version:
+            self.version = game_state.state_version
+            self._drain(game_state, self.structural)
+        if self.watching:
+            self.watching = [(category_key, milestone) for category_key, milestone in self.watching
+                             if not _try_award(game_state, category_key, milestone)]
+
+    def _drain(self, game_state, queues):
+        exhausted = False
+        for metric, args, queue in queues:
+            value = metric(game_state, *args)
+            while queue and queue[-1][0] <= value:
+                _, category_key, milestone = queue.pop()
+                if (category_key, milestone) not in self.watching: self.watching.append((category_key, milestone))
+            exhausted = exhausted or not queue
+        if exhausted:
+            queues[:] = [entry for entry in queues if entry[2]]
+
+def _try_award(game_state, category_key, milestone):
+    if game_state.achievements[category_key].get(milestone["id"]):
+        return True
+    if not REQUIREMENT_CHECKS[category_key](game_state, milestone["requirement"]):
+        return False
+    award_achievement(game_state, category_key, milestone)
+    return True
+
+def _milestone_metrics(category_key, requirement):
+    """(metric, threshold) pairs whose crossing is necessary for the requirement to be met"""
+    if category_key == "resource_milestones":
+        return [(("resource", resource), amount) for resource, amount in requirement.items()]
+    if category_key == "race_milestones":
+        if "race" in requirement and "count" in requirement: return [(("race_count", requirement["race"]), requirement["count"])]
+        if "all_races" in requirement: return [(("min_race_count",), requirement["all_races"])]
+    if category_key == "building_milestones":
+        if "any_building" in requirement: return [(("max_building_count",), requirement["any_building"])]
+        if "any_building_level" in requirement: return [(("max_building_level",), requirement["any_building_level"])]
+        if "all_buildings" in requirement: return [(("min_building_level",), requirement["all_buildings"])]
+        if "building" in requirement and "count" in requirement: return [(("building_count", requirement["building"]), requirement["count"])]
+    if category_key == "prestige_milestones" and "prestige_count" in requirement:
+        return [(("prestige_count",), requirement["prestige_count"])]
+    if category_key == "time_milestones" and "play_time" in requirement:
+        return [(("play_time",), requirement["play_time"])]
+    if category_key == "race_skill_milestones":
         if "race_skill" in requirement and "resource" in requirement and "amount" in requirement:
-            race_id = requirement["race_skill"]
-            resource_key = requirement["resource"]
-            required_amount = requirement["amount"]
-            
-            if race_id not in game_state.races or not game_state.races[race_id]["unlocked"]:
-                continue
-            if "player_level" in requirement and game_state.player_level < requirement["player_level"]:
-                continue
-            if "prestige_level" in requirement and game_state.prestige_count < requirement["prestige_level"]:
-                continue
-            
-            if game_state.races[race_id]["skills"].get(resource_key, 0) >= required_amount:
-                game_state.achievements["race_skill_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-        
-        elif "race_skill" in requirement and "all_resources" in requirement:
-            race_id = requirement["race_skill"]
-            min_amount = requirement["all_resources"]
-            
-            if race_id not in game_state.races or not game_state.races[race_id]["unlocked"]:
-                continue
-            if "player_level" in requirement and game_state.player_level < requirement["player_level"]:
-                continue
-            if "prestige_level" in requirement and game_state.prestige_count < requirement["prestige_level"]:
-                continue
-            
-            all_resources_meet_requirement = True
-            for resource_type in RESOURCE_TYPES:
-                if resource_type == "prestige_points": continue
-                if game_state.races[race_id]["skills"].get(resource_type, 0) < min_amount:
-                    all_resources_meet_requirement = False
-                    break
-            
-            if all_resources_meet_requirement:
-                game_state.achievements["race_skill_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
-        
-        elif "player_level" in requirement and "max_play_time" in requirement:
-            player_level_req = requirement["player_level"]
-            max_play_time_req = requirement["max_play_time"]
-            
-            if game_state.player_level >= player_level_req and game_state.total_play_time <= max_play_time_req:
-                game_state.achievements["race_skill_milestones"][milestone_id] = True
-                game_state.add_notification(f"Achievement unlocked: {milestone['name']}!", notification_type="achievement")
+            return [(("race_skill", requirement["race_skill"], requirement["resource"]), requirement["amount"])]
+        if "race_skill" in requirement and "all_resources" in requirement:
+            return [(("min_race_skill", requirement["race_skill"]), requirement["all_resources"])]
+        if "player_level" in requirement and "max_play_time" in requirement:
+            return [(("player_level",), requirement["player_level"])]
+    return [] # Unknown requirement shapes can never be earned
+
+def _race_count(game_state, race_id):
+    return game_state.races[race_id]["count"] if race_id in game_state.races else 0
+
+def _min_race_count(game_state):
+    return min((race_data["count"] for race_data in game_state.races.values() if race_data["unlocked"]), default=float("inf"))
+
+def _max_building_level(game_state):
+    return max((building_data["level"] for building_data in game_state.buildings.values() if building_data["count"] > 0), default=0)
+
+def _min_building_level(game_state):
+    return min((building_data["level"] for building_data in game_state.buildings.values() if building_data["unlocked"] and building_data["count"] > 0), default=0)
+
+def _race_skill(game_state, race_id, resource):
+    return game_state.races[race_id]["skills"].get(resource, 0) if race_id in game_state.races else 0
+
+def _min_race_skill(game_state, race_id):
+    if race_id not in game_state.races: return 0
+    return min(game_state.races[race_id]["skills"].get(resource, 0) for resource in RESOURCE_TYPES if resource != "prestige_points")
+
+METRICS = {
+    "resource": lambda game_state, resource: game_state.resources.get(resource, 0),
+    "race_count": _race_count,
+    "min_race_count": _min_race_count,
+    "max_building_count": lambda game_state: max((building_data["count"] for building_data in game_state.buildings.values()), default=0),
+    "max_building_level": _max_building_level,
+    "min_building_level": _min_building_level,
+    "building_count": lambda game_state, building_id: game_state.buildings[building_id]["count"] if building_id in game_state.buildings else 0,
+    "prestige_count": lambda game_state: game_state.prestige_count,
+    "play_time": lambda game_state: game_state.total_play_time,
+    "race_skill": _race_skill,
+    "min_race_skill": _min_race_skill,
+    "player_level": lambda game_state: game_state.player_level,
+}
+VOLATILE_METRICS = {"resource", "play_time", "race_skill", "min_race_skill"} # Change every tick without a state_version bump
+
+# --- Requirement Predicates ---
+
+def resource_requirement_met(game_state, requirement):
+    """Check a resource milestone requirement"""
+    for resource, amount in requirement.items():
+        if game_state.resources.get(resource, 0) < amount:
+            return False
+    return True
+
+def race_requirement_met(game_state, requirement):
+    """Check a race milestone requirement"""
+    # Check for specific race count
+    if "race" in requirement and "count" in requirement:
+        return _race_count(game_state, requirement["race"]) >= requirement["count"]
+    # Check for all races at a certain count
+    if "all_races" in requirement:
+        return _min_race_count(game_state) >= requirement["all_races"]
+    return False
+
+def building_requirement_met(game_state, requirement):
+    """Check a building milestone requirement"""
+    if "any_building" in requirement:
+        return METRICS["max_building_count"](game_state) >= requirement["any_building"]
+    if "any_building_level" in requirement:
+        return _max_building_level(game_state) >= requirement["any_building_level"]
+    # All unlocked buildings with at least one built; levels start at 1, so 0 means nothing is built yet
+    if "all_buildings" in requirement:
+        min_level = _min_building_level(game_state)
+        return min_level > 0 and min_level >= requirement["all_buildings"]
+    if "building" in requirement and "count" in requirement:
+        return METRICS["building_count"](game_state, requirement["building"]) >= requirement["count"]
+    return False
+
+def prestige_requirement_met(game_state, requirement):
+    """Check a prestige milestone requirement"""
+    return "prestige_count" in requirement and game_state.prestige_count >= requirement["prestige_count"]
+
+def time_requirement_met(game_state, requirement):
+    """Check a play time milestone requirement"""
+    return "play_time" in requirement and game_state.total_play_time >= requirement["play_time"]
+
+def race_skill_requirement_met(game_state, requirement):
+    """Check a race skill milestone requirement"""
+    if "race_skill" in requirement:
+        race_id = requirement["race_skill"]
+        if race_id not in game_state.races or not game_state.races[race_id]["unlocked"]:
+            return False
+        if "player_level" in requirement and game_state.player_level < requirement["player_level"]:
+            return False
+        if "prestige_level" in requirement and game_state.prestige_count < requirement["prestige_level"]:
+            return False
+        if "resource" in requirement and "amount" in requirement:
+            return _race_skill(game_state, race_id, requirement["resource"]) >= requirement["amount"]
+        if "all_resources" in requirement:
+            return _min_race_skill(game_state, race_id) >= requirement["all_resources"]
+        return False
+    if "player_level" in requirement and "max_play_time" in requirement:
+        return game_state.player_level >= requirement["player_level"] and game_state.total_play_time <= requirement["max_play_time"]
+    return False
+
+REQUIREMENT_CHECKS = {
+    "resource_milestones": resource_requirement_met,
+    "race_milestones": race_requirement_met,
+    "building_milestones": building_requirement_met,
+    "prestige_milestones": prestige_requirement_met,
+    "time_milestones": time_requirement_met,
+    "race_skill_milestones": race_skill_requirement_met,
+}
+
+def track_race_resource_generation(game_state, amounts, race_shares):
+    """Credit each race's share of a tick's production (vectors aligned with RESOURCE_TYPES) to its skills"""
+    credited = race_shares * amounts
+    for race_id, race_amounts in zip(RACES, credited):
+        if not race_amounts.any(): continue
+        skills = game_state.races[race_id]["skills"]
+        for resource, race_amount in zip(RESOURCE_TYPES, race_amounts):
+            if resource != "prestige_points": skills[resource] = skills.get(resource, 0) + float(race_amount)
+
+def get_race_contribution_shares(game_state, resource):
+    """Get each race's share of the race-driven production of a resource"""
+    column = game_state.get_tick_race_shares()[:, RESOURCE_TYPES.index(resource)]
+    return {race_id: float(share) for race_id, share in zip(RACES, column) if share > 0}
+
+# --- Reward Aggregates ---
+
+class AchievementRewards:
+    """Running products of every earned reward plus a flat id -> earned index, updated as achievements flip"""
+    def __init__(self, achievements):
+        self.earned = {}
+        self.resource_multipliers = {}  # <resource>_multiplier from resource milestones
+        self.all_production = 1.0
+        self.all_race_efficiency = 1.0  # From race and race skill milestones
+        self.race_efficiency = {}       # race_id -> <race>_efficiency from that race's skill milestones
+        self.race_resource_bonus = {}   # (race_id, resource) -> <race>_<resource>_bonus
+        self.building_cost_reduction = 1.0
+        for category_key, milestones in ACHIEVEMENTS.items():
+            for milestone in milestones:
+                self.earned[milestone["id"]] = False
+                if achievements.get(category_key, {}).get(milestone["id"]):
+                    self.add(category_key, milestone)
+
+    def add(self, category_key, milestone):
+        if self.earned.get(milestone["id"]):
+            return
+        self.earned[milestone["id"]] = True
+        reward = milestone["reward"]
+        if category_key == "resource_milestones":
+            for resource in RESOURCE_TYPES:
+                if f"{resource}_multiplier" in reward:
+                    self.resource_multipliers[resource] = self.resource_multipliers.get(resource, 1.0) * reward[f"{resource}_multiplier"]
+        if "all_production" in reward:
+            self.all_production *= reward["all_production"]
+        if category_key in ("race_milestones", "race_skill_milestones") and "all_race_efficiency" in reward:
+            self.all_race_efficiency *= reward["all_race_efficiency"]
+        if category_key == "building_milestones" and "building_cost_reduction" in reward:
+            self.building_cost_reduction *= reward["building_cost_reduction"]
+        race_id = milestone["requirement"].get("race_skill") if category_key == "race_skill_milestones" else None
+        if race_id:
+            if f"{race_id}_efficiency" in reward:
+                self.race_efficiency[race_id] = self.race_efficiency.get(race_id, 1.0) * reward[f"{race_id}_efficiency"]
+            for resource in RESOURCE_TYPES:
+                if f"{race_id}_{resource}_bonus" in reward:
+                    key = (race_id, resource)
+                    self.race_resource_bonus[key] = self.race_resource_bonus.get(key, 1.0) * reward[f"{race_id}_{resource}_bonus"]
+
+    def race_skill_multiplier(self, race_id, resource):
+        return self.race_resource_bonus.get((race_id, resource), 1.0) * self.race_efficiency.get(race_id, 1.0)
 
 def get_achievement_multiplier(game_state, resource):
     """Get production multiplier from achievements"""
-    multiplier = 1.0
-    
-    # Check resource-specific multipliers from resource_milestones
-    for milestone_details in ACHIEVEMENTS["resource_milestones"]:
-        milestone_id = milestone_details["id"]
-        if game_state.achievements["resource_milestones"].get(milestone_id):
-            reward = milestone_details["reward"]
-            if f"{resource}_multiplier" in reward:
-                multiplier *= reward[f"{resource}_multiplier"]
-    
-    # Check global production multipliers from all achievement categories
-    for category_key, achievement_list in ACHIEVEMENTS.items():
-        if category_key not in game_state.achievements: continue
-
-        for achievement_details in achievement_list:
-            achievement_id = achievement_details["id"]
-            if game_state.achievements[category_key].get(achievement_id):
-                reward = achievement_details["reward"]
-                if "all_production" in reward:
-                    multiplier *= reward["all_production"]
-    return multiplier
+    rewards = game_state.achievement_rewards
+    return rewards.resource_multipliers.get(resource, 1.0) * rewards.all_production
 
 def has_achievement(game_state, achievement_id):
     """Check if an achievement has been unlocked across all categories"""
-    for category_key in game_state.achievements.keys():
-        if game_state.achievements[category_key].get(achievement_id):
-            return True
-    return False
+    return game_state.achievement_rewards.earned.get(achievement_id, False)
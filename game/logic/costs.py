@@ -0,0 +1,134 @@
+import math
+
+from game import bignum
+
+# --- Bulk Cost Series ---
+# Every cost curve in the game is either linear in the owned count or geometric in the level,
+# so a bulk quote is one series sum regardless of how many units it covers.
+
+def linear_total(unit_cost, growth, start, count):
+    """Sum of unit_cost * (1 + growth * (start + i)) for i in range(count)"""
+    if count <= 0: return 0.0
+    if count < 1e150:
+        total = unit_cost * (count + growth * (count * start + count * (count - 1) / 2))
+        if abs(total) < 1e300: return total
+    n = bignum.big(count) # Counts solved from BigNum budgets: redo the sum without float overflow
+    return bignum.compact(bignum.big(unit_cost) * (n + growth * (n * start + n * (n - 1) / 2)))
+
+def geometric_total(unit_cost, ratio, start, count):
+    """Sum of unit_cost * ratio ** (start + i) for i in range(count)"""
+    if count <= 0: return 0.0
+    if ratio == 1.0: return bignum.compact(bignum.big(unit_cost) * count)
+    try:
+        total = unit_cost * ratio ** start * (ratio ** count - 1.0) / (ratio - 1.0)
+        if abs(total) < 1e300: return total
+    except OverflowError:
+        pass
+    # Past the float range (ratio > 1): the same sum on the log scale, 1 - ratio**-count kept exact via expm1
+    log_total = (bignum.log10(unit_cost) + (start + count) * math.log10(ratio)
+                 + math.log10(-math.expm1(-count * math.log(ratio))) - math.log10(ratio - 1.0))
+    return bignum.compact(bignum.from_log10(log_total))
+
+# --- Max Affordable Solver ---
+# Inverts each resource's series for the largest count its budget covers, takes the minimum across
+# resources, then corrects by whole units against the exact quote (float rounding at the boundary), bisecting
+# when the estimate is off by more than the correction window (counts past float precision).
+# Budgets may be BigNum; counts past 2**53 are only resolved to float precision.
+
+CORRECTION_STEPS = 4 # The inverse is exact up to rounding, so the whole-unit correction never needs more
+
+def max_linear_count(unit_cost, growth, start, budget):
+    """Largest real n with linear_total(unit_cost, growth, start, n) <= budget"""
+    if budget <= 0: return 0.0
+    if unit_cost <= 0: return math.inf
+    if growth == 0: return bignum.compact(budget / unit_cost)
+    b = 1.0 + growth * start - growth / 2
+    if isinstance(budget, bignum.BigNum): return bignum.compact((-b + (b * b + 2.0 * growth * budget / unit_cost) ** 0.5) / growth)
+    return (-b + math.sqrt(b * b + 2.0 * growth * budget / unit_cost)) / growth
+
+def max_geometric_count(unit_cost, ratio, start, budget):
+    """Largest real n with geometric_total(unit_cost, ratio, start, n) <= budget"""
+    if budget <= 0: return 0.0
+    if unit_cost <= 0: return math.inf
+    if ratio == 1.0: return bignum.compact(budget / unit_cost)
+    if ratio < 1.0:
+        x = 1.0 + budget * (ratio - 1.0) / (unit_cost * ratio ** start)
+        return math.inf if x <= 0 else math.log(x) / math.log(ratio)
+    # log10 of budget * (ratio - 1) / (unit_cost * ratio**start), so neither side has to fit a float
+    log_x = bignum.log10(budget) + math.log10(ratio - 1.0) - math.log10(unit_cost) - start * math.log10(ratio)
+    log_sum = log_x + math.log10(1.0 + 10.0 ** -log_x) if log_x > 0 else math.log10(1.0 + 10.0 ** log_x)
+    return log_sum / math.log10(ratio)
+
+def max_affordable(curves, resources, quote, cap=math.inf):
+    """Largest whole count, up to cap, whose quote the resources cover.
+
+    curves holds one (resource, inverse, unit_cost, rate, start) entry per priced resource, where inverse
+    is max_linear_count or max_geometric_count; quote(count) returns the exact cost dict.
+    """
+    if not curves: return 0
+    estimate = min(inverse(unit_cost, rate, start, resources.get(resource, 0)) for resource, inverse, unit_cost, rate, start in curves)
+    limit = min(estimate, cap)
+    count = int(limit) if limit != math.inf else 0 # Nothing priced: nothing to buy
+    can_pay = lambda n: all(resources.get(r, 0) >= a for r, a in quote(n).items())
+    for _ in range(CORRECTION_STEPS):
+        if count <= 0 or can_pay(count): break
+        count -= 1
+    else:
+        if count > 0 and not can_pay(count): count = _bisect_affordable(can_pay, count) # Estimate past float precision
+    for _ in range(CORRECTION_STEPS):
+        if count >= cap or not can_pay(count + 1): break
+        count += 1
+    return count
+
+def _bisect_affordable(can_pay, unaffordable):
+    """Largest count below unaffordable that can_pay accepts: widen the step down until it does, then bisect"""
+    high, step = unaffordable, CORRECTION_STEPS
+    low = max(high - step, 0)
+    while low > 0 and not can_pay(low):
+        high, step = low, step * 2
+        low = max(high - step, 0)
+    while high - low > 1:
+        middle = (low + high) // 2
+        if can_pay(middle): low = middle
+        else: high = middle
+    return low
+
+# --- Quote Cache ---
+# Panels quote the same items in update, render and the Max buy path every frame.
+
+QUOTE_GETTERS = {"race_purchase": "get_race_purchase_cost", "race_upgrade": "get_race_upgrade_cost",
+                 "building_purchase": "get_building_purchase_cost", "building_upgrade": "get_building_upgrade_cost",
+                 "research": "get_research_cost", "prestige_upgrade": "get_prestige_upgrade_cost"}
+
+class QuoteCache:
+    """Bulk quotes and Max counts shared by every UI panel, keyed by (action, item, count) per state_version.
+
+    Quotes depend only on counts, levels and achievement rewards, so they live until state_version changes
+    (any purchase, unlock or award bumps it). Max counts also depend on the resource pool, so begin_frame
+    drops them. Returned cost dicts are shared between callers and must not be modified.
+    """
+    def __init__(self, game_state):
+        self.game_state = game_state
+        self.version = None
+        self.quotes = {}
+        self.max_counts = {}
+
+    def begin_frame(self):
+        self.max_counts.clear()
+
+    def _sync(self):
+        if self.version != self.game_state.state_version:
+            self.quotes.clear(); self.max_counts.clear()
+            self.version = self.game_state.state_version
+
+    def quote(self, action, item_id, count=1):
+        self._sync()
+        key = (action, item_id, count)
+        if key not in self.quotes: self.quotes[key] = getattr(self.game_state, QUOTE_GETTERS[action])(item_id, count)
+        return self.quotes[key]
+
+    def max_affordable(self, action, item_id):
+        self._sync()
+        key = (action, item_id)
+        if key not in self.max_counts: self.max_counts[key] = self.game_state.get_max_affordable(action, item_id)
+        return self.max_counts[key]
@@ -0,0 +1,163 @@
+import numpy as np
+
+from game.constants import (RESOURCE_TYPES, RACES, BUILDINGS, RESEARCH, ACHIEVEMENTS, BASE_INCOME_RATE,
+                            PRESTIGE_BONUS_BASE, EARNINGS_PER_LEVEL)
+from game.logic.production import ContentTables, PRODUCED_MASK, GOLD_INDEX, RESOURCE_INDEX
+
+FIRST_BUILDING_REWARD = next(m["reward"]["building_cost_reduction"] for m in ACHIEVEMENTS["building_milestones"] if m["id"] == "first_building")
+
+# --- Fleet Engine ---
+
+class Fleet:
+    """Struct-of-arrays store for many realms, advanced together with vectorized production formulas.
+
+    Every column has the realm axis first: race counts/levels are (N, races), buildings (N, buildings),
+    research levels (N, research) and resources (N, RESOURCE_TYPES). The economy matches
+    calculate_resource_generation_rate / calculate_global_multiplier for races, buildings, research,
+    prestige and permanent multipliers. Race abilities, achievements and race skills are not modelled,
+    so a fleet isolates the BUILDINGS/RESEARCH economy for tuning runs. Pass tuned copies of the content
+    dicts to compare balance changes against the shipped ones.
+    """
+    def __init__(self, size, races=RACES, buildings=BUILDINGS, research=RESEARCH):
+        self.size = size
+        self.tables = ContentTables(races, buildings, research)
+        t = self.tables
+        self.race_counts = np.zeros((size, len(t.race_ids)))
+        self.race_levels = np.ones((size, len(t.race_ids)))
+        self.building_counts = np.zeros((size, len(t.building_ids)))
+        self.building_levels = np.ones((size, len(t.building_ids)))
+        self.research_levels = np.zeros((size, len(t.research_ids)))
+        self.resources = np.zeros((size, len(RESOURCE_TYPES)))
+        self.resources[:, GOLD_INDEX] = 100  # Starting gold
+        self.total_earnings = np.zeros(size)
+        self.player_level = np.ones(size, dtype=np.int64)
+        self.prestige_count = np.zeros(size)
+        self.permanent_multiplier = np.ones(size)
+        self.first_building = np.zeros(size, dtype=bool)  # "first_building" earned, the one achievement the fleet awards
+        self.building_cost_reduction = np.ones(size)  # As AchievementRewards.building_cost_reduction
+        self.unlocked = {}
+        self._update_unlocks()
+        self._rates = None
+
+    @classmethod
+    def from_game_states(cls, game_states, races=RACES, buildings=BUILDINGS, research=RESEARCH):
+        """Build a fleet from existing GameState objects (e.g. a loaded player corpus)"""
+        fleet = cls(len(game_states), races, buildings, research)
+        t = fleet.tables
+        for n, gs in enumerate(game_states):
+            for i, race_id in enumerate(t.race_ids):
+                if race_id in gs.races: fleet.race_counts[n, i], fleet.race_levels[n, i] = gs.races[race_id]["count"], gs.races[race_id]["level"]
+            for i, building_id in enumerate(t.building_ids):
+                if building_id in gs.buildings: fleet.building_counts[n, i], fleet.building_levels[n, i] = gs.buildings[building_id]["count"], gs.buildings[building_id]["level"]
+            for i, research_id in enumerate(t.research_ids):
+                if research_id in gs.research: fleet.research_levels[n, i] = gs.research[research_id]["level"]
+            fleet.resources[n] = [gs.resources[r] for r in RESOURCE_TYPES]
+            fleet.total_earnings[n], fleet.player_level[n], fleet.prestige_count[n] = gs.total_earnings, gs.player_level, gs.prestige_count
+            fleet.permanent_multiplier[n] = gs.permanent_multipliers.get("all", 1.0)
+            fleet.first_building[n] = gs.achievement_rewards.earned.get("first_building", False)
+            fleet.building_cost_reduction[n] = gs.achievement_rewards.building_cost_reduction
+        fleet._update_unlocks()
+        return fleet
+
+    def _update_unlocks(self):
+        t = self.tables
+        for kind in ("races", "buildings", "research"):
+            reached = (t.unlock_levels[kind] <= self.player_level[:, None]) & (t.unlock_prestige[kind] <= self.prestige_count[:, None])
+            self.unlocked[kind] = self.unlocked.get(kind, False) | reached
+
+    def production_rates(self):
+        """Effective production per second for every realm and resource, shape (N, RESOURCE_TYPES)"""
+        if self._rates is not None:
+            return self._rates
+        t = self.tables
+        research_levels = self.research_levels * self.unlocked["research"]
+
+        race_active = self.unlocked["races"] & (self.race_counts > 0)
+        race_bonus_mult = (1.0 + t.research_race_bonus_effects * research_levels).prod(axis=1)
+        race_income = BASE_INCOME_RATE * self.race_counts * self.race_levels * race_active
+        rates = np.repeat(race_income.sum(axis=1)[:, None], len(RESOURCE_TYPES), axis=1)
+        for i, k in zip(*np.nonzero(t.race_bonus_mask)):
+            rates[:, k] += race_income[:, i] * (t.race_bonuses[i, k] * race_bonus_mult - 1.0)
+
+        building_active = self.unlocked["buildings"] & (self.building_counts > 0)
+        scaled = self.building_counts * np.power(t.building_level_scaling, self.building_levels - 1) * building_active
+        rates += scaled @ t.building_production
+        flat = np.where(research_levels > 0, t.research_flat_bonus * np.power(t.research_effect_scaling, research_levels - 1), 0.0)
+        rates += flat.sum(axis=1)[:, None]
+
+        multipliers = t.building_multipliers(self.building_levels, building_active)
+        multipliers *= t.research_multipliers(research_levels)
+        multipliers *= ((1.0 + self.prestige_count * PRESTIGE_BONUS_BASE) * self.permanent_multiplier)[:, None]
+
+        rates *= multipliers
+        rates[:, ~PRODUCED_MASK] = 0.0
+        self._rates = rates
+        return rates
+
+    def advance(self, seconds, steps=1):
+        """Advance every realm by seconds of game time, in equal steps so level-up unlocks land between them"""
+        dt = seconds / steps
+        for _ in range(steps):
+            produced = self.production_rates() * dt
+            self.resources += produced
+            self.total_earnings += produced[:, GOLD_INDEX]
+            self.player_level = np.maximum(self.player_level, 1 + (self.total_earnings // EARNINGS_PER_LEVEL).astype(np.int64))
+            self._update_unlocks()
+
+    # --- Vectorized purchases (closed-form bulk costs, applied only where affordable) ---
+
+    def _spend(self, costs, eligible):
+        affordable = eligible & (self.resources >= costs).all(axis=1)
+        self.resources -= costs * affordable[:, None]
+        self._rates = None
+        return affordable
+
+    def buy_races(self, race_id, count=1, mask=True):
+        """Recruit count of a race in every realm where it is unlocked and affordable; returns the bought mask"""
+        i = self.tables.race_ids.index(race_id)
+        c, n = self.race_counts[:, i], np.broadcast_to(count, self.size)
+        costs = np.zeros_like(self.resources)
+        costs[:, GOLD_INDEX] = self.tables.race_base_costs[i] * (n + 0.15 * (n * c + n * (n - 1) / 2))
+        bought = self._spend(costs, mask & self.unlocked["races"][:, i] & (n > 0))
+        self.race_counts[:, i] += n * bought
+        return bought
+
+    def upgrade_races(self, race_id, count=1, mask=True):
+        i = self.tables.race_ids.index(race_id)
+        l = self.race_levels[:, i]
+        n = np.minimum(np.broadcast_to(count, self.size), self.tables.race_max_levels[i] - l)
+        costs = np.zeros_like(self.resources)
+        costs[:, GOLD_INDEX] = self.tables.race_base_costs[i] * 5 * np.power(2.0, l - 1) * (np.power(2.0, n) - 1)
+        bought = self._spend(costs, mask & self.unlocked["races"][:, i] & (self.race_counts[:, i] > 0) & (n > 0))
+        self.race_levels[:, i] += n * bought
+        return bought
+
+    def buy_buildings(self, building_id, count=1, mask=True):
+        i = self.tables.building_ids.index(building_id)
+        c, n = self.building_counts[:, i], np.broadcast_to(count, self.size)
+        costs = self.tables.building_base_costs[i] * ((n + 0.2 * (n * c + n * (n - 1) / 2)) * self.building_cost_reduction)[:, None]
+        bought = self._spend(costs, mask & self.unlocked["buildings"][:, i] & (n > 0))
+        self.building_counts[:, i] += n * bought
+        self.building_cost_reduction[bought & ~self.first_building] *= FIRST_BUILDING_REWARD
+        self.first_building |= bought
+        return bought
+
+    def upgrade_buildings(self, building_id, count=1, mask=True):
+        i = self.tables.building_ids.index(building_id)
+        l = self.building_levels[:, i]
+        n = np.minimum(np.broadcast_to(count, self.size), self.tables.building_max_levels[i] - l)
+        costs = self.tables.building_base_costs[i] * (np.power(2.0, l - 1) * 2.0 * (np.power(2.0, n) - 1) * self.building_cost_reduction)[:, None]
+        bought = self._spend(costs, mask & self.unlocked["buildings"][:, i] & (self.building_counts[:, i] > 0) & (n > 0))
+        self.building_levels[:, i] += n * bought
+        return bought
+
+    def research(self, research_id, mask=True):
+        i = self.tables.research_ids.index(research_id)
+        l = self.research_levels[:, i]
+        costs = self.tables.research_costs[i] * np.power(self.tables.research_cost_scaling[i], l)[:, None]
+        bought = self._spend(costs, mask & self.unlocked["research"][:, i] & (l < self.tables.research_max_levels[i]))
+        self.research_levels[:, i] += bought
+        return bought
+
+    def resource_column(self, resource):
+        return self.resources[:, RESOURCE_INDEX[resource]]
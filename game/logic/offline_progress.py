@@ -0,0 +1,202 @@
+import math
+
+from game.constants import RACES, BUILDINGS, RESEARCH, ACHIEVEMENTS, EARNINGS_PER_LEVEL
+from game.logic import achievements as achievement_logic
+from game.logic import race_abilities as ability_logic
+from game.logic import production as production_logic
+
+# Safety net: a week offline normally needs a few hundred segments (two alignment boundaries per hour plus level-ups).
+MAX_OFFLINE_SEGMENTS = 1000
+MIN_SEGMENT_SECONDS = 1.0 # Keeps float rounding at a threshold from producing runs of near-empty segments
+
+# --- Offline Progress Integration ---
+
+def integrate_offline_progress(game_state, offline_seconds, offline_rate, start_time):
+    """Advance the realm over an offline span, split at every event that changes production.
+
+    Each segment has constant rates, so it is integrated in closed form. The feedback loops on gold
+    (gold_storage_bonus, where the gold rate grows with the gold pool, and passive_generation, where every
+    rate grows with the player level and so with gold earned) are integrated exponentially.
+    Chance-based abilities are drawn once per segment through the realm's randomness policy.
+    Returns the number of segments evaluated.
+    """
+    elapsed = 0.0
+    segments = 0
+    while elapsed < offline_seconds:
+        remaining = offline_seconds - elapsed
+        segments += 1
+        if segments >= MAX_OFFLINE_SEGMENTS:
+            segment = remaining
+        else:
+            boundary = _next_boundary(game_state, start_time + elapsed, offline_rate) or remaining
+            segment = min(remaining, max(boundary, MIN_SEGMENT_SECONDS))
+        _integrate_segment(game_state, segment * offline_rate, start_time + elapsed)
+        elapsed += segment
+        game_state.check_unlocks()
+        achievement_logic.check_achievements(game_state)
+    return segments
+
+def _integrate_segment(game_state, virtual_seconds, wall_time):
+    game_state.begin_tick()
+    ability_logic.apply_special_resource_generation(game_state, virtual_seconds)
+
+    plan = game_state.get_production_plan()
+    # Doubling is drawn over all the steps of the segment at once (binomial, or its expectation)
+    doubling = game_state.randomness.doubling_factors(ability_logic.get_production_doubling_chance(game_state), virtual_seconds, len(plan.rates))
+    scale = ability_logic.get_time_based_modifier(game_state, None, wall_time) * doubling
+    rates = plan.rates * plan.multipliers * scale
+    amounts = rates * virtual_seconds
+
+    base, slope = _gold_rate_coefficients(game_state, plan.multipliers[production_logic.GOLD_INDEX] * scale[production_logic.GOLD_INDEX])
+    gold_gain, gold_gain_integral = _integrate_gold(game_state.resources["gold"], base, slope, virtual_seconds)
+    amounts += _passive_level_slope(game_state) * plan.multipliers * scale * production_logic.PRODUCED_MASK * gold_gain_integral # Levels gained within the segment
+    amounts[production_logic.GOLD_INDEX] = gold_gain
+
+    prestige_rate = ability_logic.get_passive_prestige_rate(game_state)
+    if prestige_rate > 0:
+        points = prestige_rate * (game_state.total_earnings * virtual_seconds + gold_gain_integral)
+        game_state.resources["prestige_points"] = game_state.resources.get("prestige_points", 0) + points
+        game_state.total_prestige_points += points
+
+    game_state.resources.add(amounts)
+    game_state.total_earnings += float(gold_gain)
+    achievement_logic.track_race_resource_generation(game_state, amounts, game_state.get_tick_race_shares())
+
+def _passive_level_slope(game_state):
+    """Growth of every base rate per gold earned from passive_generation, which scales with the player level.
+
+    Levels are treated as continuous within a segment (one per EARNINGS_PER_LEVEL earned), so level-ups
+    need no segment boundaries of their own.
+    """
+    return ability_logic.get_passive_generation_rate(game_state, None) / game_state.player_level / EARNINGS_PER_LEVEL
+
+def _gold_rate_coefficients(game_state, multiplier):
+    """Split the effective gold rate into base + slope * gold (slope from gold_storage_bonus and passive_generation)"""
+    plan = game_state.get_production_plan()
+    gold = game_state.resources["gold"]
+    if "gold" not in ability_logic.get_state_dependent_resources(game_state):
+        rate_now, slope = plan.rates[production_logic.GOLD_INDEX], 0.0
+    else:
+        rate_now = game_state.calculate_resource_generation_rate("gold")
+        game_state.resources["gold"] = gold + EARNINGS_PER_LEVEL
+        slope = (game_state.calculate_resource_generation_rate("gold") - rate_now) / EARNINGS_PER_LEVEL
+        game_state.resources["gold"] = gold
+    slope += _passive_level_slope(game_state) # Gold earned from here on is gold added to the pool
+    return (rate_now - slope * gold) * multiplier, slope * multiplier
+
+def _integrate_gold(gold, base, slope, seconds):
+    """Return (gain, integral of gain over the segment) for dG/dt = base + slope * G"""
+    if slope <= 0:
+        return base * seconds, base * seconds * seconds / 2
+    c = gold + base / slope
+    growth = math.expm1(slope * seconds)
+    return c * growth, c * (growth / slope - seconds)
+
+def _time_to_gold_gain(gold, base, slope, gain):
+    """Virtual seconds until the gold pool has grown by gain, or None if it never does"""
+    if gain <= 0:
+        return 0.0
+    if slope <= 0:
+        return gain / base if base > 0 else None
+    c = gold + base / slope
+    return math.log1p(gain / c) / slope if c > 0 else None
+
+def _time_to_gain(rate, growth, gold, base, slope, gain):
+    """Virtual seconds until a resource produced at rate + growth * (gold earned so far) has grown by gain, or None"""
+    if gain <= 0:
+        return 0.0
+    if growth <= 0:
+        return gain / rate if rate > 0 else None
+    gained = lambda seconds: rate * seconds + growth * _integrate_gold(gold, base, slope, seconds)[1]
+    low, high = 0.0, 1.0
+    for _ in range(200):
+        if gained(high) >= gain: break
+        low, high = high, high * 2
+    else:
+        return None
+    for _ in range(60): # Bisection; gained is increasing
+        middle = (low + high) / 2
+        if gained(middle) >= gain: high = middle
+        else: low = middle
+    return high
+
+def _next_boundary(game_state, wall_time, offline_rate):
+    """Wall-clock seconds until the next event that changes production, or None"""
+    virtual_candidates = []
+
+    plan = game_state.get_production_plan()
+    scale = ability_logic.get_time_based_modifier(game_state, None, wall_time) * (1.0 + ability_logic.get_production_doubling_chance(game_state))
+    rates = plan.rates * plan.multipliers * scale
+    gold = game_state.resources["gold"]
+    base, slope = _gold_rate_coefficients(game_state, plan.multipliers[production_logic.GOLD_INDEX] * scale)
+    growth = _passive_level_slope(game_state) * plan.multipliers * scale * production_logic.PRODUCED_MASK
+
+    target_level = _next_relevant_level(game_state)
+    if target_level is not None:
+        virtual_candidates.append(_time_to_gold_gain(gold, base, slope, (target_level - 1) * EARNINGS_PER_LEVEL - game_state.total_earnings))
+
+    for milestone in ACHIEVEMENTS["resource_milestones"]:
+        if game_state.achievements["resource_milestones"].get(milestone["id"]):
+            continue
+        crossing = 0.0
+        for resource, amount in milestone["requirement"].items():
+            shortfall = amount - game_state.resources.get(resource, 0)
+            if resource == "gold":
+                until = _time_to_gold_gain(gold, base, slope, shortfall)
+            else:
+                i = production_logic.RESOURCE_INDEX[resource]
+                until = _time_to_gain(rates[i], growth[i], gold, base, slope, shortfall)
+            if until is None:
+                crossing = None
+                break
+            crossing = max(crossing, until)
+        virtual_candidates.append(crossing)
+
+    for milestone in ACHIEVEMENTS["race_skill_milestones"]:
+        if not game_state.achievements["race_skill_milestones"].get(milestone["id"]):
+            virtual_candidates.append(_time_to_skill_milestone(game_state, milestone["requirement"], rates, growth, gold, base, slope))
+
+    # Crossings already in the past are picked up by the checks at the end of the segment
+    wall_candidates = [c / offline_rate for c in virtual_candidates if c is not None and c > 0]
+    window = ability_logic.get_time_modifier_boundary(game_state, wall_time)
+    if window is not None and window > 0: wall_candidates.append(window)
+    return min(wall_candidates) if wall_candidates else None
+
+def _time_to_skill_milestone(game_state, requirement, rates, growth, gold, base, slope):
+    """Virtual seconds until a race skill requirement is met at current shares, or None"""
+    race_id = requirement.get("race_skill")
+    if race_id not in game_state.races or not game_state.races[race_id]["unlocked"]:
+        return None
+    if game_state.player_level < requirement.get("player_level", 0) or game_state.prestige_count < requirement.get("prestige_level", 0):
+        return None
+    if "resource" in requirement:
+        targets = {requirement["resource"]: requirement["amount"]}
+    elif "all_resources" in requirement:
+        targets = {resource: requirement["all_resources"] for resource in production_logic.PRODUCED_RESOURCES}
+    else:
+        return None
+    crossing = 0.0
+    for resource, amount in targets.items():
+        shortfall = amount - game_state.races[race_id]["skills"].get(resource, 0)
+        if shortfall <= 0: continue
+        i = production_logic.RESOURCE_INDEX[resource]
+        share = achievement_logic.get_race_contribution_shares(game_state, resource).get(race_id, 0.0)
+        until = _time_to_gain(share * rates[i], share * growth[i], gold, base, slope, shortfall)
+        if until is None:
+            return None
+        crossing = max(crossing, until)
+    return crossing
+
+def _next_relevant_level(game_state):
+    """Lowest player level above the current one at which unlocks can change (passive_generation's per-level
+    growth is integrated within segments, see _passive_level_slope)"""
+    levels = []
+    for content, state in ((RACES, game_state.races), (BUILDINGS, game_state.buildings), (RESEARCH, game_state.research)):
+        for item_id, info in content.items():
+            if not state[item_id]["unlocked"] and info["unlock_level"] > game_state.player_level and game_state.prestige_count >= info.get("requires_prestige", 0):
+                levels.append(info["unlock_level"])
+    for milestone in ACHIEVEMENTS["race_skill_milestones"]:
+        level = milestone["requirement"].get("player_level", 0)
+        if level > game_state.player_level and not game_state.achievements["race_skill_milestones"].get(milestone["id"]):
+            levels.append(level)
+    return min(levels) if levels else None
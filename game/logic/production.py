@@ -0,0 +1,261 @@
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from game import bignum
+from game.constants import RESOURCE_TYPES, RACES, BUILDINGS, RESEARCH, BASE_INCOME_RATE, PRESTIGE_BONUS_BASE
+from game.logic import achievements as achievement_logic
+from game.logic import race_abilities as ability_logic
+
+# --- Static Content Tables ---
+# Everything below is derived once from the content definitions so a plan compile is a handful of array ops.
+
+RESOURCE_INDEX = {resource: i for i, resource in enumerate(RESOURCE_TYPES)}
+PRODUCED_RESOURCES = [resource for resource in RESOURCE_TYPES if resource != "prestige_points"]
+PRODUCED_MASK = np.array([resource != "prestige_points" for resource in RESOURCE_TYPES])
+GOLD_INDEX = RESOURCE_INDEX["gold"]
+
+def _cost_matrix(items, key):
+    costs = np.zeros((len(items), len(RESOURCE_TYPES)))
+    for i, info in enumerate(items.values()):
+        for resource, amount in info.get(key, {}).items():
+            costs[i, RESOURCE_INDEX[resource]] = amount
+    return costs
+
+class ContentTables:
+    """Arrays derived from one set of RACES/BUILDINGS/RESEARCH definitions, indexed like RESOURCE_TYPES.
+
+    The game uses DEFAULT_TABLES; the fleet engine can build tables for tuned copies of the content.
+    """
+    def __init__(self, races=RACES, buildings=BUILDINGS, research=RESEARCH):
+        self.race_ids, self.building_ids, self.research_ids = list(races), list(buildings), list(research)
+        n_res = len(RESOURCE_TYPES)
+
+        self.race_bonuses = np.ones((len(races), n_res))
+        self.race_bonus_mask = np.zeros((len(races), n_res), dtype=bool)
+        for i, info in enumerate(races.values()):
+            for resource, bonus_cfg in info.get("resource_bonuses", {}).items():
+                self.race_bonuses[i, RESOURCE_INDEX[resource]] = bonus_cfg.get("base", bonus_cfg) if isinstance(bonus_cfg, dict) else bonus_cfg
+                self.race_bonus_mask[i, RESOURCE_INDEX[resource]] = True
+        self.race_base_costs = np.array([info["base_cost"] for info in races.values()], dtype=float)
+        self.race_max_levels = np.array([info.get("max_level", np.inf) for info in races.values()], dtype=float)
+
+        self.building_production = _cost_matrix(buildings, "resource_production")
+        self.building_level_scaling = np.array([info.get("level_scaling", 1.0) for info in buildings.values()])
+        self.building_multiplier_scaling = np.array([info.get(info.get("level_scaling_multiplier_key", "level_scaling"), 1.0) for info in buildings.values()])
+        self.building_global_multipliers = np.ones((len(buildings), n_res))
+        self.building_global_mask = np.zeros((len(buildings), n_res), dtype=bool)
+        self.building_all_multipliers = np.ones(len(buildings))
+        self.building_all_mask = np.zeros(len(buildings), dtype=bool)
+        for i, info in enumerate(buildings.values()):
+            for target, mult in info.get("global_multipliers", {}).items():
+                if target == "all":
+                    self.building_all_multipliers[i], self.building_all_mask[i] = mult, True
+                else:
+                    self.building_global_multipliers[i, RESOURCE_INDEX[target]], self.building_global_mask[i, RESOURCE_INDEX[target]] = mult, True
+        self.building_base_costs = _cost_matrix(buildings, "base_cost")
+        self.building_max_levels = np.array([info["max_level"] for info in buildings.values()], dtype=float)
+
+        self.research_resource_effects = np.zeros((len(research), n_res))
+        self.research_global_effects = np.zeros(len(research))
+        self.research_race_bonus_effects = np.zeros(len(research))
+        self.research_flat_bonus = np.zeros(len(research))
+        self.research_effect_scaling = np.array([info.get("effect_scaling", 1.0) for info in research.values()])
+        for i, info in enumerate(research.values()):
+            effect, scaling = info.get("effect", {}), info.get("effect_scaling", 1.0)
+            for resource, mult in effect.get("resource_multiplier", {}).items():
+                self.research_resource_effects[i, RESOURCE_INDEX[resource]] = (mult - 1.0) * scaling
+            if "global_multiplier" in effect:
+                self.research_global_effects[i] = (effect["global_multiplier"] - 1.0) * scaling
+            if "race_bonus_multiplier" in effect:
+                self.research_race_bonus_effects[i] = (effect["race_bonus_multiplier"] - 1.0) * scaling
+            if "idle_resource_generation" in effect:
+                self.research_flat_bonus[i] = effect["idle_resource_generation"]
+        self.research_costs = _cost_matrix(research, "cost")
+        self.research_cost_scaling = np.array([info["cost_scaling"] for info in research.values()])
+        self.research_max_levels = np.array([info["max_level"] for info in research.values()], dtype=float)
+
+        self.unlock_levels = {kind: np.array([info["unlock_level"] for info in items.values()])
+                              for kind, items in (("races", races), ("buildings", buildings), ("research", research))}
+        self.unlock_prestige = {kind: np.array([info.get("requires_prestige", 0) for info in items.values()])
+                                for kind, items in (("races", races), ("buildings", buildings), ("research", research))}
+
+        self._building_global_entries = list(zip(*np.nonzero(self.building_global_mask)))
+        self._building_all_entries = np.flatnonzero(self.building_all_mask)
+        self._research_resource_entries = list(zip(*np.nonzero(self.research_resource_effects)))
+
+    def building_multipliers(self, levels, active):
+        """Global multipliers from buildings per resource; levels/active may carry leading realm axes.
+
+        The multiplier tables are sparse, so this walks the (building, resource) entries that are set
+        and stays cheap when the leading axis holds 100k realms.
+        """
+        lvl_bonus = np.where(levels > 1, (self.building_multiplier_scaling - 1.0) * (levels - 1), 0.0)
+        multipliers = np.ones(levels.shape[:-1] + (len(RESOURCE_TYPES),))
+        for i, k in self._building_global_entries:
+            mult = self.building_global_multipliers[i, k]
+            factor = mult + lvl_bonus[..., i] if mult >= 1.0 else mult * (1.0 + lvl_bonus[..., i])
+            multipliers[..., k] *= np.where(active[..., i], factor, 1.0)
+        for i in self._building_all_entries:
+            mult = self.building_all_multipliers[i]
+            factor = mult + lvl_bonus[..., i] if mult >= 1.0 else mult * (1.0 + lvl_bonus[..., i])
+            multipliers *= np.where(active[..., i], factor, 1.0)[..., None]
+        return multipliers
+
+    def research_multipliers(self, levels):
+        """Research multipliers per resource for research levels (locked research passed as level 0)"""
+        multipliers = np.ones(levels.shape[:-1] + (len(RESOURCE_TYPES),))
+        for i, k in self._research_resource_entries:
+            multipliers[..., k] *= 1.0 + self.research_resource_effects[i, k] * levels[..., i]
+        for i in np.flatnonzero(self.research_global_effects):
+            multipliers *= (1.0 + self.research_global_effects[i] * levels[..., i])[..., None]
+        return multipliers
+
+DEFAULT_TABLES = ContentTables()
+RACE_IDS, BUILDING_IDS, RESEARCH_IDS = DEFAULT_TABLES.race_ids, DEFAULT_TABLES.building_ids, DEFAULT_TABLES.research_ids
+
+# --- Resource Pool ---
+
+RESCALE_LIMIT = 1e300 # A slot past this moves its magnitude into the slot's exponent
+
+class ResourcePool(MutableMapping):
+    """Dict view over a float vector indexed by RESOURCE_TYPES; the tick loop adds to it through add().
+
+    A resource that outgrows floats is held as vector[i] * 10**exponents[i] (exponents stay 0 until then),
+    reads of such a slot return a BigNum, and add() scales incoming float amounts to match.
+    """
+    def __init__(self, amounts=None):
+        self.vector = np.zeros(len(RESOURCE_TYPES))
+        self.exponents = np.zeros(len(RESOURCE_TYPES), dtype=np.int64)
+        self._scale = None # 10**-exponents once any slot is scaled
+        if amounts:
+            for resource, amount in amounts.items():
+                if resource in RESOURCE_INDEX: self[resource] = bignum.from_json(amount)
+
+    def add(self, amounts):
+        """Add a float vector of amounts (aligned with RESOURCE_TYPES)"""
+        if self._scale is not None: amounts = amounts * self._scale
+        self.vector += amounts
+        if self.vector.max() > RESCALE_LIMIT: self._rescale((self.vector > RESCALE_LIMIT) & np.isfinite(self.vector))
+
+    def _rescale(self, slots):
+        shift = np.floor(np.log10(self.vector[slots])).astype(np.int64)
+        self.vector[slots] /= 10.0 ** shift
+        self.exponents[slots] += shift
+        self._scale = 10.0 ** -self.exponents.astype(float) if self.exponents.any() else None
+
+    def amounts(self, vector=None):
+        """Resource dict for the pool, or for another vector in the pool's scale (e.g. an interpolated one)"""
+        vector = self.vector if vector is None else vector
+        if self._scale is None: return dict(zip(RESOURCE_TYPES, vector.tolist()))
+        return {resource: bignum.compact(bignum.BigNum(vector[i], self.exponents[i])) for resource, i in RESOURCE_INDEX.items()}
+
+    def __getitem__(self, resource):
+        i = RESOURCE_INDEX[resource]
+        if self._scale is None or not self.exponents[i]: return float(self.vector[i])
+        return bignum.compact(bignum.BigNum(self.vector[i], self.exponents[i]))
+
+    def __setitem__(self, resource, amount):
+        i = RESOURCE_INDEX[resource]
+        exponent = amount.exponent if isinstance(amount, bignum.BigNum) and amount.exponent >= bignum.FLOAT_EXPONENT_LIMIT else 0
+        self.vector[i] = amount.mantissa if exponent else float(amount)
+        if (exponent or self._scale is not None) and exponent != self.exponents[i]:
+            self.exponents[i] = exponent
+            self._scale = 10.0 ** -self.exponents.astype(float) if self.exponents.any() else None
+
+    def __delitem__(self, resource):
+        raise TypeError("Resources can't be removed from the pool")
+
+    def __iter__(self):
+        return iter(RESOURCE_TYPES)
+
+    def __len__(self):
+        return len(RESOURCE_TYPES)
+
+    def __contains__(self, resource):
+        return resource in RESOURCE_INDEX
+
+    def copy(self):
+        return self.amounts()
+
+    def __repr__(self):
+        return f"ResourcePool({self.copy()!r})"
+
+# --- Production Plan ---
+
+class ProductionPlan:
+    """Per-resource base rates and global multipliers, aligned with RESOURCE_TYPES.
+
+    race_shares (races x RESOURCE_TYPES, rows in RACE_IDS order) is each race's share of the
+    race-driven base production, emitted by the same pass for skill tracking.
+    """
+    def __init__(self, rates, multipliers, race_shares):
+        self.rates = rates
+        self.multipliers = multipliers
+        self.race_shares = race_shares
+
+    def __getitem__(self, resource):
+        i = RESOURCE_INDEX[resource]
+        return float(self.rates[i]), float(self.multipliers[i])
+
+def _race_columns(game_state):
+    counts = np.array([game_state.races[r]["count"] for r in RACE_IDS], dtype=float)
+    levels = np.array([game_state.races[r]["level"] for r in RACE_IDS], dtype=float)
+    active = np.array([game_state.races[r]["unlocked"] and game_state.races[r]["count"] > 0 for r in RACE_IDS])
+    return counts, levels, active
+
+def _building_columns(game_state):
+    counts = np.array([game_state.buildings[b]["count"] for b in BUILDING_IDS], dtype=float)
+    levels = np.array([game_state.buildings[b]["level"] for b in BUILDING_IDS], dtype=float)
+    active = np.array([game_state.buildings[b]["unlocked"] and game_state.buildings[b]["count"] > 0 for b in BUILDING_IDS])
+    return counts, levels, active
+
+def compute_race_contributions(game_state):
+    """Base production of every race per resource (races x RESOURCE_TYPES), before global multipliers"""
+    tables = DEFAULT_TABLES
+    race_counts, race_levels, race_active = _race_columns(game_state)
+    if not race_active.any():
+        return np.zeros((len(RACE_IDS), len(RESOURCE_TYPES)))
+    race_bonus = np.where(tables.race_bonus_mask, tables.race_bonuses * game_state.get_race_bonus_multiplier(), 1.0)
+    per_race = np.ones_like(race_bonus)
+    for i in np.flatnonzero(race_active):
+        race_id = RACE_IDS[i]
+        per_race[i] = [ability_logic.get_race_specific_ability_bonus(game_state, race_id, r) * game_state.get_race_skill_multiplier(race_id, r)
+                       for r in RESOURCE_TYPES]
+    return (BASE_INCOME_RATE * race_counts * race_levels * race_active)[:, None] * race_bonus * per_race
+
+def contribution_shares(contributions):
+    """Normalize race contributions per resource column; columns without race production stay zero"""
+    totals = contributions.sum(axis=0)
+    return np.divide(contributions, totals, out=np.zeros_like(contributions), where=totals > 0)
+
+def compile_production_plan(game_state):
+    """Vectorized equivalent of calculate_resource_generation_rate / calculate_global_multiplier for every resource"""
+    # Base rates: passive + races + buildings + research flat bonus
+    rates = np.zeros(len(RESOURCE_TYPES))
+    rates += ability_logic.get_passive_generation_rate(game_state, None)
+
+    tables = DEFAULT_TABLES
+    race_contributions = compute_race_contributions(game_state)
+    rates += race_contributions.sum(axis=0)
+
+    b_counts, b_levels, b_active = _building_columns(game_state)
+    b_scaled = b_counts * np.power(tables.building_level_scaling, b_levels - 1) * b_active
+    rates += b_scaled @ tables.building_production
+
+    rates += game_state.get_research_flat_bonus(None)
+
+    # Global multipliers
+    multipliers = tables.building_multipliers(b_levels, b_active)
+    multipliers *= np.array([ability_logic.get_race_ability_multiplier(game_state, r) * achievement_logic.get_achievement_multiplier(game_state, r)
+                             for r in RESOURCE_TYPES])
+
+    r_levels = np.array([game_state.research[r]["level"] if game_state.research[r]["unlocked"] else 0 for r in RESEARCH_IDS], dtype=float)
+    multipliers *= tables.research_multipliers(r_levels)
+
+    multipliers *= 1.0 + game_state.prestige_count * PRESTIGE_BONUS_BASE
+    multipliers *= np.array([game_state.permanent_multipliers.get(r, 1.0) for r in RESOURCE_TYPES])
+    multipliers *= game_state.permanent_multipliers.get("all", 1.0)
+
+    rates[~PRODUCED_MASK] = 0.0
+    return ProductionPlan(rates, multipliers, contribution_shares(race_contributions))
@@ -1,11 +1,10 @@
-import random
-import time # Make sure time is imported if used (e.g. in get_time_based_modifier)
 from game.constants import RACES, RESOURCE_TYPES, BUILDINGS # BUILDINGS needed for one ability effect
 
 # --- Race Ability Logic ---
 
-def check_race_ability_unlocks(game_state):
-    """Check if any race abilities can be unlocked"""
+def get_pending_race_abilities(game_state):
+    """Get (race_id, ability_id) pairs whose race level and prestige requirements are met but which are still locked"""
+    pending = []
     for race_id, race_data in game_state.races.items():
         if race_data["unlocked"] and race_data["count"] > 0:
             race_info = RACES[race_id]
@@ -31,20 +30,24 @@ def check_race_ability_unlocks(game_state):
                     continue
                 if game_state.prestige_count < req["prestige_level"]:
                     continue
-                    
-                can_afford_resources = True
-                for resource, amount in req["resources"].items():
-                    if game_state.resources.get(resource, 0) < amount:
-                        can_afford_resources = False
-                        break
-                if not can_afford_resources:
-                    continue
-                    
-                race_data["abilities"][ability_id]["unlocked"] = True
-                for resource, amount in req["resources"].items():
-                    game_state.resources[resource] -= amount
-                
-                game_state.add_notification(f"New race ability unlocked: {race_info['name']} - {ability_info['name']}!", notification_type="unlock")
+                pending.append((race_id, ability_id))
+    return pending
+
+def try_unlock_race_ability(game_state, race_id, ability_id):
+    """Unlock a pending race ability if its resource requirement can be paid"""
+    race_info = RACES[race_id]
+    ability_info = race_info["special_abilities"][ability_id]
+    req = ability_info["unlock_requirements"]
+    for resource, amount in req["resources"].items():
+        if game_state.resources.get(resource, 0) < amount:
+            return False
+            
+    game_state.races[race_id]["abilities"][ability_id]["unlocked"] = True
+    for resource, amount in req["resources"].items():
+        game_state.resources[resource] -= amount
+    game_state.invalidate_production_plan()
+    game_state.add_notification(f"New race ability unlocked: {race_info['name']} - {ability_info['name']}!", notification_type="unlock")
+    return True
 
 def activate_race_ability(game_state, race_id, ability_id):
     """Activate a race ability"""
@@ -61,6 +64,7 @@ def activate_race_ability(game_state, race_id, ability_id):
         return False
         
     ability_data["active"] = not ability_data["active"]
+    game_state.invalidate_production_plan()
     
     race_info = RACES[race_id]
     ability_info = race_info["special_abilities"][ability_id]
@@ -69,35 +73,58 @@ def activate_race_ability(game_state, race_id, ability_id):
     
     return True
 
+# --- Active Effect Registry ---
+# Hooks run per resource per tick, so they read the active effects bucketed by key instead of walking all content.
+
+SPECIAL_GENERATION_EFFECTS = ("random_resource_generation", "resource_conversion", "resource_transmutation", "stone_to_crystal_conversion", "parallel_production")
+
+class ActiveEffects:
+    """Effects of every unlocked and active ability, rebuilt when the realm's state_version changes"""
+    def __init__(self, game_state):
+        self.version = game_state.state_version
+        self.by_race = {}  # race_id -> effects of its active abilities (unlocked races, any count)
+        self.by_kind = {}  # effect key -> effects dicts providing it (races with at least one unit)
+        self.special = []  # effects with any special generation effect, in race/ability order
+        for race_id, race_data in game_state.races.items():
+            race_info = RACES[race_id]
+            if not race_data["unlocked"] or "special_abilities" not in race_info or "abilities" not in race_data:
+                continue
+            for ability_id, ability_state in race_data["abilities"].items():
+                if not ability_state["unlocked"] or not ability_state["active"]:
+                    continue
+                effects = race_info["special_abilities"][ability_id]["effects"]
+                self.by_race.setdefault(race_id, []).append(effects)
+                if race_data["count"] <= 0:
+                    continue
+                for key in effects:
+                    self.by_kind.setdefault(key, []).append(effects)
+                if any(key in effects for key in SPECIAL_GENERATION_EFFECTS):
+                    self.special.append(effects)
+
+    def get(self, key):
+        return self.by_kind.get(key, ())
+
+def get_active_effects(game_state):
+    """Get the active effect registry, rebuilding it if abilities, races or unlocks changed"""
+    registry = game_state.active_effects
+    if registry is None or registry.version != game_state.state_version:
+        registry = game_state.active_effects = ActiveEffects(game_state)
+    return registry
+
 def get_race_ability_multiplier(game_state, resource):
     """Get the multiplier for a resource from race abilities"""
+    active = get_active_effects(game_state)
     multiplier = 1.0
-    
-    for race_id, race_data in game_state.races.items():
-        if not race_data["unlocked"] or race_data["count"] <= 0:
-            continue
-            
-        race_info = RACES[race_id]
-        if "special_abilities" not in race_info or "abilities" not in race_data:
-            continue
-            
-        for ability_id, ability_state in race_data["abilities"].items():
-            if not ability_state["unlocked"] or not ability_state["active"]:
-                continue
-                
-            ability_info = race_info["special_abilities"][ability_id]
-            effects = ability_info["effects"]
-            
-            if f"{resource}_multiplier" in effects:
-                multiplier *= effects[f"{resource}_multiplier"]
-            if "all_resources_multiplier" in effects:
-                multiplier *= effects["all_resources_multiplier"]
-            if "building_efficiency" in effects:
-                for building_id_iter, building_data_iter in game_state.buildings.items():
-                    if building_data_iter["count"] > 0 and "resource_production" in BUILDINGS[building_id_iter]:
-                        if resource in BUILDINGS[building_id_iter]["resource_production"]:
-                            multiplier *= effects["building_efficiency"]
-                            break 
+    for effects in active.get(f"{resource}_multiplier"):
+        multiplier *= effects[f"{resource}_multiplier"]
+    for effects in active.get("all_resources_multiplier"):
+        multiplier *= effects["all_resources_multiplier"]
+    for effects in active.get("building_efficiency"):
+        for building_id_iter, building_data_iter in game_state.buildings.items():
+            if building_data_iter["count"] > 0 and "resource_production" in BUILDINGS[building_id_iter]:
+                if resource in BUILDINGS[building_id_iter]["resource_production"]:
+                    multiplier *= effects["building_efficiency"]
+                    break 
     return multiplier
 
 def get_race_specific_ability_bonus(game_state, race_id, resource):
@@ -108,18 +135,7 @@ def get_race_specific_ability_bonus(game_state, race_id, resource):
         return bonus
         
     race_data = game_state.races[race_id]
-    race_info = RACES[race_id]
-    
-    if "special_abilities" not in race_info or "abilities" not in race_data:
-        return bonus
-            
-    for ability_id, ability_state in race_data["abilities"].items():
-        if not ability_state["unlocked"] or not ability_state["active"]:
-            continue
-            
-        ability_info = race_info["special_abilities"][ability_id]
-        effects = ability_info["effects"]
-        
+    for effects in get_active_effects(game_state).by_race.get(race_id, ()):
         if "per_unit_bonus" in effects: # This is usually a flat bonus per unit, not a multiplier
             bonus += effects["per_unit_bonus"] * race_data["count"]
         if "gold_storage_bonus" in effects and resource == "gold": # This is also additive based on gold
@@ -127,159 +143,109 @@ def get_race_specific_ability_bonus(game_state, race_id, resource):
             
     return bonus
 
+def get_state_dependent_resources(game_state):
+    """Get resources whose generation rate depends on the live resource pool and can't be cached in the production plan"""
+    return {"gold"} if get_active_effects(game_state).get("gold_storage_bonus") else set()
+
 def get_passive_generation_rate(game_state, resource):
     """Get passive generation rate for a resource from race abilities"""
     rate = 0.0
-    
-    for race_id, race_data in game_state.races.items():
-        if not race_data["unlocked"] or race_data["count"] <= 0:
-            continue
-            
-        race_info = RACES[race_id]
-        if "special_abilities" not in race_info or "abilities" not in race_data:
-            continue
-            
-        for ability_id, ability_state in race_data["abilities"].items():
-            if not ability_state["unlocked"] or not ability_state["active"]:
-                continue
-                
-            ability_info = race_info["special_abilities"][ability_id]
-            effects = ability_info["effects"]
-            
-            if "passive_generation" in effects:
-                rate += effects["passive_generation"] * game_state.player_level
+    for effects in get_active_effects(game_state).get("passive_generation"):
+        rate += effects["passive_generation"] * game_state.player_level
     return rate
 
-def get_time_based_modifier(game_state, resource):
+def get_time_based_modifier(game_state, resource, current_time=None):
     """Get time-based modifier for resource generation"""
+    timed = get_active_effects(game_state).get("timed_production_bonus")
+    if not timed:
+        return 1.0
     modifier = 1.0
-    
-    for race_id, race_data in game_state.races.items():
-        if not race_data["unlocked"] or race_data["count"] <= 0:
-            continue
-            
-        race_info = RACES[race_id]
-        if "special_abilities" not in race_info or "abilities" not in race_data:
-            continue
-            
-        for ability_id, ability_state in race_data["abilities"].items():
-            if not ability_state["unlocked"] or not ability_state["active"]:
-                continue
-                
-            ability_info = race_info["special_abilities"][ability_id]
-            effects = ability_info["effects"]
-            
-            if "timed_production_bonus" in effects:
-                current_time_sec = int(time.time()) 
-                alignment_duration = effects.get("alignment_duration", 300)
-                if (current_time_sec % 3600) < alignment_duration:
-                    modifier *= effects["timed_production_bonus"]
+    current_time_sec = int(game_state.clock.time() if current_time is None else current_time)
+    for effects in timed:
+        alignment_duration = effects.get("alignment_duration", 300)
+        if (current_time_sec % 3600) < alignment_duration:
+            modifier *= effects["timed_production_bonus"]
     return modifier
 
-def check_production_doubling_chance(game_state):
-    """Check if production should be doubled based on race abilities"""
-    for race_id, race_data in game_state.races.items():
-        if not race_data["unlocked"] or race_data["count"] <= 0:
-            continue
-            
-        race_info = RACES[race_id]
-        if "special_abilities" not in race_info or "abilities" not in race_data:
-            continue
-            
-        for ability_id, ability_state in race_data["abilities"].items():
-            if not ability_state["unlocked"] or not ability_state["active"]:
-                continue
-                
-            ability_info = race_info["special_abilities"][ability_id]
-            effects = ability_info["effects"]
-            
-            if "production_doubling_chance" in effects:
-                if random.random() < effects["production_doubling_chance"]:
-                    return True
-    return False
+def get_time_modifier_boundary(game_state, current_time):
+    """Get seconds until the next alignment window opens or closes, or None if no timed ability is active"""
+    boundary = None
+    phase = current_time % 3600
+    for effects in get_active_effects(game_state).get("timed_production_bonus"):
+        alignment_duration = effects.get("alignment_duration", 300)
+        until_change = alignment_duration - phase if phase < alignment_duration else 3600 - phase
+        boundary = until_change if boundary is None else min(boundary, until_change)
+    return boundary
+
+def get_production_doubling_chance(game_state):
+    """Get the combined chance that at least one active ability doubles production"""
+    no_double = 1.0
+    for effects in get_active_effects(game_state).get("production_doubling_chance"):
+        no_double *= 1.0 - effects["production_doubling_chance"]
+    return 1.0 - no_double
 
 def apply_special_resource_generation(game_state, elapsed_time):
     """Apply special resource generation from race abilities"""
-    for race_id, race_data in game_state.races.items():
-        if not race_data["unlocked"] or race_data["count"] <= 0:
-            continue
-            
-        race_info = RACES[race_id]
-        if "special_abilities" not in race_info or "abilities" not in race_data:
-            continue
-            
-        for ability_id, ability_state in race_data["abilities"].items():
-            if not ability_state["unlocked"] or not ability_state["active"]:
-                continue
-                
-            ability_info = race_info["special_abilities"][ability_id]
-            effects = ability_info["effects"]
-            
-            if "random_resource_generation" in effects:
-                chance = effects["random_resource_generation"] * elapsed_time
-                if random.random() < chance:
-                    resource_choice = random.choice([r for r in RESOURCE_TYPES if r != "prestige_points"])
-                    amount = game_state.player_level * 10 * (1 + game_state.prestige_count * 0.5)
-                    game_state.resources[resource_choice] = game_state.resources.get(resource_choice, 0) + amount
-                    game_state.add_notification(f"Fae glamour generated {amount:.0f} {resource_choice}!", notification_type="info")
-            
-            if "resource_conversion" in effects:
-                max_rate = 0
-                max_resource = None
-                for res_key in RESOURCE_TYPES:
-                    if res_key == "prestige_points": continue
-                    rate = game_state.calculate_resource_generation_rate(res_key) 
-                    if rate > max_rate:
-                        max_rate = rate
-                        max_resource = res_key
-                
-                if max_resource and max_rate > 0:
-                    conversion_rate_eff = effects["resource_conversion"] * elapsed_time
-                    for res_key_target in RESOURCE_TYPES:
-                        if res_key_target == "prestige_points" or res_key_target == max_resource: continue
-                        amount_converted = max_rate * conversion_rate_eff
-                        game_state.resources[res_key_target] = game_state.resources.get(res_key_target, 0) + amount_converted
-            
-            if "resource_transmutation" in effects and hasattr(game_state, "transmutation_source") and hasattr(game_state, "transmutation_target"):
-                source = game_state.transmutation_source
-                target = game_state.transmutation_target
-                if source in RESOURCE_TYPES and target in RESOURCE_TYPES and source != target and game_state.resources.get(source, 0) > 0:
-                    amount_to_convert = min(game_state.resources.get(source,0) * 0.01 * elapsed_time, game_state.resources.get(source,0))
-                    if amount_to_convert > 0:
-                        game_state.resources[source] -= amount_to_convert
-                        game_state.resources[target] = game_state.resources.get(target,0) + amount_to_convert * effects["resource_transmutation"]
-            
-            if "stone_to_crystal_conversion" in effects:
-                stone_produced = game_state.calculate_resource_generation_rate("stone") * elapsed_time 
-                if stone_produced > 0:
-                    crystal_amount = stone_produced * effects["stone_to_crystal_conversion"]
-                    game_state.resources["crystal"] = game_state.resources.get("crystal",0) + crystal_amount
-            
-            if "parallel_production" in effects:
-                for res_key_parallel in RESOURCE_TYPES:
-                    if res_key_parallel == "prestige_points": continue
-                    rate = game_state.calculate_resource_generation_rate(res_key_parallel) 
-                    amount_parallel = rate * elapsed_time * effects["parallel_production"]
-                    game_state.resources[res_key_parallel] = game_state.resources.get(res_key_parallel, 0) + amount_parallel
+    for effects in get_active_effects(game_state).special:
+        if "random_resource_generation" in effects:
+            choices = [r for r in RESOURCE_TYPES if r != "prestige_points"]
+            counts = game_state.randomness.event_counts(effects["random_resource_generation"], elapsed_time, len(choices))
+            amount = game_state.player_level * 10 * (1 + game_state.prestige_count * 0.5)
+            for resource_choice, count in zip(choices, counts):
+                if count <= 0: continue
+                game_state.resources[resource_choice] = game_state.resources.get(resource_choice, 0) + amount * count
+                if count >= 1: game_state.add_notification(f"Fae glamour generated {amount * count:.0f} {resource_choice}!", notification_type="info")
+    
+        if "resource_conversion" in effects:
+            max_rate = 0
+            max_resource = None
+            for res_key in RESOURCE_TYPES:
+                if res_key == "prestige_points": continue
+                rate = game_state.get_tick_rate(res_key) 
+                if rate > max_rate:
+                    max_rate = rate
+                    max_resource = res_key
+        
+            if max_resource and max_rate > 0:
+                conversion_rate_eff = effects["resource_conversion"] * elapsed_time
+                for res_key_target in RESOURCE_TYPES:
+                    if res_key_target == "prestige_points" or res_key_target == max_resource: continue
+                    amount_converted = max_rate * conversion_rate_eff
+                    game_state.resources[res_key_target] = game_state.resources.get(res_key_target, 0) + amount_converted
+    
+        if "resource_transmutation" in effects and hasattr(game_state, "transmutation_source") and hasattr(game_state, "transmutation_target"):
+            source = game_state.transmutation_source
+            target = game_state.transmutation_target
+            if source in RESOURCE_TYPES and target in RESOURCE_TYPES and source != target and game_state.resources.get(source, 0) > 0:
+                amount_to_convert = min(game_state.resources.get(source,0) * 0.01 * elapsed_time, game_state.resources.get(source,0))
+                if amount_to_convert > 0:
+                    game_state.resources[source] -= amount_to_convert
+                    game_state.resources[target] = game_state.resources.get(target,0) + amount_to_convert * effects["resource_transmutation"]
+    
+        if "stone_to_crystal_conversion" in effects:
+            stone_produced = game_state.get_tick_rate("stone") * elapsed_time 
+            if stone_produced > 0:
+                crystal_amount = stone_produced * effects["stone_to_crystal_conversion"]
+                game_state.resources["crystal"] = game_state.resources.get("crystal",0) + crystal_amount
+    
+        if "parallel_production" in effects:
+            for res_key_parallel in RESOURCE_TYPES:
+                if res_key_parallel == "prestige_points": continue
+                rate = game_state.get_tick_rate(res_key_parallel) 
+                amount_parallel = rate * elapsed_time * effects["parallel_production"]
+                game_state.resources[res_key_parallel] = game_state.resources.get(res_key_parallel, 0) + amount_parallel
 
 def generate_passive_prestige_points(game_state, elapsed_time):
     """Generate passive prestige points from race abilities"""
-    for race_id, race_data in game_state.races.items():
-        if not race_data["unlocked"] or race_data["count"] <= 0:
-            continue
-            
-        race_info = RACES[race_id]
-        if "special_abilities" not in race_info or "abilities" not in race_data:
-            continue
-            
-        for ability_id, ability_state in race_data["abilities"].items():
-            if not ability_state["unlocked"] or not ability_state["active"]:
-                continue
-                
-            ability_info = race_info["special_abilities"][ability_id]
-            effects = ability_info["effects"]
-            
-            if "passive_prestige_generation" in effects:
-                points = game_state.total_earnings * effects["passive_prestige_generation"] * elapsed_time
-                game_state.resources["prestige_points"] = game_state.resources.get("prestige_points", 0) + points
-                game_state.total_prestige_points += points
+    prestige_rate = get_passive_prestige_rate(game_state)
+    if prestige_rate > 0:
+        points = game_state.total_earnings * prestige_rate * elapsed_time
+        game_state.resources["prestige_points"] = game_state.resources.get("prestige_points", 0) + points
+        game_state.total_prestige_points += points
+
+def get_passive_prestige_rate(game_state):
+    """Get the fraction of total earnings converted to prestige points per second"""
+    rate = 0.0
+    for effects in get_active_effects(game_state).get("passive_prestige_generation"):
+        rate += effects["passive_prestige_generation"]
+    return rate
@@ -0,0 +1,56 @@
+import time
+
+from game.constants import PRESTIGE_UPGRADES, TIME_WARP_DURATION, TIME_WARP_COOLDOWN
+
+# --- Time Warp ---
+# A warp doesn't stretch the simulation step: the extra virtual time it grants is owed as a backlog
+# (game_state.time_warp_backlog) and run as ordinary fixed steps by fast_forward, within a CPU budget
+# per frame. Warp start, end and cooldown are stamped on the game state's clock and saved with the realm.
+
+def get_time_warp_multiplier(game_state):
+    """Speed of time while a warp is active, from the time_warp prestige upgrade level (1.0 without it)"""
+    level = game_state.prestige_upgrades.get("time_warp", {}).get("level", 0)
+    if level <= 0: return 1.0
+    info = PRESTIGE_UPGRADES["time_warp"]
+    return info["effect"]["time_warp_multiplier"] * info.get("effect_scaling", 1.0) ** (level - 1)
+
+def activate_time_warp(game_state):
+    now = game_state.clock.time()
+    if game_state.prestige_upgrades.get("time_warp", {}).get("level", 0) <= 0:
+        game_state.add_notification("Purchase the Time Warp prestige upgrade first!")
+        return False
+    if game_state.time_warp_active:
+        game_state.add_notification("Time Warp is already active!")
+        return False
+    if now < game_state.time_warp_cooldown_end:
+        remaining = int(game_state.time_warp_cooldown_end - now)
+        game_state.add_notification(f"Time Warp recharging: {remaining // 3600}h {remaining % 3600 // 60}m left")
+        return False
+    game_state.time_warp_active = True
+    game_state.time_warp_end_time = now + TIME_WARP_DURATION
+    game_state.time_warp_cooldown_end = now + TIME_WARP_COOLDOWN
+    game_state.add_notification(f"Time Warp activated: x{get_time_warp_multiplier(game_state):.1f} speed for {TIME_WARP_DURATION // 60} minutes!", notification_type="unlock")
+    return True
+
+def accrue_time_warp(game_state, elapsed_time):
+    """Owe the extra virtual time of the warped part of the last elapsed_time seconds; ends the warp when due"""
+    if not game_state.time_warp_active: return
+    now = game_state.clock.time()
+    warped = min(elapsed_time, max(0.0, game_state.time_warp_end_time - (now - elapsed_time)))
+    game_state.time_warp_backlog += warped * (get_time_warp_multiplier(game_state) - 1.0)
+    if now >= game_state.time_warp_end_time:
+        game_state.time_warp_active = False
+        game_state.add_notification("Time Warp has ended!", notification_type="info")
+
+def fast_forward(game_state, step, budget=None, timer=time.perf_counter):
+    """Run owed warp time in fixed steps of step seconds until it's paid or budget seconds of CPU are used.
+
+    budget None runs the whole backlog (headless runs). Returns the number of steps taken.
+    """
+    started, steps = timer(), 0
+    while game_state.time_warp_backlog >= step:
+        if budget is not None and timer() - started >= budget: break
+        game_state.simulate(step)
+        game_state.time_warp_backlog -= step
+        steps += 1
+    return steps
@@ -0,0 +1,63 @@
+import heapq
+
+from game.constants import RACES, BUILDINGS, RESEARCH
+from game.logic import race_abilities as ability_logic
+
+# --- Unlock Index ---
+# Content sorted by (unlock_level, requires_prestige), so a check only looks at the next pending thresholds.
+
+UNLOCK_CONTENT = {"races": (RACES, "race"), "buildings": (BUILDINGS, "building"), "research": (RESEARCH, "research")}
+UNLOCK_INDEX = {kind: sorted((info["unlock_level"], info.get("requires_prestige", 0), item_id) for item_id, info in content.items())
+                for kind, (content, _) in UNLOCK_CONTENT.items()}
+
+class UnlockTracker:
+    """Per-realm cursors into UNLOCK_INDEX plus the race abilities waiting only on resources.
+
+    Entries whose level is reached but whose prestige requirement is not wait in a heap keyed by
+    requires_prestige. Ability requirements on race level and prestige are re-checked only when the
+    realm's state_version changes; in between, only the armed abilities' resource costs are checked.
+    """
+    def __init__(self):
+        self.cursors = {kind: 0 for kind in UNLOCK_INDEX}
+        self.waiting = {kind: [] for kind in UNLOCK_INDEX}
+        self.swept_level = 0
+        self.abilities_version = None
+        self.armed_abilities = []
+
+    def update(self, game_state):
+        """Unlock everything whose threshold the realm has reached since the last update"""
+        if game_state.player_level < self.swept_level: # Level went down (reset or reload): sweep again from the start
+            self.__init__()
+        self.swept_level = game_state.player_level
+        self._advance(game_state, "races")
+        self._update_abilities(game_state)
+        self._advance(game_state, "buildings")
+        self._advance(game_state, "research")
+
+    def _advance(self, game_state, kind):
+        index, waiting = UNLOCK_INDEX[kind], self.waiting[kind]
+        cursor = self.cursors[kind]
+        while cursor < len(index) and index[cursor][0] <= game_state.player_level:
+            level, prestige, item_id = index[cursor]
+            heapq.heappush(waiting, (prestige, level, item_id))
+            cursor += 1
+        self.cursors[kind] = cursor
+        while waiting and waiting[0][0] <= game_state.prestige_count:
+            _, _, item_id = heapq.heappop(waiting)
+            _unlock(game_state, kind, item_id)
+
+    def _update_abilities(self, game_state):
+        if self.abilities_version != game_state.state_version:
+            self.armed_abilities = ability_logic.get_pending_race_abilities(game_state)
+            self.abilities_version = game_state.state_version
+        if self.armed_abilities:
+            self.armed_abilities = [pair for pair in self.armed_abilities if not ability_logic.try_unlock_race_ability(game_state, *pair)]
+
+def _unlock(game_state, kind, item_id):
+    content, label = UNLOCK_CONTENT[kind]
+    state = getattr(game_state, kind)[item_id]
+    if state["unlocked"]:
+        return
+    state["unlocked"] = True
+    game_state.invalidate_production_plan()
+    game_state.add_notification(f"New {label} unlocked: {content[item_id]['name']}!", notification_type="unlock")
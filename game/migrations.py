@@ -0,0 +1,75 @@
+from game.constants import RESOURCE_TYPES, RACES, BUILDINGS, RESEARCH, PRESTIGE_UPGRADES, ACHIEVEMENTS
+
+# --- Save Migrations ---
+# Every save carries the schema "version" it was written with. Loading runs the registered steps from that
+# version up to SAVE_VERSION, in order, once; persistence writes the upgraded save back, so a save only ever
+# pays for a migration on its first load. Content changes (new or removed races, abilities, buildings,
+# research, upgrades or achievements) need no step: a save whose tables don't match the current content is
+# brought in line by sync_content, which is part of the same once-per-save migration.
+
+SAVE_VERSION = "1.1.0"
+MIGRATIONS = {} # from version -> (to version, step)
+
+def migration(from_version, to_version):
+    """Register step(data) as the upgrade of save data from from_version to to_version (in place)"""
+    def register(step):
+        MIGRATIONS[from_version] = (to_version, step)
+        return step
+    return register
+
+def _version_key(version):
+    return tuple(int(part) for part in version.split("."))
+
+def migrate(data):
+    """Upgrade save data to SAVE_VERSION in place; returns whether any step ran"""
+    version = data.get("version", "1.0.0") # Saves have been stamped since the first release
+    if _version_key(version) > _version_key(SAVE_VERSION): raise ValueError(f"save version {version} is newer than this game ({SAVE_VERSION})")
+    migrated = False
+    while version != SAVE_VERSION:
+        if version not in MIGRATIONS: raise ValueError(f"no migration from save version {version}")
+        version, step = MIGRATIONS[version]
+        step(data)
+        data["version"] = version
+        migrated = True
+    if not content_matches(data):
+        sync_content(data)
+        migrated = True
+    return migrated
+
+def content_matches(data):
+    """Whether the save's content tables hold exactly the current races, abilities, buildings, research,
+    upgrades and achievements"""
+    try:
+        races = data["races"]
+        return (data["resources"].keys() == set(RESOURCE_TYPES) and races.keys() == RACES.keys()
+                and all(races[race_id]["abilities"].keys() == set(info.get("special_abilities", {})) and races[race_id]["skills"].keys() == set(RESOURCE_TYPES)
+                        for race_id, info in RACES.items())
+                and data["buildings"].keys() == BUILDINGS.keys() and data["research"].keys() == RESEARCH.keys()
+                and data["prestige_upgrades"].keys() == PRESTIGE_UPGRADES.keys() and data["achievements"].keys() == ACHIEVEMENTS.keys()
+                and all(data["achievements"][category].keys() == {milestone["id"] for milestone in milestones} for category, milestones in ACHIEVEMENTS.items()))
+    except (KeyError, AttributeError):
+        return False
+
+def _sync_table(table, definitions, default):
+    """Drop entries for content that no longer exists and add default(id) entries for new content"""
+    for item_id in [item_id for item_id in table if item_id not in definitions]: del table[item_id]
+    for item_id in definitions: table.setdefault(item_id, default(item_id))
+
+def sync_content(data):
+    """Bring the save's content tables in line with the current content: drop entries for content cut from the
+    game, add default entries for content added since, keep the rest"""
+    _sync_table(data.setdefault("resources", {}), RESOURCE_TYPES, lambda resource: 0)
+    _sync_table(data.setdefault("races", {}), RACES, lambda race_id: {"count": 0, "level": 1, "unlocked": RACES[race_id]["unlock_level"] == 1})
+    for race_id, race in data["races"].items():
+        _sync_table(race.setdefault("abilities", {}), RACES[race_id].get("special_abilities", {}), lambda ability_id: {"unlocked": False, "active": False})
+        _sync_table(race.setdefault("skills", {}), RESOURCE_TYPES, lambda resource: 0)
+    _sync_table(data.setdefault("buildings", {}), BUILDINGS, lambda building_id: {"count": 0, "level": 1, "unlocked": BUILDINGS[building_id]["unlock_level"] <= 1})
+    _sync_table(data.setdefault("research", {}), RESEARCH, lambda research_id: {"level": 0, "unlocked": RESEARCH[research_id]["unlock_level"] <= 1})
+    _sync_table(data.setdefault("prestige_upgrades", {}), PRESTIGE_UPGRADES, lambda upgrade_id: {"level": 0})
+    loaded = data.get("achievements", {})
+    data["achievements"] = {category: {milestone["id"]: loaded.get(category, {}).get(milestone["id"], False) for milestone in milestones}
+                            for category, milestones in ACHIEVEMENTS.items()}
+    data.setdefault("time_warp_backlog", 0.0)
+
+# 1.0.0 saves may hold races cut from the game, and lack skills, abilities or achievement categories added since
+migration("1.0.0", "1.1.0")(sync_content)
@@ -0,0 +1,59 @@
+"""Benchmark the cost of carrying amounts past the float range: a tick with every resource a plain float against
+the same tick with resources held past 1e300, and BigNum scalar arithmetic against float arithmetic.
+
+Usage:
+    python -m game.number_benchmark
+    python -m game.number_benchmark --repeat 20000
+"""
+import argparse
+import sys
+import timeit
+
+from game.bignum import BigNum
+from game.clock import VirtualClock
+from game.game_state import GameState
+from game.randomness import ExpectedValueRandomness
+
+TICK_BUDGET = 2.0 # A tick with big amounts should stay within this factor of the float tick
+
+def populated_realm(big_amounts):
+    """A realm with every race and building working; big_amounts moves gold and mana past the float range"""
+    game_state = GameState(clock=VirtualClock(0.0), randomness=ExpectedValueRandomness())
+    for race in game_state.races.values(): race.update(unlocked=True, count=50, level=10)
+    for building in game_state.buildings.values(): building.update(unlocked=True, count=5)
+    for resource in game_state.resources: game_state.resources[resource] = 1e6
+    if big_amounts: game_state.resources["gold"], game_state.resources["mana"] = BigNum(3.0, 400), BigNum(7.0, 350)
+    game_state.invalidate_production_plan()
+    return game_state
+
+def tick_time(big_amounts, repeat):
+    """Seconds per generate_resources tick"""
+    game_state = populated_realm(big_amounts)
+    return min(timeit.repeat(lambda: game_state.generate_resources(0.1), number=repeat, repeat=5)) / repeat
+
+def scalar_times(repeat):
+    """[(operation, float seconds, BigNum seconds)] for the scalar operations costs and comparisons use"""
+    a, b, x, y = 3.5e150, 1.25e140, BigNum(3.5, 450), BigNum(1.25, 440)
+    operations = [("add", lambda p, q: p + q), ("mul", lambda p, q: p * q), ("div", lambda p, q: p / q),
+                  ("compare", lambda p, q: p >= q), ("pow", lambda p, q: p ** 1.5)]
+    return [(name, min(timeit.repeat(lambda: op(a, b), number=repeat, repeat=5)) / repeat,
+             min(timeit.repeat(lambda: op(x, y), number=repeat, repeat=5)) / repeat) for name, op in operations]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark ticks and arithmetic with amounts past the float range.")
+    parser.add_argument("--repeat", type=int, default=5000, help="ticks or operations per timing run")
+    args = parser.parse_args(argv)
+
+    float_tick, big_tick = tick_time(False, args.repeat), tick_time(True, args.repeat)
+    print(f"{'tick':<10}{'float us':>10}{'big us':>10}{'ratio':>8}")
+    print(f"{'generate':<10}{float_tick * 1e6:>10.1f}{big_tick * 1e6:>10.1f}{big_tick / float_tick:>7.2f}x")
+    print(f"\n{'operation':<10}{'float us':>10}{'BigNum us':>11}{'ratio':>8}")
+    for name, float_time, big_time in scalar_times(args.repeat):
+        print(f"{name:<10}{float_time * 1e6:>10.3f}{big_time * 1e6:>11.3f}{big_time / float_time:>7.1f}x")
+    if big_tick > TICK_BUDGET * float_tick:
+        print(f"\nA tick with big amounts is over {TICK_BUDGET:g}x the float tick")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
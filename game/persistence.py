@@ -0,0 +1,73 @@
+import json
+import os
+import zlib
+
+from game import migrations, save_format
+
+# --- Save Files ---
+# Every save is written to a temp file, fsynced and renamed over the target, so a crash leaves either the
+# old or the new file on disk, never a torn one. Compressed snapshots use the binary format in save_format
+# (whatever the extension), uncompressed ones plain JSON; readers pick the format from the first bytes, so
+# older zlib-compressed JSON saves still load. A binary snapshot is smaller than a JSON delta of the same
+# write would be, so every save, autosaves included, is a full snapshot.
+
+def atomic_write(path, payload):
+    """Replace path with payload (bytes) in one rename"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(os.path.dirname(path) or ".")
+
+def _fsync_directory(directory):
+    if os.name == "nt": return # Windows can't open directories; the rename is already durable there
+    fd = os.open(directory, os.O_RDONLY)
+    try: os.fsync(fd)
+    finally: os.close(fd)
+
+def save_path(filename, compressed=True):
+    """Path a save lands at: compressed saves use the .zsave extension"""
+    if compressed or filename.endswith(".zsave"):
+        return filename.replace(".json", ".zsave") if not filename.endswith(".zsave") else filename
+    return filename
+
+def encode_save(data, compressed=True):
+    """Bytes of a save: binary format when compressed, JSON text otherwise"""
+    return save_format.encode(data) if compressed else json.dumps(data).encode('utf-8')
+
+def decode_save(payload):
+    """Save data from binary, zlib-compressed JSON or JSON bytes, told apart by their magic number"""
+    if save_format.is_binary(payload): return save_format.decode(payload)
+    if payload[:1] == b"{": return json.loads(payload)
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+def write_save_file(data, filename, compressed=True):
+    """Atomically write save data as a full snapshot; returns the path"""
+    d_name = os.path.dirname(filename)
+    if d_name and not os.path.exists(d_name): os.makedirs(d_name)
+    path = save_path(filename, compressed)
+    atomic_write(path, encode_save(data, compressed or path.endswith(".zsave")))
+    return path
+
+def read_save_file(filename, write_back=False):
+    """Load save data from filename (falling back to its .zsave twin), migrated to
+    migrations.SAVE_VERSION; write_back replaces an outdated file with the upgraded save, so it migrates only once"""
+    if not os.path.exists(filename): filename = filename.replace(".json", ".zsave")
+    with open(filename, 'rb') as f: payload = f.read()
+    data = decode_save(payload)
+    if migrations.migrate(data) and write_back:
+        # Best effort: a save that can't be rewritten (read-only folder, full disk) still loads, it just migrates again next time
+        try: write_save_file(data, filename, payload[:1] != b"{") # Kept compressed if it was
+        except OSError as e: print(f"Could not write back migrated save {filename}: {e}")
+    return data
+
+def read_save_metadata(filename):
+    """Metadata (save_format.METADATA_FIELDS) of a save: from the binary header alone when it has one,
+    otherwise from the full save"""
+    with open(filename, 'rb') as f: prefix = f.read(save_format.PREFIX_SIZE)
+    metadata = save_format.read_metadata(prefix) if save_format.is_binary(prefix) else None
+    if metadata is not None: return metadata
+    data = read_save_file(filename)
+    return {field: data.get(field) for field in save_format.METADATA_FIELDS}
@@ -0,0 +1,32 @@
+import numpy as np
+
+from game.constants import SIMULATION_RATE
+
+# --- Randomness Policies ---
+# GameState draws every chance-based ability outcome through one of these, so a realm can be sampled
+# from its own seeded stream (reproducible runs) or replaced by expected values (fast, noise-free runs).
+# Chances are defined per simulation step; a call covering many steps samples them all at once.
+
+class SampledRandomness:
+    """Samples outcomes from a per-realm NumPy generator; pass a seed for a reproducible stream"""
+    def __init__(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+
+    def doubling_factors(self, chance, elapsed_time, size):
+        """Production factor per resource: 2 or 1 for one step, 1 + doubled share of the steps for longer spans"""
+        steps = round(elapsed_time * SIMULATION_RATE)
+        if steps <= 1:
+            return np.where(self.rng.random(size) < chance, 2.0, 1.0)
+        return 1.0 + self.rng.binomial(steps, chance, size) / steps
+
+    def event_counts(self, rate, elapsed_time, size):
+        """Number of events (rate per second) over the span, each landing on one of size uniform choices"""
+        return self.rng.multinomial(self.rng.poisson(rate * elapsed_time), np.full(size, 1.0 / size)).astype(float)
+
+class ExpectedValueRandomness:
+    """Replaces every random outcome with its expectation; deterministic and independent of step size"""
+    def doubling_factors(self, chance, elapsed_time, size):
+        return np.full(size, 1.0 + chance)
+
+    def event_counts(self, rate, elapsed_time, size):
+        return np.full(size, rate * elapsed_time / size)
@@ -0,0 +1,81 @@
+"""Compare the binary save format with the zlib-compressed JSON saves it replaces (size and decode time), and
+the binary format's compression levels with and without the preset dictionary (size, compress and decompress time).
+
+Usage:
+    python -m game.save_benchmark                           # a fresh realm and one played for an hour
+    python -m game.save_benchmark saves/ --played 86400     # plus every save in saves/
+    python -m game.save_benchmark --repeat 20000
+    python -m game.save_benchmark saves/ --train game/save_dictionary_2.bin   # train a preset dictionary on these realms
+"""
+import argparse
+import json
+import sys
+import timeit
+import zlib
+
+from game import save_format
+from game.clock import VirtualClock
+from game.game_state import GameState
+from game.persistence import decode_save
+from game.batch_simulation import find_saves
+from game.randomness import SampledRandomness
+
+def played_realm(duration, seed=0):
+    """Save data of a fresh realm advanced by duration virtual seconds"""
+    clock = VirtualClock(0.0)
+    game_state = GameState(clock=clock, randomness=SampledRandomness(seed))
+    for _ in range(int(duration)):
+        clock.advance(1.0)
+        game_state.update(1.0)
+        game_state.fast_forward(1.0)
+    return game_state.get_save_snapshot()
+
+def measure(data, repeat):
+    """(json+zlib bytes, binary bytes, json+zlib decode seconds, binary decode seconds) for one save"""
+    legacy = zlib.compress(json.dumps(data).encode('utf-8'), level=9) # what .zsave held before save_format
+    binary = save_format.encode(data)
+    timings = [min(timeit.repeat(lambda: decode_save(payload), number=repeat, repeat=5)) / repeat for payload in (legacy, binary)]
+    return len(legacy), len(binary), *timings
+
+def measure_compression(data, level, dictionary_id, repeat):
+    """(bytes, encode seconds, decode seconds) of the binary format at one compression level and dictionary"""
+    payload = save_format.encode(data, level, dictionary_id)
+    encode_time = min(timeit.repeat(lambda: save_format.encode(data, level, dictionary_id), number=repeat, repeat=5)) / repeat
+    decode_time = min(timeit.repeat(lambda: save_format.decode(payload), number=repeat, repeat=5)) / repeat
+    return len(payload), encode_time, decode_time
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the binary save format against zlib-compressed JSON.")
+    parser.add_argument("saves_dir", nargs="?", help="directory of .zsave/.json saves to include")
+    parser.add_argument("--played", type=float, default=3600, help="virtual seconds to advance the played realm")
+    parser.add_argument("--repeat", type=int, default=5000, help="decodes per timing run")
+    parser.add_argument("--train", metavar="PATH", help="write a preset dictionary trained on the realms to PATH instead")
+    args = parser.parse_args(argv)
+
+    realms = [("fresh", GameState(clock=VirtualClock(0.0)).get_save_snapshot()), (f"played {args.played:g}s", played_realm(args.played))]
+    for path in find_saves(args.saves_dir) if args.saves_dir else []:
+        game_state = GameState(clock=VirtualClock(0.0)) # Loaded as the game sees it, without offline progress
+        if game_state.load_game(path, write_back=False): realms.append((path, game_state.get_save_snapshot()))
+        else: print(f"{path}: skipped, could not load")
+
+    if args.train:
+        with open(args.train, "wb") as f: f.write(save_format.build_dictionary(data for _, data in realms))
+        print(f"Trained a dictionary on {len(realms)} realms -> {args.train}")
+        return 0
+
+    print(f"{'realm':<28}{'json+zlib':>11}{'binary':>9}{'smaller':>9}{'json us':>10}{'binary us':>11}{'faster':>8}")
+    for name, data in realms:
+        legacy_size, binary_size, legacy_time, binary_time = measure(data, args.repeat)
+        print(f"{name:<28}{legacy_size:>11}{binary_size:>9}{legacy_size / binary_size:>8.1f}x"
+              f"{legacy_time * 1e6:>10.1f}{binary_time * 1e6:>11.1f}{legacy_time / binary_time:>7.1f}x")
+
+    print(f"\n{'realm':<28}{'level':>6}{'dictionary':>12}{'bytes':>7}{'compress us':>13}{'decompress us':>15}")
+    for name, data in realms:
+        for level in (1, 6, 9):
+            for dictionary_id in (0, save_format.DEFAULT_DICTIONARY):
+                size, encode_time, decode_time = measure_compression(data, level, dictionary_id, args.repeat)
+                print(f"{name:<28}{level:>6}{dictionary_id or 'none':>12}{size:>7}{encode_time * 1e6:>13.1f}{decode_time * 1e6:>15.1f}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
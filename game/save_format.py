@@ -0,0 +1,177 @@
+import json
+import math
+import os
+import struct
+import zlib
+
+from game import bignum
+from game.constants import RESOURCE_TYPES, RACES, BUILDINGS, RESEARCH, PRESTIGE_UPGRADES, ACHIEVEMENTS
+
+# --- Binary Save Format ---
+# A header (MAGIC, format version, schema fingerprint), an uncompressed metadata block (what the load dialog
+# lists, readable without decompressing), the id of the preset dictionary and a zlib stream of one fixed-layout record.
+# The record holds no keys: every table is a run of numbers in the order of the content definitions
+# (RESOURCE_TYPES, RACES, BUILDINGS, RESEARCH, PRESTIGE_UPGRADES, ACHIEVEMENTS), so it decodes with a single
+# struct unpack. The header's fingerprint names the layout (see Record Layouts) the record was written with.
+
+MAGIC = b"ERSV"
+FORMAT_VERSION = 4 # Version 1 had no metadata block, version 2 no dictionary id, versions 1-3 a journal generation
+HEADER = struct.Struct("<4sHI")
+METADATA = struct.Struct("<dIdd")
+METADATA_FIELDS = ("player_level", "prestige_count", "total_play_time", "save_time")
+PREFIX_SIZE = HEADER.size + METADATA.size # Bytes to read for read_metadata
+DICTIONARY_ID = struct.Struct("<H")
+
+# --- Preset Dictionaries ---
+# Records share most of their bytes (zeros, flags, starting levels) with other realms' records, which a lone
+# record can't exploit; a zlib preset dictionary of representative records supplies them. Saves name the
+# dictionary they were compressed with, so a retrained dictionary gets a new id and the old ones keep shipping.
+# Retrain with: python -m game.save_benchmark saves/ --train game/save_dictionary_<id>.bin
+
+DICTIONARY_SIZE = 32768 # zlib only looks back this far
+COMPRESSION_LEVEL = 9
+DEFAULT_DICTIONARY = 1
+
+def _load_dictionary(name):
+    with open(os.path.join(os.path.dirname(__file__), name), "rb") as f: return f.read()
+
+DICTIONARIES = {0: b"", 1: _load_dictionary("save_dictionary_1.bin")} # id -> zdict; 0 is plain zlib
+
+def build_dictionary(samples):
+    """Preset dictionary from save data dicts, the most representative first (zlib matches nearer the end
+    of the dictionary more cheaply, so the samples are laid out in reverse)"""
+    records = []
+    for data in samples:
+        record = record_bytes(data)
+        if record not in records: records.append(record)
+    return b"".join(reversed(records))[-DICTIONARY_SIZE:]
+
+def is_binary(payload):
+    return payload[:len(MAGIC)] == MAGIC
+
+# --- Record Layouts ---
+# A layout is the content ids a record was written with. Decoding looks the layout up by the fingerprint in
+# the header, so saves from before a content change still decode (into the old tables, which
+# migrations.migrate then brings up to the current content). Every layout a release wrote is frozen in
+# LAYOUTS_FILE; after changing content, freeze the new one with: python -m game.save_format
+
+LAYOUTS_FILE = os.path.join(os.path.dirname(__file__), "save_layouts.json")
+
+def content_ids():
+    """Content ids the current game writes records with"""
+    return {"resources": list(RESOURCE_TYPES),
+            "abilities": {race_id: list(info.get("special_abilities", {})) for race_id, info in RACES.items()},
+            "buildings": list(BUILDINGS), "research": list(RESEARCH), "prestige_upgrades": list(PRESTIGE_UPGRADES),
+            "achievements": {category: [milestone["id"] for milestone in milestones] for category, milestones in ACHIEVEMENTS.items()}}
+
+class Layout:
+    """Field order of a record for one set of content ids (see content_ids)"""
+    def __init__(self, ids):
+        self.ids = ids
+        self.resources, self.abilities, self.achievements = ids["resources"], ids["abilities"], ids["achievements"]
+        self.buildings, self.research, self.prestige_upgrades = ids["buildings"], ids["research"], ids["prestige_upgrades"]
+        self.multiplier_keys = ["all"] + self.resources # NaN marks a key the realm doesn't have
+        self.fingerprint = zlib.crc32("|".join([",".join(self.resources), ",".join(f"{r}:{'+'.join(a)}" for r, a in self.abilities.items()),
+                                                ",".join(self.buildings), ",".join(self.research), ",".join(self.prestige_upgrades),
+                                                ",".join(f"{c}:{'+'.join(m)}" for c, m in self.achievements.items())]).encode('utf-8'))
+        # Counts, levels that can grow without bound and the player level are stored as doubles (exact below 2**53)
+        self.record = struct.Struct("<" + "di" * len(self.resources)
+                                    + "".join("dI?" + "??" * len(abilities) + "d" * len(self.resources) for abilities in self.abilities.values())
+                                    + "dI?" * len(self.buildings) + "I?" * len(self.research) + "I" * len(self.prestige_upgrades)
+                                    + "?" * sum(map(len, self.achievements.values()))
+                                    + "ddIdd" + "d" * len(self.multiplier_keys) + "d?ddd" + "d3B")
+        self.journaled_record = struct.Struct(self.record.format + "16s") # Versions 1-3: the snapshot's journal generation trailed the record
+
+    def pack(self, data):
+        """The uncompressed record for save data with this layout's content tables"""
+        values = []
+        for resource in self.resources:
+            amount = bignum.from_json(data["resources"].get(resource, 0))
+            values += (amount.mantissa, amount.exponent) if isinstance(amount, bignum.BigNum) else (amount, 0)
+        for race_id, abilities in self.abilities.items():
+            race = data["races"][race_id]
+            values += (race["count"], race["level"], race["unlocked"])
+            for ability_id in abilities: values += (race["abilities"][ability_id]["unlocked"], race["abilities"][ability_id]["active"])
+            values += (race["skills"].get(resource, 0) for resource in self.resources)
+        for building_id in self.buildings: values += (data["buildings"][building_id]["count"], data["buildings"][building_id]["level"], data["buildings"][building_id]["unlocked"])
+        for research_id in self.research: values += (data["research"][research_id]["level"], data["research"][research_id]["unlocked"])
+        values += (data["prestige_upgrades"][upgrade_id]["level"] for upgrade_id in self.prestige_upgrades)
+        values += (bool(data["achievements"].get(category, {}).get(milestone_id)) for category, milestone_ids in self.achievements.items() for milestone_id in milestone_ids)
+        values += (data["player_level"], data["total_earnings"], data["prestige_count"], data["prestige_points"], data["total_prestige_points"])
+        values += (data["permanent_multipliers"].get(key, math.nan) for key in self.multiplier_keys)
+        values += (data["total_play_time"], data["time_warp_active"], data["time_warp_end_time"], data["time_warp_cooldown_end"], data.get("time_warp_backlog", 0.0))
+        values += (data["save_time"], *(int(part) for part in data.get("version", "1.0.0").split(".")))
+        return self.record.pack(*values)
+
+    def unpack(self, record, version=FORMAT_VERSION):
+        """Save data dict (same shape as the JSON format) from a record of the given format version"""
+        it = iter((self.record if version >= 4 else self.journaled_record).unpack(record))
+        take = it.__next__ # zip(ids, it, it) below reads consecutive fields straight from the record
+        data = {"resources": {resource: (bignum.compact(bignum.BigNum(mantissa, exponent)) if exponent else mantissa)
+                              for resource, mantissa, exponent in zip(self.resources, it, it)},
+                "races": {}}
+        for race_id, abilities in self.abilities.items():
+            race = {"count": int(take()), "level": take(), "unlocked": take()}
+            race["abilities"] = {ability_id: {"unlocked": unlocked, "active": active} for ability_id, unlocked, active in zip(abilities, it, it)}
+            race["skills"] = dict(zip(self.resources, it))
+            data["races"][race_id] = race
+        data["buildings"] = {building_id: {"count": int(count), "level": level, "unlocked": unlocked} for building_id, count, level, unlocked in zip(self.buildings, it, it, it)}
+        data["research"] = {research_id: {"level": level, "unlocked": unlocked} for research_id, level, unlocked in zip(self.research, it, it)}
+        data["prestige_upgrades"] = {upgrade_id: {"level": level} for upgrade_id, level in zip(self.prestige_upgrades, it)}
+        data["achievements"] = {category: dict(zip(milestone_ids, it)) for category, milestone_ids in self.achievements.items()}
+        data["player_level"], data["total_earnings"] = int(take()), take()
+        data["prestige_count"], data["prestige_points"], data["total_prestige_points"] = take(), take(), take()
+        data["permanent_multipliers"] = {key: value for key, value in zip(self.multiplier_keys, it) if value == value} # NaN != NaN
+        data["total_play_time"], data["time_warp_active"], data["time_warp_end_time"], data["time_warp_cooldown_end"], data["time_warp_backlog"] = take(), take(), take(), take(), take()
+        data["save_time"], data["version"] = take(), f"{take()}.{take()}.{take()}"
+        return data
+
+def _load_layouts():
+    with open(LAYOUTS_FILE, encoding='utf-8') as f: return [Layout(ids) for ids in json.load(f)]
+
+CURRENT_LAYOUT = Layout(content_ids())
+LAYOUTS = {layout.fingerprint: layout for layout in _load_layouts() + [CURRENT_LAYOUT]} # fingerprint -> Layout
+SCHEMA_FINGERPRINT = CURRENT_LAYOUT.fingerprint
+
+def freeze_current_layout():
+    """Add the current layout to LAYOUTS_FILE; returns False if it was already frozen"""
+    with open(LAYOUTS_FILE, encoding='utf-8') as f: frozen = json.load(f)
+    if any(Layout(ids).fingerprint == SCHEMA_FINGERPRINT for ids in frozen): return False
+    with open(LAYOUTS_FILE, "w", encoding='utf-8') as f: json.dump(frozen + [CURRENT_LAYOUT.ids], f, indent=1)
+    return True
+
+def record_bytes(data):
+    """The uncompressed record for save data as produced by GameState._get_save_data"""
+    return CURRENT_LAYOUT.pack(data)
+
+def encode(data, level=COMPRESSION_LEVEL, dictionary_id=DEFAULT_DICTIONARY, layout=CURRENT_LAYOUT):
+    """Binary save (header, metadata, compressed record) for save data as produced by GameState._get_save_data"""
+    compressor = zlib.compressobj(level, zdict=DICTIONARIES[dictionary_id])
+    return (HEADER.pack(MAGIC, FORMAT_VERSION, layout.fingerprint) + METADATA.pack(*(data[field] for field in METADATA_FIELDS))
+            + DICTIONARY_ID.pack(dictionary_id) + compressor.compress(layout.pack(data)) + compressor.flush())
+
+def read_metadata(prefix):
+    """Metadata dict (METADATA_FIELDS) from the first PREFIX_SIZE bytes of a binary save; None if it has none"""
+    magic, version, _ = HEADER.unpack_from(prefix)
+    if magic != MAGIC: raise ValueError("not a binary save")
+    if version < 2: return None
+    metadata = dict(zip(METADATA_FIELDS, METADATA.unpack_from(prefix, HEADER.size)))
+    metadata["player_level"] = int(metadata["player_level"])
+    return metadata
+
+def decode(payload):
+    """Save data dict (same shape as the JSON format) from a binary save"""
+    magic, version, fingerprint = HEADER.unpack_from(payload)
+    if magic != MAGIC: raise ValueError("not a binary save")
+    if not 1 <= version <= FORMAT_VERSION: raise ValueError(f"unsupported binary save version {version}")
+    if fingerprint not in LAYOUTS: raise ValueError("binary save was written for game content with no frozen layout")
+    if version < 3: record = zlib.decompress(payload[HEADER.size if version == 1 else PREFIX_SIZE:])
+    else:
+        dictionary_id, = DICTIONARY_ID.unpack_from(payload, PREFIX_SIZE)
+        if dictionary_id not in DICTIONARIES: raise ValueError(f"save was compressed with unknown dictionary {dictionary_id}")
+        decompressor = zlib.decompressobj(zdict=DICTIONARIES[dictionary_id])
+        record = decompressor.decompress(payload[PREFIX_SIZE + DICTIONARY_ID.size:]) + decompressor.flush()
+    return LAYOUTS[fingerprint].unpack(record, version)
+
+if __name__ == "__main__":
+    print("Froze the current layout" if freeze_current_layout() else "The current layout is already frozen")
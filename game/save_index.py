@@ -0,0 +1,44 @@
+import json
+import os
+
+from game.persistence import atomic_write, read_save_metadata
+
+# --- Save Directory Index ---
+# The load dialog lists a directory of saves with their metadata. Reading that metadata is kept to saves that
+# changed: directory/INDEX_FILENAME caches each save's metadata with the (mtime, size) stamp of the save,
+# and a refresh is one os.scandir pass that only reopens files whose stamps moved.
+
+INDEX_FILENAME = ".save_index.json"
+INDEX_VERSION = 1
+SAVE_EXTENSIONS = (".sav", ".zsave", ".json")
+
+def refresh_index(directory):
+    """[(filename, metadata)] for the saves in directory, by filename; metadata is None for unreadable saves"""
+    index_path = os.path.join(directory, INDEX_FILENAME)
+    try:
+        with open(index_path, "rb") as f: cached = json.load(f)
+        cached = cached["entries"] if cached.get("version") == INDEX_VERSION else {}
+    except (OSError, ValueError, KeyError, AttributeError):
+        cached = {}
+
+    stamps = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_file(): continue
+            stat = entry.stat()
+            stamps[entry.name] = [stat.st_mtime_ns, stat.st_size]
+
+    index = {}
+    for name, stamp in stamps.items():
+        if not name.endswith(SAVE_EXTENSIONS): continue
+        entry = cached.get(name)
+        if entry is None or entry["stamp"] != stamp:
+            try: metadata = read_save_metadata(os.path.join(directory, name))
+            except Exception: metadata = None
+            entry = {"stamp": stamp, "metadata": metadata}
+        index[name] = entry
+
+    if index != cached:
+        try: atomic_write(index_path, json.dumps({"version": INDEX_VERSION, "entries": index}).encode('utf-8'))
+        except OSError: pass # A read-only directory still lists, it just rereads changed saves next time
+    return [(name, index[name]["metadata"]) for name in sorted(index)]
@@ -58,12 +58,13 @@ class ResourceDisplay:
         self.font = pygame.font.SysFont('Arial', 18)  # Increased font size
         self.title_font = pygame.font.SysFont('Arial', 20, bold=True)  # Increased font size
     
-    def render(self, surface):
+    def render(self, surface, amount=None):
         # Format resource name with first letter capitalized
         resource_name = self.resource_type.capitalize()
         
-        # Get current amount and generation rate
-        amount = self.game_state.resources[self.resource_type]
+        # Get current amount (interpolated by the game loop when provided) and generation rate
+        if amount is None:
+            amount = self.game_state.resources[self.resource_type]
         rate = self.game_state.calculate_resource_generation_rate(self.resource_type)
         
         # Determine text color based on resource type
@@ -142,7 +143,7 @@ class RacePanel:
         # Use the provided multiplier
         multiplier = current_multiplier
         count = multiplier if multiplier != -1 else 1  # Use 1 for 'Max' for affordability checkayer can afford to buy this race with the current multiplier
-        purchase_cost = self.game_state.get_race_purchase_cost(self.race_id, count)
+        purchase_cost = self.game_state.quotes.quote("race_purchase", self.race_id, count)
         can_afford = self.game_state.can_afford(purchase_cost)
         
         # Update button states based on affordability
@@ -155,7 +156,7 @@ class RacePanel:
         at_max_level_for_race = self.race_data['level'] >= race_max_level
 
         if has_race and not at_max_level_for_race:
-            upgrade_cost = self.game_state.get_race_upgrade_cost(self.race_id, count)
+            upgrade_cost = self.game_state.quotes.quote("race_upgrade", self.race_id, count)
             can_afford_upgrade = self.game_state.can_afford(upgrade_cost)
             self.upgrade_button.enabled = can_afford_upgrade
         else:
@@ -175,8 +176,7 @@ class RacePanel:
             # multiplier is already provided as a parameteretermine how many to buy
             if multiplier == -1:  # Max
                 # Calculate maximum number of races that can be bought
-                purchase_cost = self.game_state.get_race_purchase_cost(self.race_id)
-                max_affordable = self.game_state.calculate_max_affordable(purchase_cost)
+                max_affordable = self.game_state.quotes.max_affordable("race_purchase", self.race_id)
                 count = max_affordable
             else:
                 count = multiplier
@@ -191,8 +191,7 @@ class RacePanel:
             # multiplier is already provided as a parameteretermine how many times to upgrade
             if multiplier == -1:  # Max
                 # Calculate maximum number of upgrades that can be done
-                upgrade_cost = self.game_state.get_race_upgrade_cost(self.race_id)
-                max_affordable = self.game_state.calculate_max_affordable(upgrade_cost)
+                max_affordable = self.game_state.quotes.max_affordable("race_upgrade", self.race_id)
                 count = max_affordable
             else:
                 count = multiplier
@@ -212,7 +211,7 @@ class RacePanel:
         count = multiplier if multiplier != -1 else 1  # Use 1 for 'Max' for affordability check
         
         # Check if player can afford to buy this race with the current multiplier
-        purchase_cost = self.game_state.get_race_purchase_cost(self.race_id, count)
+        purchase_cost = self.game_state.quotes.quote("race_purchase", self.race_id, count)
         can_afford = self.game_state.can_afford(purchase_cost)
         
         # Draw panel background - gray out if can't afford
@@ -268,16 +267,16 @@ class RacePanel:
         # multiplier is already provided as a parameter
         count = multiplier if multiplier != -1 else 1  # Use 1 for display, 'Max' is handled differently
         
-        cost = self.game_state.get_race_purchase_cost(self.race_id, count)
+        cost = self.game_state.quotes.quote("race_purchase", self.race_id, count)
         cost_text = f"Cost: {cost.get('gold', 0):.1f} gold"
         
         # Add multiplier indicator to cost text if not x1
         if multiplier > 1:
             cost_text = f"Cost (x{multiplier}): {cost.get('gold', 0):.1f} gold"
         elif multiplier == -1:  # Max
-            max_affordable = self.game_state.calculate_max_affordable(self.game_state.get_race_purchase_cost(self.race_id, 1))
+            max_affordable = self.game_state.quotes.max_affordable("race_purchase", self.race_id)
             if max_affordable > 0:
-                max_cost = self.game_state.get_race_purchase_cost(self.race_id, max_affordable)
+                max_cost = self.game_state.quotes.quote("race_purchase", self.race_id, max_affordable)
                 cost_text = f"Cost (Max {max_affordable}): {max_cost.get('gold', 0):.1f} gold"
             else:
                 cost_text = f"Cost (Max): {cost.get('gold', 0):.1f} gold"
@@ -290,7 +289,7 @@ class RacePanel:
         # multiplier is already provided as a parameter
         count = multiplier if multiplier != -1 else 1  # Use 1 for display, 'Max' is handled differently
         
-        upgrade_cost = self.game_state.get_race_upgrade_cost(self.race_id, count)
+        upgrade_cost = self.game_state.quotes.quote("race_upgrade", self.race_id, count)
         upgrade_text = f"Upgrade: {upgrade_cost.get('gold', 0):.1f} gold"
         
         # Add multiplier indicator to upgrade text if not x1
@@ -299,9 +298,9 @@ class RacePanel:
             if multiplier > 1:
                 upgrade_text = f"Upgrade (x{multiplier}): {upgrade_cost.get('gold', 0):.1f} gold"
             elif multiplier == -1:  # Max
-                max_affordable = self.game_state.calculate_max_affordable(self.game_state.get_race_upgrade_cost(self.race_id, 1))
+                max_affordable = self.game_state.quotes.max_affordable("race_upgrade", self.race_id)
                 if max_affordable > 0:
-                    max_cost = self.game_state.get_race_upgrade_cost(self.race_id, max_affordable)
+                    max_cost = self.game_state.quotes.quote("race_upgrade", self.race_id, max_affordable)
                     upgrade_text = f"Upgrade (Max {max_affordable}): {max_cost.get('gold', 0):.1f} gold"
                 else:
                     upgrade_text = f"Upgrade (Max): {upgrade_cost.get('gold', 0):.1f} gold"
@@ -506,7 +505,7 @@ class BuildingPanel:
         count = multiplier if multiplier != -1 else 1  # Use 1 for 'Max' for affordability check
         
         # Check if player can afford to buy this building with the current multiplier
-        purchase_cost = self.game_state.get_building_purchase_cost(self.building_id, count)
+        purchase_cost = self.game_state.quotes.quote("building_purchase", self.building_id, count)
         can_afford = self.game_state.can_afford(purchase_cost)
         
         # Update button states based on affordability
@@ -518,7 +517,7 @@ class BuildingPanel:
         at_max_level = self.building_data['level'] >= self.building_info['max_level']
         
         if has_building and not at_max_level:
-            upgrade_cost = self.game_state.get_building_upgrade_cost(self.building_id, count)
+            upgrade_cost = self.game_state.quotes.quote("building_upgrade", self.building_id, count)
             can_afford_upgrade = self.game_state.can_afford(upgrade_cost)
             self.upgrade_button.enabled = can_afford_upgrade
         else:
@@ -539,7 +538,7 @@ class BuildingPanel:
         count = multiplier if multiplier != -1 else 1
         
         # Check if player can afford to buy this building with the current multiplier
-        purchase_cost = self.game_state.get_building_purchase_cost(self.building_id, count)
+        purchase_cost = self.game_state.quotes.quote("building_purchase", self.building_id, count)
         can_afford = self.game_state.can_afford(purchase_cost)
         
         # Determine background color based on affordability
@@ -597,7 +596,7 @@ class BuildingPanel:
         if multiplier > 1:
             cost_prefix = f"Cost (x{multiplier}): "
         elif multiplier == -1:  # Max
-            max_buy_count = self.game_state.calculate_max_affordable(self.game_state.get_building_purchase_cost(self.building_id, 1))
+            max_buy_count = self.game_state.quotes.max_affordable("building_purchase", self.building_id)
             if max_buy_count > 0:
                 display_count_for_cost = max_buy_count
                 cost_prefix = f"Cost (Max {max_buy_count}): "
@@ -606,7 +605,7 @@ class BuildingPanel:
                 cost_prefix = f"Cost (Max 0): "
         
         # Draw purchase cost
-        actual_cost_to_display = self.game_state.get_building_purchase_cost(self.building_id, display_count_for_cost if multiplier != -1 else (max_buy_count if max_buy_count > 0 else 1) )
+        actual_cost_to_display = self.game_state.quotes.quote("building_purchase", self.building_id, display_count_for_cost if multiplier != -1 else (max_buy_count if max_buy_count > 0 else 1) )
         cost_text_parts = []
         for resource, amount in actual_cost_to_display.items():
             cost_text_parts.append(f"{resource.capitalize()}: {amount:.1f}")
@@ -635,7 +634,7 @@ class BuildingPanel:
             if multiplier > 1:
                 upgrade_prefix = f"Upgrade (x{multiplier}): "
             elif multiplier == -1:  # Max
-                max_upgrade_count = self.game_state.calculate_max_affordable(self.game_state.get_building_upgrade_cost(self.building_id, 1))
+                max_upgrade_count = self.game_state.quotes.max_affordable("building_upgrade", self.building_id)
                 if max_upgrade_count > 0:
                     display_count_for_upgrade = max_upgrade_count
                     upgrade_prefix = f"Upgrade (Max {max_upgrade_count}): "
@@ -643,7 +642,7 @@ class BuildingPanel:
                     display_count_for_upgrade = 1 # Show cost for 1 if cannot afford any for Max
                     upgrade_prefix = f"Upgrade (Max 0): "
             
-            actual_upgrade_cost_to_display = self.game_state.get_building_upgrade_cost(self.building_id, display_count_for_upgrade if multiplier != -1 else (max_upgrade_count if max_upgrade_count > 0 else 1))
+            actual_upgrade_cost_to_display = self.game_state.quotes.quote("building_upgrade", self.building_id, display_count_for_upgrade if multiplier != -1 else (max_upgrade_count if max_upgrade_count > 0 else 1))
             upgrade_text_parts = []
             for resource, amount in actual_upgrade_cost_to_display.items():
                 upgrade_text_parts.append(f"{resource.capitalize()}: {amount:.1f}")
@@ -804,7 +803,7 @@ class ResearchPanel:
         count = multiplier if multiplier != -1 else 1  # Use 1 for 'Max' for affordability check
         
         # Check if player can afford to research with the current multiplier
-        research_cost = self.game_state.get_research_cost(self.research_id, count)
+        research_cost = self.game_state.quotes.quote("research", self.research_id, count)
         can_afford = self.game_state.can_afford(research_cost)
         at_max_level = self.research_data['level'] >= self.research_info['max_level']
         
@@ -824,7 +823,7 @@ class ResearchPanel:
         count = multiplier if multiplier != -1 else 1
         
         # Check if player can afford to research with the current multiplier
-        research_cost = self.game_state.get_research_cost(self.research_id, count)
+        research_cost = self.game_state.quotes.quote("research", self.research_id, count)
         can_afford = self.game_state.can_afford(research_cost)
         at_max_level = self.research_data['level'] >= self.research_info['max_level']
         
@@ -880,7 +879,7 @@ class ResearchPanel:
         count = multiplier if multiplier != -1 else 1  # Use 1 for display, 'Max' is handled differently
         
         # Draw research cost with current multiplier
-        cost = self.game_state.get_research_cost(self.research_id, count)
+        cost = self.game_state.quotes.quote("research", self.research_id, count)
         cost_text_parts = []
         for resource, amount in cost.items():
             cost_text_parts.append(f"{resource.capitalize()}: {amount:.1f}")
@@ -893,18 +892,13 @@ class ResearchPanel:
         if multiplier > 1:
             cost_prefix = f"Cost (x{multiplier}): "
         elif multiplier == -1:  # Max
-            max_affordable_levels = self.game_state.calculate_max_affordable_levels(
-                self.research_id, 
-                'get_research_cost', 
-                self.research_data['level'], 
-                self.research_info['max_level']
-            )
+            max_affordable_levels = self.game_state.quotes.max_affordable("research", self.research_id)
             if max_affordable_levels > 0:
-                actual_cost_to_display = self.game_state.get_research_cost(self.research_id, count=max_affordable_levels)
+                actual_cost_to_display = self.game_state.quotes.quote("research", self.research_id, max_affordable_levels)
                 cost_prefix = f"Cost (Max {max_affordable_levels}): "
             else:
                 # Show cost for 1 level if cannot afford any for Max
-                actual_cost_to_display = self.game_state.get_research_cost(self.research_id, count=1) 
+                actual_cost_to_display = self.game_state.quotes.quote("research", self.research_id, 1) 
                 cost_prefix = f"Cost (Max 0): "
         
         cost_text_parts = [] # Re-calculate parts based on actual_cost_to_display
@@ -1062,7 +1056,7 @@ class PrestigePanel:
         count = multiplier if multiplier != -1 else 1  # Use 1 for 'Max' for affordability check
         
         # Check if player can afford to purchase with the current multiplier
-        purchase_cost = self.game_state.get_prestige_upgrade_cost(self.upgrade_id, count)
+        purchase_cost = self.game_state.quotes.quote("prestige_upgrade", self.upgrade_id, count)
         can_afford = self.game_state.can_afford(purchase_cost)
         at_max_level = self.upgrade_data['level'] >= self.upgrade_info['max_level']
         
@@ -1079,7 +1073,7 @@ class PrestigePanel:
         count = multiplier if multiplier != -1 else 1
         
         # Check if player can afford to purchase with the current multiplier
-        purchase_cost = self.game_state.get_prestige_upgrade_cost(self.upgrade_id, count)
+        purchase_cost = self.game_state.quotes.quote("prestige_upgrade", self.upgrade_id, count)
         can_afford = self.game_state.can_afford(purchase_cost)
         at_max_level = self.upgrade_data['level'] >= self.upgrade_info['max_level']
         
@@ -1131,7 +1125,7 @@ class PrestigePanel:
         count = multiplier if multiplier != -1 else 1  # Use 1 for display, 'Max' is handled differently
         
         # Draw upgrade cost with current multiplier
-        cost = self.game_state.get_prestige_upgrade_cost(self.upgrade_id, count)
+        cost = self.game_state.quotes.quote("prestige_upgrade", self.upgrade_id, count)
         
         # Base cost text
         cost_prefix = "Cost: "
@@ -1141,18 +1135,13 @@ class PrestigePanel:
         if multiplier > 1:
             cost_prefix = f"Cost (x{multiplier}): "
         elif multiplier == -1:  # Max
-            max_affordable_levels = self.game_state.calculate_max_affordable_levels(
-                self.upgrade_id,
-                'get_prestige_upgrade_cost',
-                self.upgrade_data['level'],
-                self.upgrade_info['max_level']
-            )
+            max_affordable_levels = self.game_state.quotes.max_affordable("prestige_upgrade", self.upgrade_id)
             if max_affordable_levels > 0:
-                actual_cost_to_display = self.game_state.get_prestige_upgrade_cost(self.upgrade_id, count=max_affordable_levels)
+                actual_cost_to_display = self.game_state.quotes.quote("prestige_upgrade", self.upgrade_id, max_affordable_levels)
                 cost_prefix = f"Cost (Max {max_affordable_levels}): "
             else:
                 # Show cost for 1 level if cannot afford any for Max
-                actual_cost_to_display = self.game_state.get_prestige_upgrade_cost(self.upgrade_id, count=1)
+                actual_cost_to_display = self.game_state.quotes.quote("prestige_upgrade", self.upgrade_id, 1)
                 cost_prefix = f"Cost (Max 0): "
         
         cost_text = f"{cost_prefix}{actual_cost_to_display.get('prestige_points', 0)} prestige points"
@@ -1242,7 +1231,7 @@ class NotificationPanel:
         
     def update(self, mouse_pos=None):
         # Remove expired notifications
-        current_time = pygame.time.get_ticks()
+        current_time = self.game_state.clock.ticks()
         self.game_state.notifications = [
             notif for notif in self.game_state.notifications 
             if current_time - notif["time"] < self.notification_lifetime
@@ -1278,7 +1267,7 @@ class NotificationPanel:
         
         for i, notification in enumerate(reversed(notifications_to_show)):
             # Calculate alpha based on time remaining
-            current_time = pygame.time.get_ticks()
+            current_time = self.game_state.clock.ticks()
             time_elapsed = current_time - notification["time"]
             alpha = 255
             
@@ -1,8 +1,11 @@
 import pygame
 import os
 import random
+import time
 from game.constants import (SCREEN_WIDTH, SCREEN_HEIGHT, PANEL_COLOR, TEXT_COLOR, 
-                           BUTTON_COLOR, BUTTON_HOVER_COLOR, GOLD_COLOR, PURPLE_COLOR, BLUE_COLOR)
+                           BUTTON_COLOR, BUTTON_HOVER_COLOR, GOLD_COLOR, PURPLE_COLOR, BLUE_COLOR, DISABLED_TEXT_COLOR)
+from game.autosave import AutosaveWorker
+from game.save_index import refresh_index
 from game.ui.components import (Button, Panel, ResourceDisplay, RacePanel, 
                                BuildingPanel, ResearchPanel, PrestigePanel, AchievementPanel, NotificationPanel, BulkPurchasePanel)
 
@@ -15,6 +18,7 @@ class UIManager:
         self.scale_factor = 1.0
         self.font = pygame.font.SysFont('Arial', 18)
         self.title_font = pygame.font.SysFont('Arial', 24, bold=True)
+        self.small_font = pygame.font.SysFont('Arial', 14)
         
         # Active tab
         self.tabs = ["races", "buildings", "research", "prestige", "achievements"]
@@ -34,9 +38,15 @@ class UIManager:
         self.tabs = ["races", "buildings", "research", "prestige", "achievements"]
         self.active_tab = "races"
         
-        # Autosave timer
+        # Interpolated resource amounts supplied by the game loop (None shows raw simulation values)
+        self.display_resources = None
+        
+        # Autosave timer; snapshots are written by a background worker so frames never wait on disk
         self.last_autosave_time = pygame.time.get_ticks()
-        self.autosave_interval = 300000  # 5 minutes
+        self.autosave_interval = 30000  # 30 seconds; each autosave is a small binary snapshot written off the main thread
+        self.autosave_notice_interval = 300000  # 5 minutes between "Game autosaved!" notices, failures always show
+        self.last_autosave_notice_time = self.last_autosave_time
+        self.autosaver = AutosaveWorker()
         
         # Save/load dialog state
         self.show_save_dialog = False
@@ -60,6 +70,7 @@ class UIManager:
             os.makedirs(self.saves_dir, exist_ok=True)
         
         self.available_save_files = []
+        self.save_file_metadata = {} # filename -> metadata from the saves index (None if unreadable)
         self.selected_save_file_index = -1 # For highlighting, not fully used yet
         self.save_file_display_rects = []
         self.load_dialog_scroll_offset = 0
@@ -144,6 +155,10 @@ class UIManager:
         # Reinitialize UI components with new dimensions
         self.init_components()
     
+    def set_display_resources(self, amounts):
+        """Set the interpolated resource amounts shown in the resource bar"""
+        self.display_resources = amounts
+    
     def init_components(self):
         # Create main panels
         self.resource_panel = Panel(
@@ -261,16 +276,18 @@ class UIManager:
         )
 
     def _populate_save_files_list(self):
-        """Scans the saves directory and populates the list of available .sav files."""
+        """Lists the saves in the saves directory with their metadata, from its incrementally refreshed index."""
         self.available_save_files = []
+        self.save_file_metadata = {}
         self.save_file_display_rects = [] # Clear old rects
         self.load_dialog_scroll_offset = 0
         try:
             # Ensure saves_dir is an absolute path or correctly relative to the execution directory
             # For robustness, construct path relative to this file's location if needed,
             # but for now, assume "saves/" at root is fine as per os.makedirs in __init__.
-            raw_files = os.listdir(self.saves_dir)
-            self.available_save_files = sorted([f for f in raw_files if f.endswith(".sav")])
+            listing = refresh_index(self.saves_dir)
+            self.available_save_files = [filename for filename, _ in listing]
+            self.save_file_metadata = dict(listing)
         except FileNotFoundError:
             print(f"Warning: Saves directory '{self.saves_dir}' not found.")
             # self.game_state.add_notification(f"Saves directory '{self.saves_dir}' not found.", notification_type="error")
@@ -631,8 +648,7 @@ class UIManager:
                     if panel.buy_button.is_clicked(self.mouse_pos):
                         # For Max purchases, calculate the maximum affordable count
                         if current_multiplier == -1:
-                            base_cost = self.game_state.get_race_purchase_cost(race_id, 1)
-                            max_count = self.game_state.calculate_max_affordable(base_cost)
+                            max_count = self.game_state.quotes.max_affordable("race_purchase", race_id)
                             if max_count > 0:
                                 purchase_count = max_count
                             else:
@@ -641,15 +657,14 @@ class UIManager:
                             purchase_count = current_multiplier
                         
                         # Calculate cost for the actual count we're purchasing
-                        cost = self.game_state.get_race_purchase_cost(race_id, int(purchase_count))
+                        cost = self.game_state.quotes.quote("race_purchase", race_id, int(purchase_count))
                         if self.game_state.spend_resources(cost):
                             self.game_state.add_race(race_id, int(purchase_count))
                     
                     if panel.upgrade_button.is_clicked(self.mouse_pos):
                         # For Max upgrades, calculate the maximum affordable count
                         if current_multiplier == -1:
-                            base_cost = self.game_state.get_race_upgrade_cost(race_id, 1)
-                            max_count = self.game_state.calculate_max_affordable(base_cost)
+                            max_count = self.game_state.quotes.max_affordable("race_upgrade", race_id)
                             if max_count > 0:
                                 upgrade_count = max_count
                             else:
@@ -658,7 +673,7 @@ class UIManager:
                             upgrade_count = current_multiplier
                         
                         # Calculate cost for the actual count we're upgrading
-                        cost = self.game_state.get_race_upgrade_cost(race_id, int(upgrade_count))
+                        cost = self.game_state.quotes.quote("race_upgrade", race_id, int(upgrade_count))
                         if self.game_state.spend_resources(cost):
                             self.game_state.upgrade_race(race_id, int(upgrade_count))
             
@@ -671,8 +686,7 @@ class UIManager:
                     if panel.buy_button.is_clicked(self.mouse_pos):
                         # For Max purchases, calculate the maximum affordable count
                         if current_multiplier == -1:
-                            base_cost = self.game_state.get_building_purchase_cost(building_id, 1)
-                            max_count = self.game_state.calculate_max_affordable(base_cost)
+                            max_count = self.game_state.quotes.max_affordable("building_purchase", building_id)
                             if max_count > 0:
                                 purchase_count = max_count
                             else:
@@ -681,15 +695,14 @@ class UIManager:
                             purchase_count = current_multiplier
                         
                         # Calculate cost for the actual count we're purchasing
-                        cost = self.game_state.get_building_purchase_cost(building_id, int(purchase_count))
+                        cost = self.game_state.quotes.quote("building_purchase", building_id, int(purchase_count))
                         if self.game_state.spend_resources(cost):
                             self.game_state.add_building(building_id, int(purchase_count))
                     
                     if panel.upgrade_button.is_clicked(self.mouse_pos):
                         # For Max upgrades, calculate the maximum affordable count
                         if current_multiplier == -1:
-                            base_cost = self.game_state.get_building_upgrade_cost(building_id, 1)
-                            max_count = self.game_state.calculate_max_affordable(base_cost)
+                            max_count = self.game_state.quotes.max_affordable("building_upgrade", building_id)
                             if max_count > 0:
                                 upgrade_count = max_count
                             else:
@@ -698,7 +711,7 @@ class UIManager:
                             upgrade_count = current_multiplier
                         
                         # Calculate cost for the actual count we're upgrading
-                        cost = self.game_state.get_building_upgrade_cost(building_id, int(upgrade_count))
+                        cost = self.game_state.quotes.quote("building_upgrade", building_id, int(upgrade_count))
                         if self.game_state.spend_resources(cost):
                             self.game_state.upgrade_building(building_id, int(upgrade_count))
             
@@ -706,7 +719,7 @@ class UIManager:
                 # Handle research panel buttons
                 for research_id, panel in self.research_panels.items():
                     if panel.research_button.is_clicked(self.mouse_pos):
-                        cost = self.game_state.get_research_cost(research_id)
+                        cost = self.game_state.quotes.quote("research", research_id)
                         if self.game_state.spend_resources(cost):
                             self.game_state.research_technology(research_id)
             
@@ -714,7 +727,7 @@ class UIManager:
                 # Handle prestige upgrade panel buttons
                 for upgrade_id, panel in self.prestige_upgrade_panels.items():
                     if panel.buy_button.is_clicked(self.mouse_pos):
-                        cost = self.game_state.get_prestige_upgrade_cost(upgrade_id)
+                        cost = self.game_state.quotes.quote("prestige_upgrade", upgrade_id)
                         if self.game_state.spend_resources(cost):
                             self.game_state.purchase_prestige_upgrade(upgrade_id)
     
@@ -722,12 +735,23 @@ class UIManager:
         # Update mouse position
         self.mouse_pos = pygame.mouse.get_pos()
         
+        # Resources moved since the last frame, so Max counts are re-solved (quotes stay until a purchase)
+        self.game_state.quotes.begin_frame()
+        
         # Check for autosave
         current_time = pygame.time.get_ticks()
         if current_time - self.last_autosave_time > self.autosave_interval:
-            if self.game_state.save_game("autosave.json", compressed=True):
-                self.game_state.add_notification("Game autosaved!")
+            self.autosaver.submit(self.game_state.get_save_snapshot(), "autosave.json", compressed=True)
             self.last_autosave_time = current_time
+        for path, save_time, error in self.autosaver.poll():
+            if error is None:
+                self.game_state.last_save_time = save_time
+                if current_time - self.last_autosave_notice_time >= self.autosave_notice_interval:
+                    self.game_state.add_notification("Game autosaved!")
+                    self.last_autosave_notice_time = current_time
+            else:
+                print(f"Error saving game: {error}")
+                self.game_state.add_notification("Autosave failed!", details=f"Could not write {path}: {error}", notification_type="error")
         
         # Update settings panel button positions if panel is shown
         if self.show_settings_panel:
@@ -799,8 +823,8 @@ class UIManager:
     def render(self):
         # Render resource panel and displays
         self.resource_panel.render(self.screen)
-        for display in self.resource_displays.values():
-            display.render(self.screen)
+        for resource, display in self.resource_displays.items():
+            display.render(self.screen, self.display_resources.get(resource) if self.display_resources else None)
         
         # Render tab buttons
         for tab, button in self.tab_buttons.items():
@@ -1338,8 +1362,10 @@ class UIManager:
             self.game_state.add_notification("Please enter a valid filename!")
             return
         
+        if filename in self.available_save_files:
+            filename = os.path.join(self.saves_dir, filename)
         # Add .json extension if not present
-        if not filename.endswith(".json"):
+        elif not filename.endswith(".json"):
             filename += ".json"
         
         if self.game_state.load_game(filename):
@@ -1527,7 +1553,7 @@ class UIManager:
         self.save_file_display_rects.clear() # Clear previous rects
 
         if not self.available_save_files:
-            no_files_text = self.font.render("No .sav files found.", True, DISABLED_TEXT_COLOR)
+            no_files_text = self.font.render("No saves found.", True, DISABLED_TEXT_COLOR)
             self.screen.blit(no_files_text, (list_area_rect.x + 10, list_area_rect.y + 10))
         else:
             start_index = self.load_dialog_scroll_offset
@@ -1550,6 +1576,8 @@ class UIManager:
                     pygame.draw.rect(self.screen, BUTTON_HOVER_COLOR, item_rect) 
                 
                 self.screen.blit(file_text_surface, (item_rect.x + 5, item_rect.y + (self.save_file_list_item_height - file_text_surface.get_height()) // 2))
+                details_surface = self.small_font.render(self._describe_save(self.save_file_metadata.get(filename)), True, DISABLED_TEXT_COLOR)
+                self.screen.blit(details_surface, (item_rect.right - details_surface.get_width() - 5, item_rect.y + (self.save_file_list_item_height - details_surface.get_height()) // 2))
 
         # Buttons (position adjusted due to increased dialog height)
         button_y_pos = dialog_y + dialog_height - 50
@@ -1576,6 +1604,13 @@ class UIManager:
         self.screen.blit(cancel_text, (cancel_button_rect.x + (cancel_button_rect.width - cancel_text.get_width()) // 2, 
                                     cancel_button_rect.y + (cancel_button_rect.height - cancel_text.get_height()) // 2))
     
+    def _describe_save(self, metadata):
+        """One-line summary of a save for the load dialog: level, prestiges, play time and when it was saved"""
+        if not metadata: return "unreadable"
+        play_time = int(metadata["total_play_time"] or 0)
+        saved = time.strftime("%m-%d %H:%M", time.localtime(metadata["save_time"])) if metadata["save_time"] else "?"
+        return f"Lv {metadata['player_level']}  P{metadata['prestige_count']}  {play_time // 3600}h {play_time % 3600 // 60}m  {saved}"
+
     def _render_export_dialog(self):
         """Render the export save dialog"""
         # Draw dialog background
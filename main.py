@@ -1,10 +1,13 @@
 import pygame
 import sys
-import time
 import os
+import numpy as np
+from game.clock import MonotonicClock
 from game.game_state import GameState
 from game.ui.ui_manager import UIManager
-from game.constants import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BACKGROUND_COLOR, GAME_TITLE
+from game.constants import (SCREEN_WIDTH, SCREEN_HEIGHT, FPS, BACKGROUND_COLOR, GAME_TITLE, RESOURCE_TYPES,
+                            SIMULATION_RATE, MAX_SIMULATION_STEPS_PER_FRAME, MAX_SIMULATION_BACKLOG,
+                            TIME_WARP_FRAME_BUDGET)
 
 class Game:
     def __init__(self):
@@ -26,16 +29,21 @@ class Game:
         self.screen = pygame.display.set_mode((self.width, self.height))
         self.clock = pygame.time.Clock()
         self.running = True
-        self.last_update_time = time.time()
         
         # Track if window is being resized
         self.is_resizing = False
         self.resize_cooldown = 0
         
         # Initialize game state and UI
-        self.game_state = GameState()
+        self.game_state = GameState(clock=MonotonicClock())
+        self.last_update_time = self.game_state.clock.time()
         self.ui_manager = UIManager(self.screen, self.game_state)
         
+        # Fixed-timestep simulation, decoupled from the render rate
+        self.sim_step = 1.0 / SIMULATION_RATE
+        self.sim_accumulator = 0.0
+        self.last_step_delta = np.zeros(len(RESOURCE_TYPES))
+        
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -50,12 +58,32 @@ class Game:
             self.ui_manager.handle_event(event)
     
     def update(self):
-        current_time = time.time()
+        current_time = self.game_state.clock.time()
         elapsed_time = current_time - self.last_update_time
         self.last_update_time = current_time
         
-        # Update game state (idle progression)
-        self.game_state.update(elapsed_time)
+        # Update game state (idle progression) in fixed steps so outcomes don't depend on frame pacing
+        self.sim_accumulator += elapsed_time
+        if self.sim_accumulator > MAX_SIMULATION_BACKLOG:
+            # Long stall (window drag, system sleep): integrate the excess in closed form instead of spiralling
+            self.game_state.catch_up(self.sim_accumulator - MAX_SIMULATION_BACKLOG)
+            self.sim_accumulator = MAX_SIMULATION_BACKLOG
+        
+        steps = 0
+        while self.sim_accumulator >= self.sim_step and steps < MAX_SIMULATION_STEPS_PER_FRAME:
+            before = self.game_state.resources.vector.copy()
+            self.game_state.update(self.sim_step)
+            self.last_step_delta = self.game_state.resources.vector - before
+            self.sim_accumulator -= self.sim_step
+            steps += 1
+        
+        # Time Warp: the extra virtual time runs as more fixed steps, only as many as fit the frame's CPU budget
+        self.game_state.fast_forward(self.sim_step, TIME_WARP_FRAME_BUDGET)
+        
+        # Interpolate displayed amounts through the last step; purchases show up immediately since only production is blended
+        alpha = min(self.sim_accumulator / self.sim_step, 1.0)
+        display = self.game_state.resources.vector - self.last_step_delta * (1.0 - alpha)
+        self.ui_manager.set_display_resources(self.game_state.resources.amounts(display))
         
         # Update UI
         self.ui_manager.update()
@@ -91,6 +119,7 @@ class Game:
             self.render()
             self.clock.tick(FPS)
         
+        self.ui_manager.autosaver.close() # Let an in-flight autosave finish writing
         pygame.quit()
         sys.exit()
 
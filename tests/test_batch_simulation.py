@@ -0,0 +1,7 @@
+from game.batch_simulation import simulate_realm
+
+def test_generated_realms_are_seeded_and_distinct():
+    rows = [simulate_realm(None, 120, seed=(3, index)) for index in range(3)]
+    assert not any(row["error"] for row in rows)
+    assert len({row["total_earnings"] for row in rows}) == 3
+    assert simulate_realm(None, 120, seed=(3, 0))["gold"] == rows[0]["gold"]
@@ -0,0 +1,59 @@
+import json
+import math
+import random
+
+import pytest
+
+from game import bignum
+from game.bignum import BigNum
+from game.clock import VirtualClock
+from game.game_state import GameState
+from game.logic import costs
+
+def test_arithmetic_matches_floats():
+    rnd = random.Random(0)
+    for _ in range(500):
+        a, b = rnd.uniform(-1, 1) * 10 ** rnd.uniform(-5, 100), rnd.uniform(0.1, 1) * 10 ** rnd.uniform(-5, 100)
+        x, y = BigNum(a), BigNum(b)
+        assert float(x + y) == pytest.approx(a + b, rel=1e-12, abs=1e-300)
+        assert float(x - y) == pytest.approx(a - b, rel=1e-12, abs=1e-300)
+        assert float(x * y) == pytest.approx(a * b, rel=1e-12)
+        assert float(x / y) == pytest.approx(a / b, rel=1e-12)
+        assert float(y ** 1.5) == pytest.approx(b ** 1.5, rel=1e-12)
+        assert y.log10() == pytest.approx(math.log10(b), rel=1e-12, abs=1e-12)
+        assert (x < y) == (a < b) and (x >= b) == (a >= b) and (x == a)
+
+def test_values_past_the_float_range():
+    huge = BigNum(2.5, 400)
+    assert huge > 1e308 and not huge > math.inf and -huge < -1e308
+    assert (huge * huge).exponent == 800
+    assert (huge + 1e300) == huge # Below the mantissa's precision
+    assert (huge / BigNum(2.5, 100)) == pytest.approx(1e300)
+    assert bignum.compact(huge / BigNum(1.0, 200)) == pytest.approx(2.5e200)
+    assert isinstance(bignum.compact(huge), BigNum) and isinstance(bignum.compact(BigNum(1.0, 10)), float)
+
+def test_json_round_trip():
+    for value in (0.0, 12.5, 1e299, BigNum(9.99, 301), BigNum(-3.0, 12345)):
+        text = json.dumps(bignum.to_json(value))
+        assert bignum.from_json(json.loads(text)) == value
+
+def test_costs_past_the_float_range():
+    # Race upgrade quotes double per level and used to raise OverflowError past level ~1024
+    total = costs.geometric_total(50.0, 2.0, 2000, 10)
+    assert isinstance(total, BigNum)
+    assert total.log10() == pytest.approx(math.log10(50.0) + 2000 * math.log10(2.0) + math.log10(2.0 ** 10 - 1), rel=1e-12) # 50 * 2**2000 * (2**10 - 1)
+    assert costs.max_geometric_count(50.0, 2.0, 2000, total) == pytest.approx(10, rel=1e-9)
+    assert isinstance(costs.linear_total(10.0, 0.15, 1e200, 1e200), BigNum)
+
+def test_resource_pool_and_saves_carry_big_amounts():
+    game_state = GameState(clock=VirtualClock(0.0))
+    game_state.resources["gold"] = BigNum(3.0, 500)
+    cost = {"gold": BigNum(1.0, 500)}
+    assert game_state.can_afford(cost) and game_state.spend_resources(cost)
+    assert game_state.resources["gold"] == BigNum(2.0, 500)
+    game_state.resources.add(game_state.resources.vector * 0.0 + 1.0) # Float amounts scale into the big slot
+    assert game_state.resources["gold"] == BigNum(2.0, 500) and game_state.resources["wood"] == 1.0
+    restored = GameState(clock=VirtualClock(0.0))
+    restored._apply_save_data(json.loads(json.dumps(game_state.get_save_snapshot())))
+    assert restored.resources["gold"] == BigNum(2.0, 500)
+    assert not game_state.can_afford({"gold": BigNum(1.0, 501)})
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from game.clock import VirtualClock
+from game.constants import RACES, BUILDINGS, RESEARCH, PRESTIGE_UPGRADES
+from game.game_state import GameState
+from game.logic import costs
+
+# Reference quotes: the per-unit loops the closed forms replaced
+def loop_linear(unit_cost, growth, start, count):
+    return sum(unit_cost * (1.0 + growth * (start + i)) for i in range(count))
+
+def loop_geometric(unit_cost, ratio, start, count):
+    return sum(unit_cost * ratio ** (start + i) for i in range(count))
+
+def random_realm(rnd):
+    game_state = GameState(clock=VirtualClock(0.0))
+    for race in game_state.races.values(): race.update(count=rnd.randint(0, 500), level=rnd.randint(1, 40))
+    for building in game_state.buildings.values(): building.update(count=rnd.randint(0, 500), level=rnd.randint(1, 10))
+    for research in game_state.research.values(): research["level"] = rnd.randint(0, 10)
+    for upgrade in game_state.prestige_upgrades.values(): upgrade["level"] = rnd.randint(0, 10)
+    game_state.achievement_rewards.building_cost_reduction = rnd.choice([1.0, 0.95])
+    return game_state
+
+def assert_same_quote(quote, reference):
+    assert quote.keys() == reference.keys()
+    for resource, amount in reference.items(): assert quote[resource] == pytest.approx(amount, rel=1e-12), resource
+
+@pytest.mark.parametrize("seed", range(10))
+def test_quotes_match_loop_versions(seed):
+    rnd = random.Random(seed)
+    game_state = random_realm(rnd)
+    for count in (1, 10, 100, rnd.randint(2, 200)): # Within the float range; BigNum quotes are covered in test_bignum
+        for race_id, race in game_state.races.items():
+            assert_same_quote(game_state.get_race_purchase_cost(race_id, count), {"gold": loop_linear(RACES[race_id]["base_cost"], 0.15, race["count"], count)})
+            assert_same_quote(game_state.get_race_upgrade_cost(race_id, count), {"gold": loop_geometric(RACES[race_id]["base_cost"] * 5, 2.0, race["level"] - 1, count)})
+        reduction = game_state.achievement_rewards.building_cost_reduction
+        for building_id, building in game_state.buildings.items():
+            base_cost = BUILDINGS[building_id]["base_cost"]
+            assert_same_quote(game_state.get_building_purchase_cost(building_id, count),
+                              {r: loop_linear(a * reduction, 0.2, building["count"], count) for r, a in base_cost.items()})
+            assert_same_quote(game_state.get_building_upgrade_cost(building_id, count),
+                              {r: loop_geometric(a * reduction * 2.0, 2.0, building["level"] - 1, count) for r, a in base_cost.items()})
+        for research_id, research in game_state.research.items():
+            info = RESEARCH[research_id]
+            assert_same_quote(game_state.get_research_cost(research_id, count),
+                              {r: loop_geometric(a, info["cost_scaling"], research["level"], count) for r, a in info["cost"].items()})
+        for upgrade_id, upgrade in game_state.prestige_upgrades.items():
+            info = PRESTIGE_UPGRADES[upgrade_id]
+            assert_same_quote(game_state.get_prestige_upgrade_cost(upgrade_id, count),
+                              {r: loop_geometric(a, info.get("cost_scaling", 1.0), upgrade["level"], count) for r, a in info["cost"].items()})
+
+@pytest.mark.parametrize("ratio", [0.5, 1.0, 1.07, 2.0])
+def test_geometric_total_matches_loop(ratio):
+    for start in (0, 3, 40):
+        for count in (0, 1, 7, 200):
+            assert costs.geometric_total(12.5, ratio, start, count) == pytest.approx(loop_geometric(12.5, ratio, start, count), rel=1e-12, abs=1e-300)
+
+def test_linear_total_matches_loop():
+    for growth in (0.0, 0.15, 0.2):
+        for start in (0, 17, 5000):
+            for count in (0, 1, 9, 1000):
+                assert costs.linear_total(40.0, growth, start, count) == pytest.approx(loop_linear(40.0, growth, start, count), rel=1e-12)
+
+def test_max_affordable_matches_brute_force():
+    rnd = random.Random(1)
+    game_state = random_realm(rnd)
+    for resource in list(game_state.resources.keys()): game_state.resources[resource] = 10 ** rnd.uniform(0, 9)
+    for action, ids, quote in (("race_purchase", RACES, game_state.get_race_purchase_cost),
+                               ("building_purchase", BUILDINGS, game_state.get_building_purchase_cost),
+                               ("research", RESEARCH, game_state.get_research_cost)):
+        for item_id in ids:
+            cap = RESEARCH[item_id]["max_level"] - game_state.research[item_id]["level"] if action == "research" else 5000
+            expected = 0
+            while expected < cap and game_state.can_afford(quote(item_id, expected + 1)): expected += 1
+            assert game_state.get_max_affordable(action, item_id) == expected, (action, item_id)
+
+def test_max_affordable_is_affordable_past_float_precision():
+    # Counts around 1e16 and up land further from the exact quote than the whole-unit correction reaches
+    rnd = random.Random(2)
+    for _ in range(300):
+        game_state = GameState(clock=VirtualClock(0.0))
+        for resource in list(game_state.resources.keys()): game_state.resources[resource] = 10 ** rnd.uniform(15, 60)
+        race_id, building_id = rnd.choice(list(RACES)), rnd.choice(list(BUILDINGS))
+        game_state.races[race_id]["count"] = rnd.randint(0, 10 ** 6)
+        count = game_state.get_max_affordable("race_purchase", race_id)
+        assert count > 0 and game_state.can_afford(game_state.get_race_purchase_cost(race_id, count))
+        count = game_state.get_max_affordable("building_purchase", building_id)
+        assert count > 0 and game_state.can_afford(game_state.get_building_purchase_cost(building_id, count))
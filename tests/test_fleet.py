@@ -0,0 +1,56 @@
+import random
+
+import pytest
+
+from game.clock import VirtualClock
+from game.constants import RESOURCE_TYPES
+from game.game_state import GameState
+from game.logic.achievements import AchievementRewards
+from game.logic.fleet import Fleet
+from game.logic.production import PRODUCED_MASK
+
+def random_realm(rnd):
+    """A realm with random races, buildings, research and prestige; no abilities, achievements or skills,
+    which the fleet doesn't model"""
+    game_state = GameState(clock=VirtualClock(0.0))
+    game_state.player_level, game_state.prestige_count = rnd.randint(1, 60), rnd.randint(0, 5)
+    game_state.permanent_multipliers["all"] = rnd.choice([1.0, 1.5])
+    for race in game_state.races.values(): race.update(count=rnd.choice([0, 4, 30]), level=rnd.randint(1, 6))
+    for building in game_state.buildings.values(): building.update(count=rnd.choice([0, 1, 7]), level=rnd.randint(1, 4))
+    for research in game_state.research.values(): research.update(level=rnd.choice([0, 1, 3]))
+    game_state.check_unlocks() # Unlocks by level and prestige, like the fleet
+    game_state.invalidate_production_plan()
+    return game_state
+
+@pytest.mark.parametrize("seed", range(30))
+def test_fleet_rates_match_game_state(seed):
+    game_state = random_realm(random.Random(seed))
+    rates = Fleet.from_game_states([game_state]).production_rates()[0]
+    for resource, produced, rate in zip(RESOURCE_TYPES, PRODUCED_MASK, rates):
+        expected = game_state.calculate_resource_generation_rate(resource) * game_state.calculate_global_multiplier(resource) if produced else 0.0
+        assert rate == pytest.approx(expected, rel=1e-9, abs=1e-9), resource
+
+@pytest.mark.parametrize("earned", [False, True])
+def test_fleet_building_costs_match_game_state(earned):
+    game_state = random_realm(random.Random(1))
+    game_state.achievements["building_milestones"]["first_building"] = earned
+    game_state.achievement_rewards = AchievementRewards(game_state.achievements)
+    for resource in RESOURCE_TYPES: game_state.resources[resource] = 1e15
+    building_id = next(b for b, data in game_state.buildings.items() if data["unlocked"] and data["count"] > 0)
+    for action, quote in (("buy_buildings", game_state.get_building_purchase_cost(building_id, 5)),
+                          ("upgrade_buildings", game_state.get_building_upgrade_cost(building_id, 2))):
+        fleet = Fleet.from_game_states([game_state])
+        before = fleet.resources[0].copy()
+        assert getattr(fleet, action)(building_id, 5 if action == "buy_buildings" else 2)[0]
+        spent = dict(zip(RESOURCE_TYPES, before - fleet.resources[0]))
+        for resource in RESOURCE_TYPES: assert spent[resource] == pytest.approx(quote.get(resource, 0.0), rel=1e-9), (action, resource)
+
+def test_fleet_earns_the_first_building_reduction():
+    fleet = Fleet(1)
+    fleet.resources[:] = 1e9
+    building_id = fleet.tables.building_ids[0]
+    fleet.unlocked["buildings"][:] = True
+    fleet.buy_buildings(building_id)
+    game_state = GameState(clock=VirtualClock(0.0))
+    game_state.achievements["building_milestones"]["first_building"] = True
+    assert fleet.building_cost_reduction[0] == AchievementRewards(game_state.achievements).building_cost_reduction
@@ -0,0 +1,50 @@
+import pytest
+
+from game.clock import VirtualClock
+from game.constants import RESOURCE_TYPES
+from game.game_state import GameState
+from game.logic import achievements as achievement_logic
+from game.logic import offline_progress
+from game.randomness import ExpectedValueRandomness
+
+def make_realm(nature_harmony):
+    clock = VirtualClock(0.0)
+    game_state = GameState(clock=clock, randomness=ExpectedValueRandomness())
+    for race_id in ("dwarf", "elf", "human"): game_state.races[race_id].update(unlocked=True, count=20, level=3)
+    game_state.races["elf"]["abilities"]["nature_harmony"].update(unlocked=nature_harmony, active=nature_harmony)
+    game_state.invalidate_production_plan()
+    return game_state, clock
+
+def run_fixed_steps(nature_harmony, seconds):
+    """Reference: the same span simulated in 1 s steps, as the game does while running"""
+    game_state, clock = make_realm(nature_harmony)
+    for _ in range(seconds):
+        clock.advance(1.0)
+        game_state.generate_resources(1.0)
+        game_state.check_unlocks()
+        achievement_logic.check_achievements(game_state)
+    return game_state
+
+@pytest.mark.parametrize("nature_harmony", [False, True])
+def test_offline_progress_matches_fixed_steps(nature_harmony):
+    seconds = 3600
+    reference = run_fixed_steps(nature_harmony, seconds)
+    game_state, _ = make_realm(nature_harmony)
+    segments = offline_progress.integrate_offline_progress(game_state, seconds, 1.0, 0.0)
+
+    # passive_generation grows every rate with the player level; level-ups must not each cost a segment
+    assert segments < offline_progress.MAX_OFFLINE_SEGMENTS // 10
+    for resource in RESOURCE_TYPES:
+        expected = float(reference.resources[resource])
+        assert float(game_state.resources[resource]) == pytest.approx(expected, rel=1e-3, abs=1e-6), resource
+    assert game_state.player_level == pytest.approx(reference.player_level, rel=1e-3)
+
+def test_catch_up_after_a_stall_matches_fixed_steps():
+    seconds = 3600
+    reference = run_fixed_steps(False, seconds)
+    game_state, clock = make_realm(False)
+    clock.advance(seconds)
+    game_state.catch_up(seconds)
+
+    assert game_state.total_play_time == seconds
+    assert float(game_state.resources["gold"]) == pytest.approx(float(reference.resources["gold"]), rel=1e-3)
@@ -0,0 +1,34 @@
+import json
+import os
+
+from game import persistence, save_format
+from game.clock import VirtualClock
+from game.game_state import GameState
+
+def snapshot(**changes):
+    game_state = GameState(clock=VirtualClock(1000.0))
+    game_state.resources["gold"] = 500.0
+    return dict(game_state.get_save_snapshot(), **changes)
+
+def test_compressed_flag_picks_the_format_whatever_the_extension(tmp_path):
+    compressed = persistence.write_save_file(snapshot(), str(tmp_path / "slot.sav"), compressed=True)
+    plain = persistence.write_save_file(snapshot(), str(tmp_path / "plain.sav"), compressed=False)
+    with open(compressed, "rb") as f: assert save_format.is_binary(f.read())
+    with open(plain, "rb") as f: assert json.load(f)["resources"]["gold"] == 500.0
+    assert persistence.read_save_file(compressed)["resources"]["gold"] == 500.0
+    assert persistence.read_save_metadata(compressed)["save_time"] == 1000.0
+
+def test_autosave_writes_a_full_snapshot_each_time(tmp_path):
+    for play_time in (0.0, 60.0, 120.0): path = persistence.write_save_file(snapshot(total_play_time=play_time), str(tmp_path / "auto.json"))
+    assert os.listdir(tmp_path) == ["auto.zsave"]
+    assert persistence.read_save_metadata(path)["total_play_time"] == 120.0
+
+def test_old_save_loads_when_the_migration_write_back_fails(tmp_path, monkeypatch):
+    path = str(tmp_path / "old.json")
+    with open(path, "w") as f: json.dump(snapshot(version="1.0.0"), f)
+    def read_only(path, payload): raise OSError("read-only")
+    monkeypatch.setattr(persistence, "atomic_write", read_only)
+    game_state = GameState(clock=VirtualClock(1000.0))
+    assert game_state.load_game(path)
+    assert game_state.resources["gold"] == 500.0
+    with open(path) as f: assert json.load(f)["version"] == "1.0.0" # Left as it was, migrated again on the next load
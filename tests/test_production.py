@@ -0,0 +1,48 @@
+import random
+
+import pytest
+
+from game.clock import VirtualClock
+from game.constants import RESOURCE_TYPES
+from game.game_state import GameState
+from game.logic.production import PRODUCED_MASK
+from game.randomness import ExpectedValueRandomness
+
+def random_realm(seed):
+    """A populated realm with a random mix of races, buildings and active abilities"""
+    rnd = random.Random(seed)
+    game_state = GameState(clock=VirtualClock(rnd.uniform(0, 1e6)), randomness=ExpectedValueRandomness())
+    game_state.player_level = rnd.randint(1, 60)
+    for resource in RESOURCE_TYPES: game_state.resources[resource] = rnd.uniform(0, 1e5)
+    for race in game_state.races.values():
+        race.update(unlocked=rnd.random() < 0.8, count=rnd.choice([0, 3, 50]), level=rnd.randint(1, 5))
+        for ability in race["abilities"].values(): ability.update(unlocked=True, active=rnd.random() < 0.7)
+    for building in game_state.buildings.values(): building.update(unlocked=True, count=rnd.choice([0, 2]), level=rnd.randint(1, 3))
+    game_state.races["dwarf"].update(unlocked=True, count=max(game_state.races["dwarf"]["count"], 3))
+    game_state.invalidate_production_plan()
+    return game_state
+
+@pytest.mark.parametrize("seed", range(20))
+def test_tick_rates_match_full_evaluation(seed):
+    game_state = random_realm(seed)
+    game_state.begin_tick()
+    rates = game_state.get_tick_rates()
+    for resource, produced in zip(RESOURCE_TYPES, PRODUCED_MASK):
+        expected = game_state.calculate_resource_generation_rate(resource) if produced else 0.0 # Prestige points only come from abilities
+        assert rates[RESOURCE_TYPES.index(resource)] == pytest.approx(expected, rel=1e-12, abs=1e-12), resource
+
+@pytest.mark.parametrize("seed", range(5))
+def test_populated_realm_generates_and_credits_races(seed):
+    game_state = random_realm(seed)
+    before = sum(sum(race["skills"].values()) for race in game_state.races.values())
+    for _ in range(10): game_state.generate_resources(1.0)
+    after = sum(sum(race["skills"].values()) for race in game_state.races.values())
+    assert after > before
+    assert game_state.total_earnings > 0
+
+def test_tick_snapshot_is_dropped_on_invalidation():
+    game_state = random_realm(0)
+    game_state.begin_tick()
+    gold = game_state.get_tick_rate("gold")
+    game_state.add_race("dwarf", 10)
+    assert game_state.get_tick_rate("gold") > gold
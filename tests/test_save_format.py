@@ -0,0 +1,58 @@
+import base64
+import json
+import zlib
+
+from game import migrations, persistence, save_format
+from game.clock import VirtualClock
+from game.game_state import GameState
+
+def played_snapshot():
+    game_state = GameState(clock=VirtualClock(1000.0))
+    game_state.races["dwarf"].update(unlocked=True, count=12, level=3)
+    game_state.resources["gold"] = 12345.5
+    game_state.achievements["resource_milestones"]["gold_1"] = True
+    return game_state.get_save_snapshot()
+
+def test_binary_round_trip():
+    data = played_snapshot()
+    assert save_format.decode(save_format.encode(data)) == data
+
+def test_current_layout_is_frozen():
+    # Fails after a content change until the new layout is frozen with: python -m game.save_format
+    with open(save_format.LAYOUTS_FILE, encoding='utf-8') as f: frozen = json.load(f)
+    assert save_format.SCHEMA_FINGERPRINT in {save_format.Layout(ids).fingerprint for ids in frozen}
+
+def test_save_from_older_content_decodes_and_migrates(monkeypatch):
+    # The older content had a building since cut from the game and lacked the newest achievement
+    ids = save_format.content_ids()
+    category = next(iter(ids["achievements"]))
+    newest_achievement = ids["achievements"][category][-1]
+    ids["achievements"] = dict(ids["achievements"], **{category: ids["achievements"][category][:-1]})
+    ids["buildings"] = ids["buildings"] + ["old_mill"]
+    old_layout = save_format.Layout(ids)
+    monkeypatch.setitem(save_format.LAYOUTS, old_layout.fingerprint, old_layout)
+
+    data = played_snapshot()
+    del data["achievements"][category][newest_achievement]
+    data["buildings"]["old_mill"] = {"count": 4, "level": 1, "unlocked": True}
+    payload = save_format.encode(data, layout=old_layout)
+
+    loaded = persistence.decode_save(payload)
+    assert "old_mill" in loaded["buildings"]
+    assert migrations.migrate(loaded)
+    assert migrations.content_matches(loaded)
+    assert "old_mill" not in loaded["buildings"]
+    assert loaded["achievements"][category][newest_achievement] is False
+
+    game_state = GameState(clock=VirtualClock(1000.0))
+    assert game_state.import_save_string(base64.b64encode(payload).decode('utf-8'))
+    assert game_state.resources["gold"] == 12345.5
+    assert game_state.races["dwarf"]["count"] == 12
+
+def test_version_3_record_with_journal_generation_decodes():
+    data = played_snapshot()
+    layout = save_format.CURRENT_LAYOUT
+    record = layout.journaled_record.pack(*layout.record.unpack(layout.pack(data)), bytes.fromhex("ab" * 16))
+    payload = (save_format.HEADER.pack(save_format.MAGIC, 3, layout.fingerprint) + save_format.METADATA.pack(*(data[field] for field in save_format.METADATA_FIELDS))
+               + save_format.DICTIONARY_ID.pack(0) + zlib.compress(record))
+    assert save_format.decode(payload) == data